@@ -61,6 +61,15 @@ class IsEditorOrReadOnly(permissions.BasePermission):
         )
 
 
+class IsEditor(permissions.BasePermission):
+    """
+    Permission to only allow editors and admins.
+    """
+    
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.is_editor)
+
+
 class IsAdminUser(permissions.BasePermission):
     """
     Permission to only allow admin users.
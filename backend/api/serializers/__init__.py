@@ -4,16 +4,19 @@ Serializers package initialization.
 
 from .media import MediaSerializer, MediaListSerializer
 from .page import PageSerializer, PageListSerializer
-from .post import CategorySerializer, PostSerializer, TagSerializer
+from .post import CategorySerializer, PostListSerializer, PostSerializer, TagSerializer
+from .revision import ContentRevisionSerializer
 from .user import UserSerializer
 
 __all__ = [
     'UserSerializer',
     'PostSerializer',
+    'PostListSerializer',
     'PageSerializer',
     'PageListSerializer',
     'MediaSerializer',
     'MediaListSerializer',
     'CategorySerializer',
     'TagSerializer',
+    'ContentRevisionSerializer',
 ]
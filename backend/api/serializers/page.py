@@ -2,8 +2,10 @@
 Page serializers for API.
 """
 
+from django.db import transaction
 from rest_framework import serializers
 
+from core import revisions
 from core.models import Page
 
 from .user import UserListSerializer
@@ -45,6 +47,7 @@ class PageSerializer(serializers.ModelSerializer):
         return [{'id': page.id, 'title': page.title, 'slug': page.slug} 
                 for page in obj.get_breadcrumb()]
     
+    @transaction.atomic
     def create(self, validated_data):
         """Create page with author from request."""
         if 'author_id' not in validated_data:
@@ -54,16 +57,22 @@ class PageSerializer(serializers.ModelSerializer):
             from core.models import User
             validated_data['author'] = User.objects.get(id=author_id)
         
-        return Page.objects.create(**validated_data)
+        page = Page.objects.create(**validated_data)
+        revisions.record(page, author=self.context['request'].user)
+        return page
     
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update page."""
         validated_data.pop('author_id', None)
         
+        # Keep the stored version if it predates revision history or was edited elsewhere
+        revisions.record(instance)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         
         instance.save()
+        revisions.record(instance, author=self.context['request'].user)
         return instance
 
 
@@ -2,8 +2,10 @@
 Post serializers for API.
 """
 
+from django.db import transaction
 from rest_framework import serializers
 
+from core import revisions
 from core.models import Category, Post, Tag
 
 from .user import UserListSerializer
@@ -14,8 +16,17 @@ class CategorySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug', 'description', 'parent', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id',
+            'name',
+            'slug',
+            'description',
+            'parent',
+            'published_post_count',
+            'total_post_count',
+            'created_at',
+        ]
+        read_only_fields = ['id', 'published_post_count', 'total_post_count', 'created_at']
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -23,8 +34,8 @@ class TagSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'slug', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'name', 'slug', 'published_post_count', 'total_post_count', 'created_at']
+        read_only_fields = ['id', 'published_post_count', 'total_post_count', 'created_at']
 
 
 class PostSerializer(serializers.ModelSerializer):
@@ -66,11 +77,13 @@ class PostSerializer(serializers.ModelSerializer):
             'meta_keywords',
             'view_count',
             'allow_comments',
+            'related_posts',
             'created_at',
             'updated_at',
         ]
-        read_only_fields = ['id', 'view_count', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'view_count', 'related_posts', 'created_at', 'updated_at']
     
+    @transaction.atomic
     def create(self, validated_data):
         """Create post with many-to-many relationships."""
         category_ids = validated_data.pop('category_ids', [])
@@ -91,14 +104,18 @@ class PostSerializer(serializers.ModelSerializer):
         if tag_ids:
             post.tags.set(tag_ids)
         
+        revisions.record(post, author=self.context['request'].user)
         return post
     
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update post with many-to-many relationships."""
         category_ids = validated_data.pop('category_ids', None)
         tag_ids = validated_data.pop('tag_ids', None)
         validated_data.pop('author_id', None)
         
+        # Keep the stored version if it predates revision history or was edited elsewhere
+        revisions.record(instance)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         
@@ -108,6 +125,7 @@ class PostSerializer(serializers.ModelSerializer):
             instance.tags.set(tag_ids)
         
         instance.save()
+        revisions.record(instance, author=self.context['request'].user)
         return instance
 
 
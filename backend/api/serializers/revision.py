@@ -0,0 +1,18 @@
+"""
+Content revision serializers for API.
+"""
+
+from rest_framework import serializers
+
+from core.models import ContentRevision
+
+
+class ContentRevisionSerializer(serializers.ModelSerializer):
+    """Revision metadata without the stored snapshot or delta."""
+    
+    author = serializers.CharField(source='author.email', read_only=True, default=None)
+    
+    class Meta:
+        model = ContentRevision
+        fields = ['number', 'is_snapshot', 'size', 'changed_fields', 'author', 'created_at']
+        read_only_fields = fields
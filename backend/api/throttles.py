@@ -0,0 +1,22 @@
+"""
+Custom throttles for API endpoints.
+"""
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class PostViewRateThrottle(SimpleRateThrottle):
+    """
+    Limit the views one client can record of the same post.
+    
+    Clients are users, or IP addresses when anonymous. Counting per post
+    keeps repeated requests from inflating one post's views without
+    limiting readers who browse many posts.
+    """
+    
+    scope = 'post_views'
+    
+    def get_cache_key(self, request, view):
+        ident = request.user.pk if request.user.is_authenticated else self.get_ident(request)
+        post = view.kwargs.get(view.lookup_url_kwarg or view.lookup_field)
+        return self.cache_format % {'scope': self.scope, 'ident': f'{ident}:{post}'}
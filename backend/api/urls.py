@@ -5,7 +5,24 @@ URL configuration for API endpoints.
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import CategoryViewSet, MediaViewSet, PageViewSet, PostViewSet, TagViewSet, UserViewSet
+from .views import (
+    CategoryViewSet,
+    MediaViewSet,
+    PageViewSet,
+    PostViewSet,
+    TagViewSet,
+    UserViewSet,
+    change_list,
+    change_stream,
+    post_views_view,
+    public_category_list,
+    public_page_detail,
+    public_page_list,
+    public_post_detail,
+    public_post_list,
+    top_posts_view,
+    top_referrers_view,
+)
 
 # Create router and register viewsets
 router = DefaultRouter()
@@ -17,5 +34,21 @@ router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'tags', TagViewSet, basename='tag')
 
 urlpatterns = [
+    # Async read-only endpoints for published content
+    path('public/posts/', public_post_list, name='public-post-list'),
+    path('public/posts/<slug:slug>/', public_post_detail, name='public-post-detail'),
+    path('public/pages/', public_page_list, name='public-page-list'),
+    path('public/pages/<slug:slug>/', public_page_detail, name='public-page-detail'),
+    path('public/categories/', public_category_list, name='public-category-list'),
+    
+    # Content change feed
+    path('changes/', change_list, name='change-list'),
+    path('changes/stream/', change_stream, name='change-stream'),
+    
+    # Post view analytics (editors)
+    path('analytics/posts/top/', top_posts_view, name='analytics-top-posts'),
+    path('analytics/posts/<slug:slug>/', post_views_view, name='analytics-post-views'),
+    path('analytics/referrers/', top_referrers_view, name='analytics-top-referrers'),
+    
     path('', include(router.urls)),
 ]
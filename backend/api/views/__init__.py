@@ -2,9 +2,18 @@
 Views package initialization.
 """
 
+from .analytics import post_views_view, top_posts_view, top_referrers_view
+from .changes import change_list, change_stream
 from .media import MediaViewSet
 from .page import PageViewSet
 from .post import CategoryViewSet, PostViewSet, TagViewSet
+from .public import (
+    public_category_list,
+    public_page_detail,
+    public_page_list,
+    public_post_detail,
+    public_post_list,
+)
 from .user import UserViewSet
 
 __all__ = [
@@ -14,4 +23,14 @@ __all__ = [
     'MediaViewSet',
     'CategoryViewSet',
     'TagViewSet',
+    'public_post_list',
+    'public_post_detail',
+    'public_page_list',
+    'public_page_detail',
+    'public_category_list',
+    'change_list',
+    'change_stream',
+    'top_posts_view',
+    'post_views_view',
+    'top_referrers_view',
 ]
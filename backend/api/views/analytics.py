@@ -0,0 +1,93 @@
+"""
+Analytics views for API.
+
+Read the daily view buckets written by ``core.analytics``; views still
+buffered in worker processes are not included.
+"""
+
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from api.permissions import IsEditor
+from core import analytics
+from core.models import Post
+
+MAX_DAYS = 366
+MAX_LIMIT = 100
+
+
+def window(request, default_days):
+    """Parse ``days`` and ``limit`` query parameters, or raise ``ValueError``."""
+    days = int(request.query_params.get('days', default_days))
+    limit = int(request.query_params.get('limit', 10))
+    if not 1 <= days <= MAX_DAYS or not 1 <= limit <= MAX_LIMIT:
+        raise ValueError
+    return days, limit
+
+
+def bad_window():
+    return Response(
+        {'detail': f'days must be 1-{MAX_DAYS} and limit 1-{MAX_LIMIT}.'},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsEditor])
+def top_posts_view(request):
+    """Most viewed published posts over the last ``days`` days (default 7)."""
+    try:
+        days, limit = window(request, 7)
+    except ValueError:
+        return bad_window()
+    totals = analytics.top_posts(days, limit)
+    posts = Post.objects.only('id', 'slug', 'title').in_bulk([post_id for post_id, _ in totals])
+    return Response({
+        'days': days,
+        'results': [
+            {'id': post_id, 'slug': posts[post_id].slug, 'title': posts[post_id].title, 'views': views}
+            for post_id, views in totals
+            if post_id in posts
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsEditor])
+def post_views_view(request, slug):
+    """Daily views and top referrers of a post over the last ``days`` days (default 30)."""
+    try:
+        days, limit = window(request, 30)
+    except ValueError:
+        return bad_window()
+    post = get_object_or_404(Post.objects.only('id', 'slug', 'title', 'view_count'), slug=slug)
+    return Response({
+        'id': post.pk,
+        'slug': post.slug,
+        'title': post.title,
+        'view_count': post.view_count,
+        'days': [{'date': day, 'views': views} for day, views in analytics.views_by_day(post, days)],
+        'referrers': [
+            {'referrer': referrer, 'views': views}
+            for referrer, views in analytics.top_referrers(post, days, limit)
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsEditor])
+def top_referrers_view(request):
+    """Referrer hosts sending the most views over the last ``days`` days (default 7)."""
+    try:
+        days, limit = window(request, 7)
+    except ValueError:
+        return bad_window()
+    return Response({
+        'days': days,
+        'results': [
+            {'referrer': referrer, 'views': views}
+            for referrer, views in analytics.top_referrers(days=days, limit=limit)
+        ],
+    })
@@ -0,0 +1,26 @@
+"""
+Autocomplete responses for API.
+
+Served from the per-process prefix indexes in ``core.autocomplete``, so
+the database is only read when an index is rebuilt.
+"""
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from core import autocomplete
+
+
+def autocomplete_response(request, kind):
+    """Suggestions of ``kind`` for the ``q`` prefix, at most ``limit`` (default 10)."""
+    try:
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= autocomplete.MAX_LIMIT:
+        return Response(
+            {'detail': f'limit must be between 1 and {autocomplete.MAX_LIMIT}.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    prefix = request.query_params.get('q', '')[:100]
+    return Response({'results': autocomplete.suggest(kind, prefix, limit)})
@@ -0,0 +1,88 @@
+"""
+Change feed views for API.
+
+Async views: the stream holds its connection open, which only scales
+when served under ASGI.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from knox.auth import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.changefeed import BATCH_SIZE, afetch, stream, visible
+
+
+async def include_private(request):
+    """
+    Whether the client may see changes to non-public content.
+    
+    Authenticates a knox token if one is sent; only editors see everything.
+    Raises ``AuthenticationFailed`` for invalid tokens.
+    """
+    result = await sync_to_async(TokenAuthentication().authenticate)(request)
+    return bool(result and result[0].is_editor)
+
+
+def parse_seq(value):
+    if value in (None, ''):
+        return None
+    seq = int(value)
+    if seq < 0:
+        raise ValueError(value)
+    return seq
+
+
+def unauthorized(exc):
+    return JsonResponse({'detail': str(exc.detail)}, status=401)
+
+
+@require_safe
+async def change_list(request):
+    """
+    Return change log entries after ``since``.
+    
+    Anonymous clients see changes to public content only; editors see all.
+    ``last_seq`` is the sequence to pass as ``since`` next time.
+    """
+    try:
+        private = await include_private(request)
+    except AuthenticationFailed as exc:
+        return unauthorized(exc)
+    try:
+        since = parse_seq(request.GET.get('since')) or 0
+        limit = min(max(int(request.GET.get('limit', BATCH_SIZE)), 1), 1000)
+    except ValueError:
+        return JsonResponse({'detail': 'since and limit must be non-negative integers.'}, status=400)
+    
+    entries = await afetch(since, limit)
+    return JsonResponse({
+        'changes': visible(entries, private),
+        'last_seq': entries[-1]['seq'] if entries else since,
+        'has_more': len(entries) == limit,
+    })
+
+
+@require_safe
+async def change_stream(request):
+    """
+    Stream change log entries as Server-Sent Events.
+    
+    Resumes after ``Last-Event-ID`` or ``?since=``; without either, only
+    changes made after connecting are sent.
+    """
+    try:
+        private = await include_private(request)
+    except AuthenticationFailed as exc:
+        return unauthorized(exc)
+    try:
+        since = parse_seq(request.headers.get('Last-Event-ID') or request.GET.get('since'))
+    except ValueError:
+        return JsonResponse({'detail': 'since must be a non-negative integer.'}, status=400)
+    
+    response = StreamingHttpResponse(stream(since, private), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
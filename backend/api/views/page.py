@@ -8,14 +8,16 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
 from api.permissions import IsAuthorOrReadOnly
 from api.serializers import PageListSerializer, PageSerializer
+from api.views.revisions import RevisionHistoryMixin
 from core.models import Page
 
 
-class PageViewSet(viewsets.ModelViewSet):
+class PageViewSet(RevisionHistoryMixin, viewsets.ModelViewSet):
     """
     ViewSet for Page model.
     
-    Provides CRUD operations for pages with filtering and searching.
+    Provides CRUD operations for pages with filtering and searching,
+    and their revision history.
     """
     
     queryset = Page.objects.select_related('author', 'parent', 'featured_image')
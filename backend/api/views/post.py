@@ -2,22 +2,32 @@
 Post views for API.
 """
 
+import time
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 
 from api.permissions import IsAuthorOrReadOnly
-from api.serializers import CategorySerializer, PostSerializer, TagSerializer
+from api.serializers import CategorySerializer, PostListSerializer, PostSerializer, TagSerializer
+from api.throttles import PostViewRateThrottle
+from api.views.autocomplete import autocomplete_response
+from api.views.revisions import RevisionHistoryMixin
+from core import analytics
 from core.models import Category, Post, Tag
+from core.trending import current_value, ranked
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(RevisionHistoryMixin, viewsets.ModelViewSet):
     """
     ViewSet for Post model.
     
-    Provides CRUD operations for posts with filtering, searching, and pagination.
+    Provides CRUD operations for posts with filtering, searching, and pagination,
+    and their revision history.
     """
     
     queryset = Post.objects.select_related('author', 'featured_image').prefetch_related('categories', 'tags')
@@ -46,13 +56,69 @@ class PostViewSet(viewsets.ModelViewSet):
         
         return queryset
     
-    @action(detail=True, methods=['post'])
+    @action(
+        detail=True,
+        methods=['post'],
+        permission_classes=[AllowAny],
+        throttle_classes=[PostViewRateThrottle],
+    )
     def increment_views(self, request, slug=None):
-        """Increment view count for a post."""
+        """
+        Record a view of a post.
+        
+        The view is buffered and stored in the daily analytics buckets;
+        ``view_count`` catches up when ``fold_post_views`` runs. Clients may
+        send the page's ``referrer`` (``document.referrer``). Anonymous
+        readers count too; they can only see published posts. Each client
+        may record only a few views of the same post per hour, so repeated
+        requests cannot push a post up the trending list.
+        """
         post = self.get_object()
-        post.view_count += 1
-        post.save(update_fields=['view_count'])
-        return Response({'view_count': post.view_count})
+        referrer = request.data.get('referrer', '') if isinstance(request.data, dict) else ''
+        analytics.record_view(post, referrer if isinstance(referrer, str) else '')
+        return Response({'view_count': post.view_count + analytics.buffer.pending(post.pk)})
+    
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """
+        Trending published posts, hottest first.
+        
+        Served from the cached top lists kept by ``fold_post_views``; a
+        ``category`` or ``tag`` slug selects that list. ``trending_score``
+        is the number of recent views after decay.
+        """
+        scope = 'all'
+        if request.query_params.get('category'):
+            category = get_object_or_404(Category.objects.only('id'), slug=request.query_params['category'])
+            scope = f'category:{category.pk}'
+        elif request.query_params.get('tag'):
+            tag = get_object_or_404(Tag.objects.only('id'), slug=request.query_params['tag'])
+            scope = f'tag:{tag.pk}'
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= settings.TRENDING_TOP_K:
+            return Response(
+                {'detail': f'limit must be between 1 and {settings.TRENDING_TOP_K}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        entries = ranked(scope, limit)
+        posts = (
+            Post.objects.filter(status='published')
+            .select_related('author', 'featured_image')
+            .prefetch_related('categories', 'tags')
+            .in_bulk([post_id for post_id, _ in entries])
+        )
+        now = time.time()
+        results = []
+        for post_id, score in entries:
+            if post_id in posts:
+                data = PostListSerializer(posts[post_id], context=self.get_serializer_context()).data
+                data['trending_score'] = round(current_value(score, now), 3)
+                results.append(data)
+        return Response({'results': results})
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -63,9 +129,14 @@ class CategoryViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
-    ordering_fields = ['name', 'created_at']
+    ordering_fields = ['name', 'published_post_count', 'total_post_count', 'created_at']
     ordering = ['name']
     lookup_field = 'slug'
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Categories with a name or word starting with ``q``, most used first."""
+        return autocomplete_response(request, 'categories')
 
 
 class TagViewSet(viewsets.ModelViewSet):
@@ -76,6 +147,11 @@ class TagViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
-    ordering_fields = ['name', 'created_at']
+    ordering_fields = ['name', 'published_post_count', 'total_post_count', 'created_at']
     ordering = ['name']
     lookup_field = 'slug'
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Tags with a name or word starting with ``q``, most used first."""
+        return autocomplete_response(request, 'tags')
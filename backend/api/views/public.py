@@ -0,0 +1,119 @@
+"""
+Async read-only views for published content.
+
+These are plain Django async views rather than DRF viewsets, so under
+ASGI they run on the event loop instead of being handed to a worker
+thread per request. Rows are loaded with the async ORM (``aiterator``,
+``aget``, ``acount``) with every relation the serializers need already
+selected or prefetched. The existing serializers then only format
+in-memory objects, so serialization never touches the database.
+Anonymous clients see published content only, as with the viewsets.
+"""
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.serializers import CategorySerializer, PageListSerializer, PageSerializer, PostSerializer
+from core.models import Category, Page, Post
+
+
+def published_posts():
+    return (
+        Post.objects.filter(status='published')
+        .select_related('author', 'featured_image')
+        .prefetch_related('categories', 'tags')
+        .order_by('-published_at')
+    )
+
+
+def published_pages():
+    return Page.objects.filter(status='published').select_related('author').order_by('menu_order', 'title')
+
+
+def not_found():
+    return JsonResponse({'detail': 'Not found.'}, status=404)
+
+
+def _page_url(request, number, last):
+    """Absolute URL of page ``number``, mirroring ``PageNumberPagination``."""
+    if number < 1 or number > last:
+        return None
+    url = request.build_absolute_uri()
+    if number == 1:
+        return remove_query_param(url, 'page')
+    return replace_query_param(url, 'page', number)
+
+
+async def paginate(request, queryset, serializer_class):
+    """
+    Return a paginated response in the same shape as the viewsets'
+    ``PageNumberPagination``, or 404 for an invalid page.
+    """
+    size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        number = int(request.GET.get('page', 1))
+    except ValueError:
+        number = 0
+    count = await queryset.acount()
+    last = max((count + size - 1) // size, 1)
+    if not 1 <= number <= last:
+        return JsonResponse({'detail': 'Invalid page.'}, status=404)
+
+    offset = (number - 1) * size
+    objects = [obj async for obj in queryset[offset:offset + size].aiterator(chunk_size=size)]
+    return JsonResponse({
+        'count': count,
+        'next': _page_url(request, number + 1, last),
+        'previous': _page_url(request, number - 1, last),
+        'results': serializer_class(objects, many=True).data,
+    })
+
+
+@require_safe
+async def public_post_list(request):
+    """List published posts, optionally filtered by ``category`` or ``tag`` slug."""
+    queryset = published_posts()
+    if request.GET.get('category'):
+        queryset = queryset.filter(categories__slug=request.GET['category'])
+    if request.GET.get('tag'):
+        queryset = queryset.filter(tags__slug=request.GET['tag'])
+    return await paginate(request, queryset.distinct(), PostSerializer)
+
+
+@require_safe
+async def public_post_detail(request, slug):
+    """Return a published post."""
+    try:
+        post = await published_posts().aget(slug=slug)
+    except Post.DoesNotExist:
+        return not_found()
+    return JsonResponse(PostSerializer(post).data)
+
+
+@require_safe
+async def public_page_list(request):
+    """List published pages in menu order."""
+    return await paginate(request, published_pages(), PageListSerializer)
+
+
+@require_safe
+async def public_page_detail(request, slug):
+    """Return a published page with its breadcrumb."""
+    try:
+        page = await published_pages().aget(slug=slug)
+    except Page.DoesNotExist:
+        return not_found()
+    # Load the parent chain so the breadcrumb is built from cached relations
+    node = page
+    while node.parent_id is not None:
+        node.parent = await Page.objects.only('id', 'title', 'slug', 'parent').aget(pk=node.parent_id)
+        node = node.parent
+    return JsonResponse(PageSerializer(page).data)
+
+
+@require_safe
+async def public_category_list(request):
+    """List categories by name."""
+    return await paginate(request, Category.objects.order_by('name'), CategorySerializer)
@@ -0,0 +1,45 @@
+"""
+Revision history actions shared by the post and page viewsets.
+"""
+
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from api.serializers import ContentRevisionSerializer
+from core import revisions
+from core.models import ContentRevision
+
+
+class RevisionHistoryMixin:
+    """Adds ``revisions/`` and ``revisions/{number}/`` to a post or page viewset."""
+    
+    def get_editable_object(self):
+        obj = self.get_object()
+        if not obj.can_be_edited_by(self.request.user):
+            raise PermissionDenied()
+        return obj
+    
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def revisions(self, request, slug=None):
+        """List revisions, newest first, without loading their contents."""
+        page = self.paginate_queryset(revisions.list_revisions(self.get_editable_object()))
+        serializer = ContentRevisionSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    @action(
+        detail=True,
+        methods=['get'],
+        permission_classes=[IsAuthenticated],
+        url_path=r'revisions/(?P<number>\d+)',
+        url_name='revision',
+    )
+    def revision(self, request, slug=None, number=None):
+        """Reconstruct the revisioned fields as of a given revision."""
+        obj = self.get_editable_object()
+        try:
+            fields = revisions.reconstruct(obj, int(number))
+        except ContentRevision.DoesNotExist:
+            raise NotFound()
+        return Response({'revision': int(number), **fields})
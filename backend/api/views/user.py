@@ -8,8 +8,9 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from api.permissions import IsAdminUser
+from api.permissions import IsAdminUser, IsEditor
 from api.serializers import UserSerializer
+from api.views.autocomplete import autocomplete_response
 from core.models import User
 
 
@@ -36,6 +37,15 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsEditor])
+    def autocomplete(self, request):
+        """
+        Active users to mention whose email or name starts with ``q``, most posts first.
+        
+        Limited to editors, since suggestions include email addresses.
+        """
+        return autocomplete_response(request, 'users')
+    
     @action(detail=False, methods=['patch'], permission_classes=[IsAuthenticated])
     def update_profile(self, request):
         """Update current user's profile."""
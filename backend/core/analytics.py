@@ -0,0 +1,247 @@
+"""
+Post view analytics.
+
+Views are counted per worker in a buffer keyed by post, day and
+referrer host. Each flush appends one :class:`~core.models.PostViewBucket`
+row per key with a single ``bulk_create``, so recording a view never
+updates the posts table. ``manage.py fold_post_views`` then:
+
+* adds unfolded bucket rows to ``Post.view_count`` with one bulk
+  ``UPDATE`` per batch and marks them folded;
+* passes the folded views to :mod:`core.trending`;
+* merges folded rows so each post, day and referrer keeps one row;
+* optionally deletes buckets older than a retention window.
+
+Top-N and time-series queries read the buckets, which are indexed by
+``(day, post)`` and ``(post, day)``.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from .models import Post, PostViewBucket
+
+logger = logging.getLogger('securepress.analytics')
+
+# Bucket rows folded per transaction
+FOLD_BATCH_SIZE = 5000
+
+
+def referrer_host(referrer):
+    """Normalise a referrer URL to its host, e.g. ``news.example.com``; empty if unknown."""
+    if not referrer:
+        return ''
+    host = (urlsplit(referrer if '//' in referrer else f'//{referrer}').hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host[:255]
+
+
+class ViewBuffer:
+    """
+    Per-process buffer of post views.
+
+    Flushed once ``POST_VIEW_FLUSH_THRESHOLD`` views are buffered, or by a
+    timer ``POST_VIEW_FLUSH_INTERVAL`` seconds after a view arrives, so a
+    quiet worker does not hold views until it exits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = Counter()
+        self._posts = Counter()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    def record(self, post_id, referrer=''):
+        """Count one view of ``post_id`` and flush if the buffer is due."""
+        key = (post_id, timezone.localdate(), referrer_host(referrer))
+        with self._lock:
+            self._buckets[key] += 1
+            self._posts[post_id] += 1
+            self._pending += 1
+            due = (
+                self._pending >= settings.POST_VIEW_FLUSH_THRESHOLD
+                or time.monotonic() - self._last_flush >= settings.POST_VIEW_FLUSH_INTERVAL
+            )
+            if not due:
+                self._schedule()
+        if due:
+            self.flush()
+
+    def pending(self, post_id):
+        """Views of ``post_id`` buffered in this process."""
+        with self._lock:
+            return self._posts[post_id]
+
+    def _schedule(self):
+        """Flush within the interval even if no further views arrive. Call with the lock held."""
+        if self._timer is None:
+            self._timer = threading.Timer(settings.POST_VIEW_FLUSH_INTERVAL, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            # The timer thread's database connection is not reused
+            connections.close_all()
+
+    def flush(self):
+        """Append buffered views as bucket rows. Returns the number of views flushed."""
+        with self._lock:
+            buckets, posts, pending = self._buckets, self._posts, self._pending
+            self._buckets, self._posts, self._pending = Counter(), Counter(), 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        rows = [
+            PostViewBucket(post_id=post_id, day=day, referrer=referrer, views=views)
+            for (post_id, day, referrer), views in buckets.items()
+        ]
+        try:
+            existing = set(Post.objects.filter(pk__in=list(posts)).values_list('pk', flat=True))
+            PostViewBucket.objects.bulk_create([row for row in rows if row.post_id in existing])
+        except DatabaseError:
+            logger.exception('Failed to flush %d buffered view(s)', pending)
+            with self._lock:
+                self._buckets.update(buckets)
+                self._posts.update(posts)
+                self._pending += pending
+                self._schedule()
+            return 0
+        return pending
+
+
+buffer = ViewBuffer()
+
+
+def record_view(post, referrer=''):
+    """Buffer one view of ``post``."""
+    buffer.record(post.pk, referrer)
+
+
+def flush_views():
+    """Flush this worker's buffered views."""
+    return buffer.flush()
+
+
+atexit.register(flush_views)
+
+
+def fold_views(batch_size=FOLD_BATCH_SIZE):
+    """Add unfolded bucket views to ``Post.view_count``. Returns the views folded per post."""
+    folded = Counter()
+    while True:
+        with transaction.atomic():
+            ids = list(
+                PostViewBucket.objects.select_for_update(skip_locked=True)
+                .filter(folded=False)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return folded
+            totals = dict(
+                PostViewBucket.objects.filter(id__in=ids)
+                .values_list('post_id')
+                .annotate(total=Sum('views'))
+                .order_by()
+            )
+            increment = Case(
+                *(When(pk=pk, then=Value(total)) for pk, total in totals.items()),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            Post.objects.filter(pk__in=list(totals)).update(view_count=F('view_count') + increment)
+            PostViewBucket.objects.filter(id__in=ids).update(folded=True)
+            folded.update(totals)
+
+
+def compact_buckets():
+    """Merge folded rows with the same post, day and referrer. Returns the number of rows removed."""
+    groups = (
+        PostViewBucket.objects.filter(folded=True)
+        .values('post_id', 'day', 'referrer')
+        .annotate(rows=Count('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    removed = 0
+    for group in list(groups):
+        with transaction.atomic():
+            rows = PostViewBucket.objects.filter(
+                folded=True, post_id=group['post_id'], day=group['day'], referrer=group['referrer'],
+            )
+            ids = list(rows.select_for_update().values_list('id', flat=True))
+            views = PostViewBucket.objects.filter(id__in=ids).aggregate(total=Sum('views'))['total'] or 0
+            PostViewBucket.objects.filter(id__in=ids).delete()
+            PostViewBucket.objects.create(
+                post_id=group['post_id'], day=group['day'], referrer=group['referrer'], views=views, folded=True,
+            )
+            removed += len(ids) - 1
+    return removed
+
+
+def prune_buckets(days):
+    """Delete folded buckets older than ``days`` days. Returns the number of rows deleted."""
+    cutoff = timezone.localdate() - timedelta(days=days)
+    return PostViewBucket.objects.filter(folded=True, day__lt=cutoff).delete()[0]
+
+
+def day_range(days):
+    """The first and last day of a window of ``days`` days ending today."""
+    today = timezone.localdate()
+    return today - timedelta(days=days - 1), today
+
+
+def top_posts(days=7, limit=10, published_only=True):
+    """The most viewed posts over the last ``days`` days, as ``[(post_id, views)]``."""
+    start, end = day_range(days)
+    buckets = PostViewBucket.objects.filter(day__range=(start, end))
+    if published_only:
+        buckets = buckets.filter(post__status='published')
+    return list(
+        buckets.values_list('post_id')
+        .annotate(total=Sum('views'))
+        .order_by('-total', 'post_id')[:limit]
+    )
+
+
+def views_by_day(post, days=30):
+    """Daily views of ``post`` over the last ``days`` days, including days without views."""
+    start, end = day_range(days)
+    totals = dict(
+        PostViewBucket.objects.filter(post=post, day__range=(start, end))
+        .values_list('day')
+        .annotate(total=Sum('views'))
+        .order_by()
+    )
+    return [(start + timedelta(days=offset), totals.get(start + timedelta(days=offset), 0)) for offset in range(days)]
+
+
+def top_referrers(post=None, days=30, limit=10):
+    """The referrer hosts sending the most views over the last ``days`` days, as ``[(host, views)]``."""
+    start, end = day_range(days)
+    buckets = PostViewBucket.objects.filter(day__range=(start, end))
+    if post is not None:
+        buckets = buckets.filter(post=post)
+    return list(
+        buckets.values_list('referrer')
+        .annotate(total=Sum('views'))
+        .order_by('-total', 'referrer')[:limit]
+    )
@@ -7,3 +7,7 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'SecurePress Core'
+    
+    def ready(self):
+        """Connect signal handlers."""
+        from . import signals  # noqa: F401
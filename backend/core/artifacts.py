@@ -0,0 +1,92 @@
+"""
+Generated files for crawlers and feed readers.
+
+Sitemaps and feeds are written gzipped under ``SYNDICATION_ROOT`` and
+served from there. Each file belongs to a group, such as one month of
+posts or the feeds of one tag, whose version is kept in the shared cache.
+The version is part of the file name, so bumping it with
+:func:`invalidate` marks the group's files stale for every worker and
+host. The next request or ``build_sitemaps`` rebuilds a stale file and
+removes its older versions.
+
+File names also carry a random epoch stored in the cache. If the cache is
+cleared, versions restart but the epoch changes, so files written under
+the old versions are not reused.
+"""
+
+import gzip
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import bump_version, get_version
+
+VERSION_PREFIX = 'core:artifact'
+EPOCH_KEY = 'securepress:artifacts:epoch'
+
+
+def root():
+    return Path(settings.SYNDICATION_ROOT)
+
+
+def epoch():
+    """The cache epoch, created if missing."""
+    value = cache.get(EPOCH_KEY)
+    if value is None:
+        cache.add(EPOCH_KEY, secrets.token_hex(4), timeout=None)
+        value = cache.get(EPOCH_KEY)
+    return value
+
+
+def current_path(name, group):
+    """Path of the current version of ``name`` (e.g. ``feeds/posts.rss``) in ``group``."""
+    return root() / f'{name}.{epoch()}-{get_version(f"{VERSION_PREFIX}:{group}")}.gz'
+
+
+def write(path, content):
+    """Gzip ``content`` (bytes) to ``path`` atomically and remove older versions of it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(descriptor, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as out:
+            out.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    name = path.name.rsplit('.', 2)[0]
+    for other in path.parent.glob(f'{name}.*.gz'):
+        if other != path:
+            other.unlink(missing_ok=True)
+
+
+def ensure(name, group, build):
+    """
+    Build ``name`` with ``build()`` (returning bytes) unless its current
+    version exists. Returns the path and whether it was built.
+    """
+    path = current_path(name, group)
+    if path.exists():
+        return path, False
+    write(path, build())
+    return path, True
+
+
+def load(name, group, build):
+    """The gzipped bytes of the current version of ``name``, building it if needed."""
+    path, _ = ensure(name, group, build)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        # Replaced by a newer version between the check and the read
+        return load(name, group, build)
+
+
+def invalidate(*groups):
+    """Mark the files of ``groups`` stale in every worker."""
+    for group in set(groups):
+        bump_version(f'{VERSION_PREFIX}:{group}')
@@ -0,0 +1,191 @@
+"""
+Prefix autocomplete for tags, categories and user mentions.
+
+Each worker keeps one in-memory index per kind. An index holds the
+normalised keys of every item (the full name and each word in it, e.g.
+``machine learning`` and ``learning``) in a sorted list. Items are
+numbered best first: tags and categories by how many posts use them,
+users by how many posts they wrote. A prefix query bisects the sorted keys
+for the matching range and keeps the lowest-numbered items. The best items
+for every prefix of up to ``SHORT_PREFIX`` characters are computed when
+the index is built, because those ranges are the widest.
+
+An index is rebuilt when its version in the shared cache is bumped by a
+change to its model, or when it is older than
+``AUTOCOMPLETE_REFRESH_SECONDS`` so that usage counts stay fresh. Only the
+first build blocks requests: later rebuilds run in a background thread,
+at most one per kind at a time, while the previous index keeps serving
+until the new one is swapped in.
+"""
+
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from heapq import nsmallest
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+
+from .cache import bump_version, get_version
+from .models import Category, Tag, User
+
+logger = logging.getLogger('securepress.autocomplete')
+
+VERSION_PREFIX = 'core:autocomplete'
+
+# Suggestions returned per query at most
+MAX_LIMIT = 20
+
+# Prefixes up to this length have their suggestions precomputed
+SHORT_PREFIX = 2
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalise(text):
+    return ' '.join(text.casefold().split())
+
+
+def keys_for(*texts):
+    """Normalised keys of ``texts``: each text and each word in it."""
+    keys = set()
+    for text in texts:
+        text = normalise(text or '')
+        if text:
+            keys.add(text)
+            keys.update(WORD_RE.findall(text))
+    return keys
+
+
+class PrefixIndex:
+    """Sorted keys over items numbered best first."""
+
+    def __init__(self, items):
+        # items: (keys, suggestion) pairs, best first
+        self.suggestions = []
+        rows = []
+        short = defaultdict(list)
+        for ordinal, (keys, suggestion) in enumerate(items):
+            self.suggestions.append(suggestion)
+            prefixes = set()
+            for key in keys:
+                rows.append((key, ordinal))
+                prefixes.update(key[:length] for length in range(SHORT_PREFIX + 1))
+            for prefix in prefixes:
+                if len(short[prefix]) < MAX_LIMIT:
+                    short[prefix].append(ordinal)
+        rows.sort()
+        self.keys = [key for key, _ in rows]
+        self.ordinals = [ordinal for _, ordinal in rows]
+        self.short = dict(short)
+
+    def search(self, prefix, limit=10):
+        """The best ``limit`` items with a key starting with ``prefix``."""
+        prefix = normalise(prefix)
+        if len(prefix) <= SHORT_PREFIX:
+            ordinals = self.short.get(prefix, [])[:limit]
+        else:
+            start = bisect.bisect_left(self.keys, prefix)
+            end = bisect.bisect_left(self.keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+            ordinals = nsmallest(limit, set(self.ordinals[start:end]))
+        return [self.suggestions[ordinal] for ordinal in ordinals]
+
+
+def term_items(model):
+    rows = model.objects.order_by('-total_post_count', 'name').values_list(
+        'id', 'name', 'slug', 'published_post_count', 'total_post_count',
+    )
+    for pk, name, slug, published, total in rows.iterator():
+        suggestion = {
+            'id': pk, 'name': name, 'slug': slug,
+            'published_post_count': published, 'total_post_count': total,
+        }
+        yield keys_for(name, slug.replace('-', ' ')), suggestion
+
+
+def user_items():
+    rows = (
+        User.objects.filter(is_active=True)
+        .annotate(post_count=Count('posts'))
+        .order_by('-post_count', 'email')
+        .values_list('id', 'email', 'first_name', 'last_name', 'post_count')
+    )
+    for pk, email, first_name, last_name, post_count in rows.iterator():
+        full_name = f'{first_name} {last_name}'.strip()
+        suggestion = {'id': pk, 'email': email, 'full_name': full_name, 'post_count': post_count}
+        yield keys_for(full_name) | {email.casefold()}, suggestion
+
+
+BUILDERS = {
+    'categories': lambda: term_items(Category),
+    'tags': lambda: term_items(Tag),
+    'users': user_items,
+}
+
+
+class Autocomplete:
+    """Per-process holder of the index for one kind."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._version = None
+        self._built_at = 0
+        self._index = None
+        self._rebuilding = False
+
+    def stale(self, version):
+        return version != self._version or time.monotonic() - self._built_at >= settings.AUTOCOMPLETE_REFRESH_SECONDS
+
+    def index(self):
+        """
+        Return the current index.
+        
+        If it changed or aged out, the first caller builds it; afterwards the
+        old index is returned while a background thread rebuilds it.
+        """
+        version = get_version(f'{VERSION_PREFIX}:{self.kind}')
+        if self.stale(version):
+            with self._lock:
+                if self._index is None:
+                    self._install(PrefixIndex(BUILDERS[self.kind]()), version)
+                elif self.stale(version) and not self._rebuilding:
+                    self._rebuilding = True
+                    threading.Thread(target=self._rebuild, args=(version,), daemon=True).start()
+        return self._index
+
+    def _install(self, index, version):
+        self._index = index
+        self._version = version
+        self._built_at = time.monotonic()
+
+    def _rebuild(self, version):
+        index = None
+        try:
+            index = PrefixIndex(BUILDERS[self.kind]())
+        except Exception:
+            logger.exception('Rebuilding the %s autocomplete index failed', self.kind)
+        finally:
+            # The thread's database connection is not reused
+            connections.close_all()
+            with self._lock:
+                if index is not None:
+                    self._install(index, version)
+                self._rebuilding = False
+
+
+indexes = {kind: Autocomplete(kind) for kind in BUILDERS}
+
+
+def suggest(kind, prefix, limit=10):
+    """Suggestions of ``kind`` (``categories``, ``tags`` or ``users``) for ``prefix``, best first."""
+    return indexes[kind].index().search(prefix, min(limit, MAX_LIMIT))
+
+
+def invalidate(kind):
+    """Force every worker to rebuild its ``kind`` index."""
+    bump_version(f'{VERSION_PREFIX}:{kind}')
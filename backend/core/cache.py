@@ -0,0 +1,46 @@
+"""
+Cache helpers shared across SecurePress apps.
+
+Version keys live in the shared cache backend so that bumping one
+invalidates derived data in every worker process at once.
+"""
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'securepress:version'
+
+
+def version_key(name):
+    """Return the cache key holding the version counter for ``name``."""
+    return f'{VERSION_KEY_PREFIX}:{name}'
+
+
+def get_version(name):
+    """Return the current version counter for ``name``, initialising it to 1."""
+    key = version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(name):
+    """Increment the version counter for ``name`` and return the new value."""
+    key = version_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key expired or was never set; any value differing from cached copies will do
+        cache.set(key, 2, timeout=None)
+        return 2
+
+
+async def aget_version(name):
+    """Async version of :func:`get_version`."""
+    key = version_key(name)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, 1, timeout=None)
+        version = await cache.aget(key, 1)
+    return version
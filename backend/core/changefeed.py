@@ -0,0 +1,247 @@
+"""
+Content change feed.
+
+Saves and deletes of content models (connected in each app's ``signals``
+module) append a ``ChangeLogEntry`` once the transaction commits, and bump
+a shared version counter. Entries are written one at a time under a row
+lock, so a sequence number is never committed after a larger one. Clients read the log from a sequence number,
+either as JSON or as a Server-Sent Events stream that stays open and
+pushes batches as they arrive.
+
+Streams do not query the database themselves. Each worker process runs
+one :class:`ChangeHub` poller while it has subscribers. The poller checks
+the version counter, loads new entries once, keeps the most recent ones
+in memory and wakes every open stream. Only a stream that is further
+behind than that buffer reads the database directly.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from django.db import transaction
+
+from core.cache import aget_version, bump_version
+
+from .models import ChangeLogEntry, ChangeLogLock
+
+logger = logging.getLogger('securepress.changefeed')
+
+VERSION_NAME = 'core:changelog'
+
+# Entries per batch sent to a client
+BATCH_SIZE = 100
+
+# Recent entries kept in memory per process for streams to read
+BUFFER_SIZE = 1000
+
+POLL_INTERVAL = 1.0
+KEEPALIVE_INTERVAL = 15.0
+
+# Streams close after this long; EventSource reconnects with Last-Event-ID
+MAX_STREAM_SECONDS = 300
+RETRY_MS = 3000
+
+ENTRY_FIELDS = ('id', 'model', 'object_id', 'action', 'url', 'is_public', 'created_at')
+
+VISIBILITY_FIELDS = ('status', 'is_active')
+
+
+def is_public(instance):
+    """Whether an object is publicly visible (published and active)."""
+    return getattr(instance, 'status', 'published') == 'published' and getattr(instance, 'is_active', True)
+
+
+def remember_visibility(instance):
+    """
+    Note whether the stored ``instance`` is public before it is saved or deleted.
+
+    An object that is unpublished or deleted was public until now, so its
+    entry must still reach anonymous clients and the cache purger.
+    """
+    fields = [field.attname for field in instance._meta.concrete_fields if field.attname in VISIBILITY_FIELDS]
+    if instance.pk is None or not fields:
+        return
+    stored = type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+    instance._was_public = bool(stored) and is_public(SimpleNamespace(**stored))
+
+
+def record_change(instance, action):
+    """
+    Append a change log entry for ``instance`` when the current transaction commits.
+
+    The entry is public if the object is public now or was before the change
+    (see :func:`remember_visibility`).
+    """
+    was_public = vars(instance).pop('_was_public', False)
+    get_url = getattr(instance, 'get_absolute_url', None)
+    entry = ChangeLogEntry(
+        model=instance._meta.label_lower,
+        object_id=instance.pk,
+        action=action,
+        url=get_url() if get_url else '',
+        is_public=was_public or is_public(instance),
+    )
+
+    def write():
+        # Serialise writers so entries commit in id order
+        with transaction.atomic():
+            ChangeLogLock.objects.select_for_update().get_or_create(pk=1)
+            entry.save()
+        bump_version(VERSION_NAME)
+
+    transaction.on_commit(write)
+
+
+def serialize_entry(row):
+    """Client representation of an entry from ``values(*ENTRY_FIELDS)``."""
+    return {
+        'seq': row['id'],
+        'model': row['model'],
+        'object_id': row['object_id'],
+        'action': row['action'],
+        'url': row['url'],
+        'is_public': row['is_public'],
+        'created_at': row['created_at'].isoformat(),
+    }
+
+
+async def afetch(after, limit=BATCH_SIZE):
+    """Entries with a sequence number above ``after``, oldest first."""
+    queryset = ChangeLogEntry.objects.filter(id__gt=after).order_by('id').values(*ENTRY_FIELDS)
+    return [serialize_entry(row) async for row in queryset[:limit]]
+
+
+async def alatest_seq():
+    """The newest sequence number, or 0 if the log is empty."""
+    row = await ChangeLogEntry.objects.order_by('-id').values('id').afirst()
+    return row['id'] if row else 0
+
+
+def visible(entries, include_private):
+    return entries if include_private else [entry for entry in entries if entry['is_public']]
+
+
+class ChangeHub:
+    """Per-process fan-out of new change log entries to open streams."""
+
+    def __init__(self):
+        self.buffer = deque(maxlen=BUFFER_SIZE)
+        self.last_seq = 0
+        self.version = None
+        self.subscribers = 0
+        self.loop = None
+        self.condition = None
+        self.ready = None
+        self.task = None
+
+    def start(self):
+        """Start the poller on the running loop unless it is already polling."""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.condition = asyncio.Condition()
+            self.task = None
+        if self.task is None or self.task.done():
+            self.ready = asyncio.Event()
+            self.task = loop.create_task(self.poll())
+
+    async def poll(self):
+        """Load new entries whenever the version counter moves, while anyone listens."""
+        # Start from the current end of the log rather than catching up after idling
+        try:
+            self.buffer.clear()
+            self.version = await aget_version(VERSION_NAME)
+            self.last_seq = await alatest_seq()
+        finally:
+            self.ready.set()
+        while self.subscribers:
+            await asyncio.sleep(POLL_INTERVAL)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception('Change feed poll failed')
+
+    async def refresh(self):
+        version = await aget_version(VERSION_NAME)
+        if version == self.version:
+            return
+        self.version = version
+        while True:
+            entries = await afetch(self.last_seq, BUFFER_SIZE)
+            if not entries:
+                break
+            self.buffer.extend(entries)
+            self.last_seq = entries[-1]['seq']
+        async with self.condition:
+            self.condition.notify_all()
+
+    async def subscribe(self):
+        self.subscribers += 1
+        try:
+            self.start()
+            await self.ready.wait()
+            if self.task.done():
+                self.task.result()
+        except BaseException:
+            self.subscribers -= 1
+            raise
+
+    def unsubscribe(self):
+        self.subscribers -= 1
+
+    async def entries_after(self, after, limit=BATCH_SIZE):
+        """Entries above ``after``, from memory when the buffer covers them."""
+        if after >= self.last_seq:
+            return []
+        if self.buffer and self.buffer[0]['seq'] <= after + 1:
+            return [entry for entry in self.buffer if entry['seq'] > after][:limit]
+        return await afetch(after, limit)
+
+    async def wait(self, after, timeout):
+        """Wait until entries above ``after`` exist or ``timeout`` passes."""
+        async with self.condition:
+            if after < self.last_seq:
+                return
+            try:
+                await asyncio.wait_for(self.condition.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+hub = ChangeHub()
+
+
+def sse_event(seq, entries):
+    return f'id: {seq}\nevent: changes\ndata: {json.dumps(entries)}\n\n'
+
+
+async def stream(since, include_private=False):
+    """
+    Yield Server-Sent Events for entries after ``since``.
+
+    ``since=None`` starts at the current end of the log. Each event carries
+    a batch of entries and the last sequence number as its ``id``.
+    """
+    await hub.subscribe()
+    try:
+        last = hub.last_seq if since is None else since
+        deadline = time.monotonic() + MAX_STREAM_SECONDS
+        yield f'retry: {RETRY_MS}\n\n'
+        while time.monotonic() < deadline:
+            entries = await hub.entries_after(last)
+            if entries:
+                last = entries[-1]['seq']
+                batch = visible(entries, include_private)
+                if batch:
+                    yield sse_event(last, batch)
+                continue
+            waited = time.monotonic()
+            await hub.wait(last, min(KEEPALIVE_INTERVAL, max(deadline - waited, 0)))
+            if time.monotonic() - waited >= KEEPALIVE_INTERVAL:
+                yield ': keepalive\n\n'
+    finally:
+        hub.unsubscribe()
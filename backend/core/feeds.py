@@ -0,0 +1,110 @@
+"""
+RSS and Atom feeds.
+
+Feeds of the latest ``FEED_ITEMS`` dated published posts, site-wide and
+per category and tag, read newest first through the ``(status,
+published_at)`` index. The RSS and Atom files of one feed share an
+artifact group (see :mod:`core.artifacts`). Saving a post invalidates the
+site-wide feed and the feeds of its categories and tags. Category and tag
+feeds are built the first time they are requested.
+"""
+
+from django.conf import settings
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from . import artifacts
+from .models import Post
+
+FORMATS = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+}
+
+# Post lookup for the feeds of each kind of term
+TERM_LOOKUPS = {
+    'category': 'categories',
+    'tag': 'tags',
+}
+
+POSTS_GROUP = 'feed:posts'
+
+# Words of post content used when a post has no excerpt
+SUMMARY_WORDS = 60
+
+
+def term_group(kind, pk):
+    """Artifact group of the feeds of the ``category`` or ``tag`` ``pk``."""
+    return f'feed:{kind}:{pk}'
+
+
+def post_term_groups(post_id):
+    """Groups of the category and tag feeds a post appears in."""
+    groups = []
+    for kind, lookup in TERM_LOOKUPS.items():
+        rows = getattr(Post, lookup).through.objects.filter(post_id=post_id)
+        groups += [term_group(kind, term_id) for term_id in rows.values_list(f'{kind}_id', flat=True)]
+    return groups
+
+
+def group(term):
+    if term is None:
+        return POSTS_GROUP
+    return term_group(term._meta.model_name, term.pk)
+
+
+def name(term, fmt):
+    if term is None:
+        return f'feeds/posts.{fmt}'
+    return f'feeds/{term._meta.model_name}-{term.pk}.{fmt}'
+
+
+def absolute(path):
+    return settings.SITE_URL.rstrip('/') + path
+
+
+def feed_path(term, fmt):
+    if term is None:
+        return f'/feeds/posts.{fmt}'
+    return f'/feeds/{term._meta.model_name}/{term.slug}.{fmt}'
+
+
+def build(term, fmt):
+    """The XML of the ``fmt`` feed of ``term`` (a category or tag), or of all posts."""
+    posts = Post.objects.filter(status='published', published_at__isnull=False)
+    if term is None:
+        title, link = settings.SITE_NAME, absolute('/blog')
+    else:
+        title, link = f'{settings.SITE_NAME}: {term.name}', absolute(term.get_absolute_url())
+        posts = posts.filter(**{TERM_LOOKUPS[term._meta.model_name]: term})
+    feed = FORMATS[fmt](
+        title=title,
+        link=link,
+        description=getattr(term, 'description', '') or title,
+        language=settings.LANGUAGE_CODE,
+        feed_url=absolute(feed_path(term, fmt)),
+    )
+    posts = (
+        posts.select_related('author')
+        .prefetch_related('categories', 'tags')
+        .order_by('-published_at', '-id')[:settings.FEED_ITEMS]
+    )
+    for post in posts:
+        url = absolute(post.get_absolute_url())
+        feed.add_item(
+            title=post.title,
+            link=url,
+            unique_id=url,
+            description=post.excerpt or Truncator(strip_tags(post.content)).words(SUMMARY_WORDS),
+            pubdate=post.published_at,
+            updateddate=post.updated_at,
+            author_name=post.author.get_full_name() or None,
+            categories=[category.name for category in post.categories.all()] + [tag.name for tag in post.tags.all()],
+        )
+    return feed.writeString('utf-8').encode()
+
+
+def load(term, fmt):
+    """The gzipped ``fmt`` feed of ``term``, or of all posts."""
+    return artifacts.load(name(term, fmt), group(term), lambda: build(term, fmt))
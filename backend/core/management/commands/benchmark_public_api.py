@@ -0,0 +1,101 @@
+"""
+Compare the async public endpoints with the equivalent sync viewsets.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+
+from core.models import Page, Post
+from themes.models import Menu
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Send concurrent GETs through the ASGI handler to the async /api/public/ '
+        'endpoints and the matching sync viewsets, and report throughput and latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once.')
+        parser.add_argument('--json', action='store_true', help='Output machine-readable JSON.')
+
+    def endpoints(self):
+        """``(name, async path, sync path)`` for each endpoint with data to serve."""
+        endpoints = [
+            ('post list', '/api/public/posts/', '/api/posts/'),
+            ('page list', '/api/public/pages/', '/api/pages/'),
+            ('category list', '/api/public/categories/', '/api/categories/'),
+        ]
+        post = Post.objects.filter(status='published').only('slug').first()
+        if post:
+            endpoints.append(('post detail', f'/api/public/posts/{post.slug}/', f'/api/posts/{post.slug}/'))
+        page = Page.objects.filter(status='published').only('slug').first()
+        if page:
+            endpoints.append(('page detail', f'/api/public/pages/{page.slug}/', f'/api/pages/{page.slug}/'))
+        menu = Menu.objects.exclude(location='').only('location').first()
+        if menu:
+            endpoints.append((
+                'menu', f'/api/public/menus/{menu.location}/', f'/api/menus/{menu.location}/',
+            ))
+        return endpoints
+
+    async def run(self, path, total, concurrency):
+        """Issue ``total`` GETs to ``path``, at most ``concurrency`` at a time."""
+        host = next((host for host in settings.ALLOWED_HOSTS if host and '*' not in host), 'localhost')
+        client = AsyncClient(headers={'host': host.lstrip('.')})
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise CommandError(f'GET {path} returned {response.status_code}')
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        return {
+            'requests_per_second': round(total / elapsed, 1),
+            'p50_ms': round(statistics.median(latencies) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        }
+
+    def handle(self, *args, **options):
+        total = max(options['requests'], 1)
+        concurrency = max(options['concurrency'], 1)
+        results = []
+        for name, async_path, sync_path in self.endpoints():
+            results.append({
+                'endpoint': name,
+                'async': asyncio.run(self.run(async_path, total, concurrency)),
+                'sync': asyncio.run(self.run(sync_path, total, concurrency)),
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f'{total} requests per endpoint, concurrency {concurrency}')
+        self.stdout.write(f"{'endpoint':<15}{'':>7}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for result in results:
+            for kind in ('async', 'sync'):
+                stats = result[kind]
+                self.stdout.write(
+                    f"{result['endpoint'] if kind == 'async' else '':<15}{kind:>7}"
+                    f"{stats['requests_per_second']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+                )
@@ -0,0 +1,19 @@
+"""
+Recompute the related posts stored on every post.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import related
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute Post.related_posts for every post from shared categories and tags. '
+        'Signals keep the lists current between runs.'
+    )
+    
+    def handle(self, *args, **options):
+        changed = related.build_all()
+        self.stdout.write(f'Updated the related posts of {changed} post(s).')
+        self.stdout.write(self.style.SUCCESS('Related posts built.'))
@@ -0,0 +1,21 @@
+"""
+Generate the OpenAPI schema and store it in the cache.
+"""
+
+from django.core.management.base import BaseCommand
+
+from securepress.schema import build_schema_artifacts, code_version
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema for the current code version and cache it (run at deploy).'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--api-version', help='API version to generate the schema for.')
+        parser.add_argument('--lang', help='Language to generate the schema in.')
+    
+    def handle(self, *args, **options):
+        etags = build_schema_artifacts(api_version=options['api_version'], lang=options['lang'])
+        self.stdout.write(f'Code version {code_version()}')
+        for fmt, etag in etags.items():
+            self.stdout.write(self.style.SUCCESS(f'Cached {fmt} schema, ETag {etag}'))
@@ -0,0 +1,27 @@
+"""
+Build stale sitemap and feed files.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import artifacts, feeds, sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        'Write stale sitemap files and the site-wide feeds to SYNDICATION_ROOT and delete sitemap '
+        'files of segments that no longer exist. Category and tag feeds are built on request.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild every file, stale or not.')
+    
+    def handle(self, *args, **options):
+        if options['force']:
+            artifacts.invalidate(feeds.POSTS_GROUP)
+        built, removed = sitemaps.build_all(force=options['force'])
+        for fmt in feeds.FORMATS:
+            _, was_built = artifacts.ensure(feeds.name(None, fmt), feeds.POSTS_GROUP, lambda: feeds.build(None, fmt))
+            built += was_built
+        self.stdout.write(f'Built {built} file(s); removed {removed} stale sitemap file(s).')
+        self.stdout.write(self.style.SUCCESS(f'Sitemaps and feeds are current in {artifacts.root()}.'))
@@ -0,0 +1,33 @@
+"""
+Fold post view buckets into Post.view_count and the trending scores.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import analytics, trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Add new view buckets to Post.view_count and the trending scores, merge folded buckets '
+        'per post, day and referrer, and optionally delete buckets older than --keep-days.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=analytics.FOLD_BATCH_SIZE, help='Buckets folded per transaction.',
+        )
+        parser.add_argument('--keep-days', type=int, help='Delete folded buckets older than this many days.')
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or (options['keep_days'] is not None and options['keep_days'] < 1):
+            raise CommandError('--batch-size and --keep-days must be positive.')
+        views = analytics.fold_views(options['batch_size'])
+        ranked = trending.update(views)
+        merged = analytics.compact_buckets()
+        self.stdout.write(f'Folded {sum(views.values())} view(s); merged away {merged} bucket row(s).')
+        self.stdout.write(f'Trending scores cover {ranked} post(s).')
+        if options['keep_days'] is not None:
+            deleted = analytics.prune_buckets(options['keep_days'])
+            self.stdout.write(f'Deleted {deleted} bucket row(s) older than {options["keep_days"]} days.')
+        self.stdout.write(self.style.SUCCESS('Post views folded.'))
@@ -0,0 +1,117 @@
+"""
+Report the startup cost of enabled plugins.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter. Django imports each app package and its
+# models through django.apps.config.import_module during setup; wrapping
+# it attributes time, traced memory and newly loaded modules to the
+# plugin being imported. Lazily loaded URLs are timed separately.
+PROBE = '''
+import json, sys, time, tracemalloc
+import django
+import django.apps.config as app_config
+from django.conf import settings
+plugins = {plugin.name for plugin in settings.PLUGINS}
+stats = {name: {"seconds": 0.0, "memory": 0, "modules": 0, "urls": None} for name in plugins}
+original = app_config.import_module
+
+def timed_import(module):
+    name = module.split(".")[0]
+    if name not in plugins or module in sys.modules or tracemalloc.is_tracing():
+        return original(module)
+    before = len(sys.modules)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        return original(module)
+    finally:
+        stats[name]["seconds"] += time.perf_counter() - started
+        stats[name]["memory"] += tracemalloc.get_traced_memory()[0]
+        stats[name]["modules"] += len(sys.modules) - before
+        tracemalloc.stop()
+
+app_config.import_module = timed_import
+django.setup()
+app_config.import_module = original
+for plugin in settings.PLUGINS:
+    if plugin.has_module("urls"):
+        started = time.perf_counter()
+        __import__(plugin.name + ".urls")
+        stats[plugin.name]["urls"] = time.perf_counter() - started
+print(json.dumps(stats))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure the import time and memory each enabled plugin adds to startup.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help='Startup runs; the fastest per plugin is kept.')
+        parser.add_argument('--json', action='store_true', help='Output machine-readable JSON.')
+    
+    def probe(self):
+        """Start Django in a subprocess and return per-plugin startup costs."""
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'securepress.settings.development'),
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Startup failed:\n{result.stderr[-4000:]}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
+    
+    def handle(self, *args, **options):
+        enabled = [plugin.strip() for plugin in settings.PLUGINS_ENABLED if plugin.strip()]
+        loaded = {plugin.name: plugin for plugin in settings.PLUGINS}
+        if not enabled:
+            self.stdout.write('No plugins enabled (set PLUGINS_ENABLED).')
+            return
+        
+        runs = [self.probe() for _ in range(max(options['repeat'], 1))] if loaded else []
+        report = []
+        for name in enabled:
+            plugin = loaded.get(name)
+            entry = {'plugin': name, 'loaded': plugin is not None}
+            if plugin is not None:
+                best = min((run[name] for run in runs), key=lambda stats: stats['seconds'])
+                entry.update({
+                    'version': plugin.version,
+                    'requires': plugin.requires.get('securepress', ''),
+                    'import_ms': round(best['seconds'] * 1000, 1),
+                    'memory_kib': round(best['memory'] / 1024, 1),
+                    'modules': best['modules'],
+                    'lazy_urls_ms': round(best['urls'] * 1000, 1) if best['urls'] is not None else None,
+                })
+            report.append(entry)
+        
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'securepress_version': settings.SECUREPRESS_VERSION,
+                'plugins': report,
+            }, indent=2))
+            return
+        
+        self.stdout.write(f'SecurePress {settings.SECUREPRESS_VERSION}')
+        for entry in report:
+            if not entry['loaded']:
+                self.stdout.write(self.style.WARNING(f"{entry['plugin']}: not loaded (see startup warnings)"))
+                continue
+            urls = f", urls {entry['lazy_urls_ms']} ms on first request" if entry['lazy_urls_ms'] is not None else ''
+            self.stdout.write(
+                f"{entry['plugin']} {entry['version']}: {entry['import_ms']} ms, "
+                f"{entry['memory_kib']} KiB, {entry['modules']} module(s){urls}"
+            )
@@ -0,0 +1,34 @@
+"""
+Delete old change feed entries.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = 'Delete change log entries older than --days (clients further behind must resync).'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Keep entries from this many days.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per statement.')
+    
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--days and --batch-size must be positive.')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted = 0
+        while True:
+            ids = list(
+                ChangeLogEntry.objects.filter(created_at__lt=cutoff)
+                .order_by('id')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            deleted += ChangeLogEntry.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change log entries.'))
@@ -0,0 +1,27 @@
+"""
+Delete old post and page revisions.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import revisions
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete revisions beyond the latest --keep of each post and page once they are older than --days, '
+        'and the revisions of deleted posts and pages.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, default=50, help='Revisions always kept per post or page.')
+        parser.add_argument('--days', type=int, default=90, help='Keep revisions from this many days.')
+        parser.add_argument(
+            '--batch-size', type=int, default=revisions.PRUNE_BATCH_SIZE, help='Rows deleted per statement.',
+        )
+    
+    def handle(self, *args, **options):
+        if options['keep'] < 1 or options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--keep, --days and --batch-size must be positive.')
+        deleted = revisions.prune(options['keep'], options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} revisions.'))
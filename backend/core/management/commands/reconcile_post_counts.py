@@ -0,0 +1,18 @@
+"""
+Recompute the post counts of categories and tags.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core import post_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute published_post_count and total_post_count of every category and tag '
+        'from the post memberships, e.g. after bulk imports or queryset updates.'
+    )
+    
+    def handle(self, *args, **options):
+        corrected = post_counts.reconcile()
+        self.stdout.write(self.style.SUCCESS(f'Post counts reconciled; corrected {corrected} row(s).'))
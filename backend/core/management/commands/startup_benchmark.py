@@ -0,0 +1,156 @@
+"""
+Measure how long a process takes to start Django.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules that should only be imported when first needed
+DEFERRED_MODULES = (
+    'PIL',
+    'drf_spectacular.generators',
+    'drf_spectacular.views',
+    'marketplace.scanner',
+)
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)')
+
+# Runs in a fresh interpreter under -X importtime. Django imports each
+# app's package and models through django.apps.config.import_module, which
+# -X importtime does not report, so those imports are timed here.
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import django
+import django.apps.config as app_config
+from django.conf import settings
+modules = {}
+original = app_config.import_module
+
+def timed_import(module):
+    began = time.perf_counter()
+    try:
+        return original(module)
+    finally:
+        modules[module] = modules.get(module, 0.0) + time.perf_counter() - began
+
+app_config.import_module = timed_import
+django.setup()
+app_config.import_module = original
+setup = time.perf_counter() - started
+
+from django.apps import apps
+began = time.perf_counter()
+__import__(settings.ROOT_URLCONF)
+urlconf = time.perf_counter() - began
+
+names = sorted((config.name for config in apps.get_app_configs()), key=len, reverse=True)
+per_app = {}
+for module, seconds in modules.items():
+    app = next((name for name in names if module == name or module.startswith(name + '.')), module)
+    per_app[app] = per_app.get(app, 0.0) + seconds
+deferred = sorted(
+    {name for name in DEFERRED if name in sys.modules}
+    | {config.name + '.admin' for config in apps.get_app_configs() if config.name + '.admin' in sys.modules}
+)
+print(json.dumps({'setup': setup, 'urlconf': urlconf, 'apps': per_app, 'loaded': deferred}))
+'''
+
+
+def parse_importtime(output):
+    """Sum ``-X importtime`` self times (microseconds) per top-level package."""
+    totals = Counter()
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            totals[match.group(3).split('.')[0]] += int(match.group(1))
+    return totals
+
+
+class Command(BaseCommand):
+    help = 'Report per-app and per-package startup import costs, optionally against a budget.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help='Startup runs; the fastest is reported.')
+        parser.add_argument('--top', type=int, default=15, help='Number of packages to list.')
+        parser.add_argument(
+            '--budget-ms',
+            type=float,
+            help='Fail if startup (setup plus URLconf import) exceeds this, '
+                 'or if a deferred module was imported at startup.',
+        )
+        parser.add_argument('--json', action='store_true', help='Output machine-readable JSON.')
+
+    def probe(self):
+        """Start Django once in a subprocess and return its measurements."""
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'securepress.settings.development'),
+        )
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'DEFERRED = {DEFERRED_MODULES!r}\n{PROBE}'],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Startup failed:\n{result.stderr[-4000:]}')
+        run = json.loads(result.stdout.strip().splitlines()[-1])
+        run['packages'] = parse_importtime(result.stderr)
+        return run
+
+    def handle(self, *args, **options):
+        runs = [self.probe() for _ in range(max(options['repeat'], 1))]
+        best = min(runs, key=lambda run: run['setup'] + run['urlconf'])
+        total_ms = (best['setup'] + best['urlconf']) * 1000
+        report = {
+            'total_ms': round(total_ms, 1),
+            'setup_ms': round(best['setup'] * 1000, 1),
+            'urlconf_ms': round(best['urlconf'] * 1000, 1),
+            'apps': {
+                app: round(seconds * 1000, 1)
+                for app, seconds in sorted(best['apps'].items(), key=lambda item: -item[1])
+            },
+            'packages': {
+                package: round(micros / 1000, 1)
+                for package, micros in best['packages'].most_common(options['top'])
+            },
+            'deferred_loaded': best['loaded'],
+            'budget_ms': options['budget_ms'],
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(
+                f"Startup: {report['total_ms']} ms "
+                f"(django.setup {report['setup_ms']} ms, URLconf {report['urlconf_ms']} ms)"
+            )
+            self.stdout.write('\nApps (cumulative import of package and models):')
+            for app, ms in report['apps'].items():
+                self.stdout.write(f'  {ms:8.1f} ms  {app}')
+            self.stdout.write('\nPackages (self time):')
+            for package, ms in report['packages'].items():
+                self.stdout.write(f'  {ms:8.1f} ms  {package}')
+            if report['deferred_loaded']:
+                self.stdout.write(self.style.WARNING(
+                    '\nImported at startup but meant to be deferred: ' + ', '.join(report['deferred_loaded'])
+                ))
+
+        budget = options['budget_ms']
+        if budget is not None:
+            if report['deferred_loaded']:
+                raise CommandError(
+                    'Deferred modules imported at startup: ' + ', '.join(report['deferred_loaded'])
+                )
+            if total_ms > budget:
+                raise CommandError(f'Startup took {total_ms:.1f} ms, over the {budget:.1f} ms budget.')
+            self.stdout.write(self.style.SUCCESS(f'Within the {budget:.1f} ms startup budget.'))
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(help_text='Model label, e.g. core.post.', max_length=100, verbose_name='model')),
+                ('object_id', models.BigIntegerField(verbose_name='object ID')),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10, verbose_name='action')),
+                ('url', models.CharField(blank=True, help_text='Public URL of the object, for cache purging.', max_length=500, verbose_name='URL')),
+                ('is_public', models.BooleanField(default=True, help_text='Whether the object is publicly visible; others are only shown to editors.', verbose_name='is public')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='created at')),
+            ],
+            options={
+                'verbose_name': 'change log entry',
+                'verbose_name_plural': 'change log entries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['model', 'object_id'], name='core_change_model_af38b3_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-19 17:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_changelogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewBucket',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField(verbose_name='day')),
+                ('referrer', models.CharField(blank=True, help_text='Referring host, or empty for direct visits.', max_length=255, verbose_name='referrer')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='views')),
+                ('folded', models.BooleanField(default=False, help_text='Whether these views have been added to the post view count.', verbose_name='folded')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_buckets', to='core.post', verbose_name='post')),
+            ],
+            options={
+                'verbose_name': 'post view bucket',
+                'verbose_name_plural': 'post view buckets',
+                'indexes': [models.Index(fields=['day', 'post'], name='core_postvi_day_b059ee_idx'), models.Index(fields=['post', 'day'], name='core_postvi_post_id_6c2f4d_idx'), models.Index(condition=models.Q(('folded', False)), fields=['id'], name='core_viewbucket_unfolded')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_postviewbucket'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', '-view_count'], name='core_post_status_73184b_idx'),
+        ),
+    ]
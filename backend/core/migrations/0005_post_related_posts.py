@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_post_view_count_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='related_posts',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Most similar published posts by shared categories and tags, maintained by core.related.', verbose_name='related posts'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-19 13:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_posts(apps, schema_editor):
+    Post = apps.get_model('core', 'Post')
+    for model_name, through, column in (
+        ('Category', Post.categories.through, 'category_id'),
+        ('Tag', Post.tags.through, 'tag_id'),
+    ):
+        def counted(**filters):
+            rows = (
+                through.objects.filter(**{column: OuterRef('pk')}, **filters)
+                .values(column)
+                .annotate(count=Count('post_id'))
+                .values('count')
+            )
+            return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+        apps.get_model('core', model_name).objects.update(
+            total_post_count=counted(),
+            published_post_count=counted(post__status='published'),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_post_related_posts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of published posts in this category, maintained by core.post_counts.', verbose_name='published post count'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='total_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of posts of any status in this category.', verbose_name='total post count'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of published posts in this tag, maintained by core.post_counts.', verbose_name='published post count'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='total_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of posts of any status in this tag.', verbose_name='total post count'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['published_post_count'], name='core_catego_publish_cf0bcb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['total_post_count'], name='core_catego_total_p_e57db1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['published_post_count'], name='core_tag_publish_9a5149_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['total_post_count'], name='core_tag_total_p_0df298_idx'),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_term_post_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentRevision',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(help_text='Model label, e.g. core.post.', max_length=100, verbose_name='model')),
+                ('object_id', models.BigIntegerField(verbose_name='object ID')),
+                ('number', models.PositiveIntegerField(verbose_name='number')),
+                ('is_snapshot', models.BooleanField(default=False, verbose_name='is snapshot')),
+                ('data', models.BinaryField(verbose_name='data')),
+                ('size', models.PositiveIntegerField(default=0, help_text='Compressed size of the stored data.', verbose_name='size (bytes)')),
+                ('changed_fields', models.JSONField(blank=True, default=list, help_text='Fields that differ from the previous revision.', verbose_name='changed fields')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='content_revisions', to=settings.AUTH_USER_MODEL, verbose_name='author')),
+            ],
+            options={
+                'verbose_name': 'content revision',
+                'verbose_name_plural': 'content revisions',
+                'ordering': ['model', 'object_id', '-number'],
+                'indexes': [models.Index(fields=['model', 'object_id', 'is_snapshot', 'number'], name='core_conten_model_baf238_idx'), models.Index(fields=['created_at'], name='core_conten_created_4084f0_idx')],
+                'unique_together': {('model', 'object_id', 'number')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_contentrevision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'change log lock',
+                'verbose_name_plural': 'change log locks',
+            },
+        ),
+    ]
@@ -4,9 +4,12 @@ Models package initialization.
 Imports all models for easier access.
 """
 
+from .analytics import PostViewBucket
+from .changelog import ChangeLogEntry, ChangeLogLock
 from .media import Media
 from .page import Page
 from .post import Category, Post, Tag
+from .revision import ContentRevision
 from .user import User
 
-__all__ = ['User', 'Post', 'Page', 'Media', 'Category', 'Tag']
+__all__ = ['User', 'Post', 'Page', 'Media', 'Category', 'Tag', 'ChangeLogEntry', 'ChangeLogLock', 'PostViewBucket', 'ContentRevision']
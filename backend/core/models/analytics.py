@@ -0,0 +1,56 @@
+"""
+Analytics models for SecurePress.
+
+Post views are stored as daily rollups rather than one row per view.
+"""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class PostViewBucket(models.Model):
+    """
+    Views of one post on one day from one referrer.
+    
+    Rows are only appended, one per buffered flush. ``fold_post_views``
+    adds unfolded rows to ``Post.view_count`` and then merges folded rows
+    so each post, day and referrer ends up with a single row.
+    """
+    
+    id = models.BigAutoField(primary_key=True)
+    
+    post = models.ForeignKey(
+        'Post',
+        on_delete=models.CASCADE,
+        related_name='view_buckets',
+        verbose_name=_('post')
+    )
+    
+    day = models.DateField(_('day'))
+    
+    referrer = models.CharField(
+        _('referrer'),
+        max_length=255,
+        blank=True,
+        help_text=_('Referring host, or empty for direct visits.')
+    )
+    
+    views = models.PositiveIntegerField(_('views'), default=0)
+    
+    folded = models.BooleanField(
+        _('folded'),
+        default=False,
+        help_text=_('Whether these views have been added to the post view count.')
+    )
+    
+    class Meta:
+        verbose_name = _('post view bucket')
+        verbose_name_plural = _('post view buckets')
+        indexes = [
+            models.Index(fields=['day', 'post']),
+            models.Index(fields=['post', 'day']),
+            models.Index(fields=['id'], condition=models.Q(folded=False), name='core_viewbucket_unfolded'),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id} {self.day} {self.referrer or "direct"}: {self.views}'
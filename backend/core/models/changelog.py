@@ -0,0 +1,75 @@
+"""
+Change log model for SecurePress.
+
+An append-only record of content changes, read by the change feed.
+"""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One change to a content object.
+    
+    The primary key doubles as the feed's sequence number: clients resume
+    from the last ``id`` they have seen. Entries are written while holding
+    the :class:`ChangeLogLock` row, so ids become visible in order.
+    """
+    
+    ACTION_CHOICES = [
+        ('created', _('Created')),
+        ('updated', _('Updated')),
+        ('deleted', _('Deleted')),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    
+    model = models.CharField(
+        _('model'),
+        max_length=100,
+        help_text=_('Model label, e.g. core.post.')
+    )
+    
+    object_id = models.BigIntegerField(_('object ID'))
+    
+    action = models.CharField(_('action'), max_length=10, choices=ACTION_CHOICES)
+    
+    url = models.CharField(
+        _('URL'),
+        max_length=500,
+        blank=True,
+        help_text=_('Public URL of the object, for cache purging.')
+    )
+    
+    is_public = models.BooleanField(
+        _('is public'),
+        default=True,
+        help_text=_('Whether the object is publicly visible; others are only shown to editors.')
+    )
+    
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True, db_index=True)
+    
+    class Meta:
+        verbose_name = _('change log entry')
+        verbose_name_plural = _('change log entries')
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['model', 'object_id']),
+        ]
+    
+    def __str__(self):
+        return f'#{self.pk} {self.model}:{self.object_id} {self.action}'
+
+
+class ChangeLogLock(models.Model):
+    """
+    Single row locked while a change log entry is written.
+    
+    Without it, concurrent writers can commit ids out of order and a client
+    that has already read past a slow writer's id would never see its entry.
+    """
+    
+    class Meta:
+        verbose_name = _('change log lock')
+        verbose_name_plural = _('change log locks')
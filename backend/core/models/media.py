@@ -12,7 +12,6 @@ from django.conf import settings
 from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from PIL import Image
 
 
 def media_upload_path(instance, filename):
@@ -166,6 +165,10 @@ class Media(models.Model):
             ext = Path(self.file.name).suffix.lower().lstrip('.')
             if ext in self.ALLOWED_IMAGE_EXTENSIONS:
                 self.file_type = 'image'
+                # Pillow is imported here rather than at module level so that
+                # processes which never handle uploads do not load it
+                from PIL import Image
+                
                 # Extract image dimensions with security checks
                 try:
                     # Verify file size before processing (prevent image bombs)
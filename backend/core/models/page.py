@@ -158,6 +158,10 @@ class Page(models.Model):
         """Check if the page is published."""
         return self.status == 'published'
     
+    def get_absolute_url(self):
+        """Return the public URL of the page."""
+        return f'/{self.slug}'
+    
     def get_breadcrumb(self):
         """Get the breadcrumb trail for this page."""
         breadcrumb = [self]
@@ -9,6 +9,27 @@ from django.db import models
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
+# Maintained by core.post_counts with F() updates
+POST_COUNT_FIELDS = ('published_post_count', 'total_post_count')
+
+
+def without_post_counts(instance, kwargs):
+    """
+    Save arguments that leave the post counts of an existing term untouched.
+
+    Writing back the counts loaded with the instance would undo adjustments
+    made since, so a plain ``save()`` of a stored category or tag updates
+    every other loaded field instead. Explicit ``update_fields`` are kept.
+    """
+    if instance._state.adding or kwargs.get('force_insert') or kwargs.get('update_fields') is not None:
+        return kwargs
+    deferred = instance.get_deferred_fields()
+    kwargs['update_fields'] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in POST_COUNT_FIELDS and field.attname not in deferred
+    ]
+    return kwargs
+
 
 class Post(models.Model):
     """
@@ -130,6 +151,14 @@ class Post(models.Model):
         help_text=_('Whether comments are allowed on this post.')
     )
     
+    related_posts = models.JSONField(
+        _('related posts'),
+        default=list,
+        blank=True,
+        editable=False,
+        help_text=_('Most similar published posts by shared categories and tags, maintained by core.related.')
+    )
+    
     # Metadata
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
@@ -142,6 +171,7 @@ class Post(models.Model):
             models.Index(fields=['slug']),
             models.Index(fields=['status', 'published_at']),
             models.Index(fields=['author', 'status']),
+            models.Index(fields=['status', '-view_count']),
         ]
     
     def __str__(self):
@@ -158,6 +188,10 @@ class Post(models.Model):
         """Check if the post is published."""
         return self.status == 'published'
     
+    def get_absolute_url(self):
+        """Return the public URL of the post."""
+        return f'/blog/{self.slug}'
+    
     def can_be_edited_by(self, user):
         """Check if a user can edit this post."""
         if user.is_superuser or user.is_editor:
@@ -198,21 +232,43 @@ class Category(models.Model):
         help_text=_('Parent category for hierarchical organization.')
     )
     
+    published_post_count = models.PositiveIntegerField(
+        _('published post count'),
+        default=0,
+        editable=False,
+        help_text=_('Number of published posts in this category, maintained by core.post_counts.')
+    )
+    
+    total_post_count = models.PositiveIntegerField(
+        _('total post count'),
+        default=0,
+        editable=False,
+        help_text=_('Number of posts of any status in this category.')
+    )
+    
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     
     class Meta:
         verbose_name = _('category')
         verbose_name_plural = _('categories')
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['published_post_count']),
+            models.Index(fields=['total_post_count']),
+        ]
     
     def __str__(self):
         return self.name
     
     def save(self, *args, **kwargs):
-        """Auto-generate slug if not provided."""
+        """Auto-generate slug if not provided; never overwrite the post counts."""
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        super().save(*args, **without_post_counts(self, kwargs))
+    
+    def get_absolute_url(self):
+        """Return the public URL of the category archive."""
+        return f'/category/{self.slug}'
 
 
 class Tag(models.Model):
@@ -232,18 +288,40 @@ class Tag(models.Model):
         help_text=_('URL-friendly tag name.')
     )
     
+    published_post_count = models.PositiveIntegerField(
+        _('published post count'),
+        default=0,
+        editable=False,
+        help_text=_('Number of published posts in this tag, maintained by core.post_counts.')
+    )
+    
+    total_post_count = models.PositiveIntegerField(
+        _('total post count'),
+        default=0,
+        editable=False,
+        help_text=_('Number of posts of any status in this tag.')
+    )
+    
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     
     class Meta:
         verbose_name = _('tag')
         verbose_name_plural = _('tags')
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['published_post_count']),
+            models.Index(fields=['total_post_count']),
+        ]
     
     def __str__(self):
         return self.name
     
     def save(self, *args, **kwargs):
-        """Auto-generate slug if not provided."""
+        """Auto-generate slug if not provided; never overwrite the post counts."""
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        super().save(*args, **without_post_counts(self, kwargs))
+    
+    def get_absolute_url(self):
+        """Return the public URL of the tag archive."""
+        return f'/tag/{self.slug}'
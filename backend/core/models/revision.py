@@ -0,0 +1,73 @@
+"""
+Content revision model for SecurePress.
+
+Revision history of posts and pages, stored as compressed deltas between
+periodic full snapshots.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ContentRevision(models.Model):
+    """
+    One revision of the text fields of a post or page.
+    
+    Snapshots store every revisioned field; other revisions store the
+    changes from the previous revision. Either way ``data`` is
+    zlib-compressed JSON, so listing revisions should defer it.
+    """
+    
+    id = models.BigAutoField(primary_key=True)
+    
+    model = models.CharField(
+        _('model'),
+        max_length=100,
+        help_text=_('Model label, e.g. core.post.')
+    )
+    
+    object_id = models.BigIntegerField(_('object ID'))
+    
+    number = models.PositiveIntegerField(_('number'))
+    
+    is_snapshot = models.BooleanField(_('is snapshot'), default=False)
+    
+    data = models.BinaryField(_('data'))
+    
+    size = models.PositiveIntegerField(
+        _('size (bytes)'),
+        default=0,
+        help_text=_('Compressed size of the stored data.')
+    )
+    
+    changed_fields = models.JSONField(
+        _('changed fields'),
+        default=list,
+        blank=True,
+        help_text=_('Fields that differ from the previous revision.')
+    )
+    
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='content_revisions',
+        verbose_name=_('author')
+    )
+    
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('content revision')
+        verbose_name_plural = _('content revisions')
+        ordering = ['model', 'object_id', '-number']
+        unique_together = [['model', 'object_id', 'number']]
+        indexes = [
+            models.Index(fields=['model', 'object_id', 'is_snapshot', 'number']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.model}:{self.object_id} r{self.number}'
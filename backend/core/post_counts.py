@@ -0,0 +1,124 @@
+"""
+Post counts of categories and tags.
+
+``Category`` and ``Tag`` store ``total_post_count`` and
+``published_post_count`` so tag clouds and category lists don't count
+through-table rows per request. Signal handlers in ``core.signals`` adjust
+the counts with ``F()`` updates when:
+
+* posts are added to or removed from a category or tag, in either direction;
+* a post moves into or out of the published status;
+* a post is deleted.
+
+The status is always read from the database, so a serializer that changes
+``status`` and the terms in one request counts each change once. Queryset
+``update()`` and raw SQL bypass signals. ``manage.py reconcile_post_counts``
+recomputes every count with one ``UPDATE`` per model.
+"""
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Category, Post, Tag
+
+# (term model, through model, term column)
+MEMBERSHIPS = (
+    (Category, Post.categories.through, 'category_id'),
+    (Tag, Post.tags.through, 'tag_id'),
+)
+
+
+def membership(model):
+    """The through model and term column for ``Category`` or ``Tag``."""
+    for term_model, through, column in MEMBERSHIPS:
+        if term_model is model:
+            return through, column
+    raise LookupError(model)
+
+
+def adjust(model, term_ids, total=0, published=0):
+    """Add ``total`` and ``published`` to the counts of ``term_ids``."""
+    term_ids = list(term_ids)
+    if not term_ids or not (total or published):
+        return
+    model.objects.filter(pk__in=term_ids).update(
+        total_post_count=F('total_post_count') + total,
+        published_post_count=F('published_post_count') + published,
+    )
+
+
+def is_published(post_id):
+    """Whether the stored post is published."""
+    return Post.objects.filter(pk=post_id, status='published').exists()
+
+
+def post_terms(post_id):
+    """``[(model, term ids)]`` of the stored post's categories and tags."""
+    return [
+        (model, list(through.objects.filter(post_id=post_id).values_list(column, flat=True)))
+        for model, through, column in MEMBERSHIPS
+    ]
+
+
+def posts_added(model, post_id, term_ids):
+    """A post was added to ``term_ids``."""
+    adjust(model, term_ids, 1, int(is_published(post_id)))
+
+
+def posts_removed(model, post_id, term_ids):
+    """A post is about to leave ``term_ids`` (``None`` for all of them)."""
+    through, column = membership(model)
+    rows = through.objects.filter(post_id=post_id)
+    if term_ids is not None:
+        rows = rows.filter(**{f'{column}__in': list(term_ids)})
+    sign = -int(is_published(post_id))
+    adjust(model, rows.values_list(column, flat=True), -1, sign)
+
+
+def term_gained(model, term_id, post_ids):
+    """Posts were added to the category or tag ``term_id``."""
+    post_ids = list(post_ids)
+    published = Post.objects.filter(pk__in=post_ids, status='published').count()
+    adjust(model, [term_id], len(post_ids), published)
+
+
+def term_losing(model, term_id, post_ids):
+    """Posts (``None`` for all) are about to leave the category or tag ``term_id``."""
+    through, column = membership(model)
+    rows = through.objects.filter(**{column: term_id})
+    if post_ids is not None:
+        rows = rows.filter(post_id__in=list(post_ids))
+    members = Post.objects.filter(pk__in=rows.values('post_id'))
+    adjust(model, [term_id], -members.count(), -members.filter(status='published').count())
+
+
+def status_changed(post_id, published):
+    """A post moved into (``published=True``) or out of the published status."""
+    for model, term_ids in post_terms(post_id):
+        adjust(model, term_ids, published=1 if published else -1)
+
+
+def post_deleting(post_id):
+    """A post is about to be deleted along with its memberships."""
+    published = -int(is_published(post_id))
+    for model, term_ids in post_terms(post_id):
+        adjust(model, term_ids, -1, published)
+
+
+def reconcile():
+    """Recompute every count from the through tables. Returns the number of rows corrected."""
+    corrected = 0
+    for model, through, column in MEMBERSHIPS:
+        def counted(**filters):
+            rows = (
+                through.objects.filter(**{column: OuterRef('pk')}, **filters)
+                .values(column)
+                .annotate(count=Count('post_id'))
+                .values('count')
+            )
+            return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+        actual = model.objects.annotate(total=counted(), published=counted(post__status='published'))
+        corrected += actual.exclude(total_post_count=F('total'), published_post_count=F('published')).count()
+        model.objects.update(total_post_count=counted(), published_post_count=counted(post__status='published'))
+    return corrected
@@ -0,0 +1,241 @@
+"""
+Related posts.
+
+Two posts are related through the categories and tags (terms) they share.
+Similarity is a weighted Jaccard index: the summed weight of shared terms
+over the summed weight of all terms of either post. A term's weight is its
+inverse document frequency, so a niche tag counts for more than a category
+half the site uses. Terms on more than ``RELATED_POSTS_MAX_TERM_POSTS``
+published posts are ignored when looking for neighbours.
+
+The top ``RELATED_POSTS_COUNT`` published neighbours of every post are
+stored with their slug and title in ``Post.related_posts``, so serializing
+them costs no queries. ``manage.py build_related_posts`` computes every
+list using inverted indexes over the taxonomy tables. Signals keep the
+lists current in between. When a post is saved, deleted or re-tagged, its
+own list is recomputed after the transaction commits. The lists of posts
+sharing its old or new terms are then adjusted for it.
+"""
+
+import logging
+import math
+import threading
+from collections import defaultdict
+from heapq import nlargest
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Post
+
+logger = logging.getLogger('securepress.related')
+
+BATCH_SIZE = 500
+
+# (term prefix, through model, term column)
+MEMBERSHIPS = (
+    ('c', Post.categories.through, 'category_id'),
+    ('t', Post.tags.through, 'tag_id'),
+)
+
+
+def load_terms(post_ids=None, terms=None, published_only=False):
+    """
+    ``{post_id: {term}}`` from the taxonomy tables, where a term is
+    ``('c', category_id)`` or ``('t', tag_id)``.
+
+    Optionally limited to ``post_ids``, to rows for ``terms`` or to
+    published posts.
+    """
+    terms_of = defaultdict(set)
+    for prefix, through, column in MEMBERSHIPS:
+        rows = through.objects.all()
+        if post_ids is not None:
+            rows = rows.filter(post_id__in=list(post_ids))
+        if terms is not None:
+            rows = rows.filter(**{f'{column}__in': [pk for kind, pk in terms if kind == prefix]})
+        if published_only:
+            rows = rows.filter(post__status='published')
+        for post_id, term_id in rows.values_list('post_id', column).iterator():
+            terms_of[post_id].add((prefix, term_id))
+    return terms_of
+
+
+def document_frequencies(terms=None):
+    """Number of published posts per term, optionally limited to ``terms``."""
+    frequencies = {}
+    for prefix, through, column in MEMBERSHIPS:
+        rows = through.objects.filter(post__status='published')
+        if terms is not None:
+            rows = rows.filter(**{f'{column}__in': [pk for kind, pk in terms if kind == prefix]})
+        for term_id, count in rows.values_list(column).annotate(count=Count('post_id')).order_by():
+            frequencies[(prefix, term_id)] = count
+    return frequencies
+
+
+class Weights:
+    """Inverse document frequency weights of terms."""
+
+    def __init__(self, frequencies, total):
+        self.frequencies = frequencies
+        self.total = max(total, 1)
+
+    def __call__(self, term):
+        return math.log(1 + self.total / max(self.frequencies.get(term, 0), 1))
+
+    def sum(self, terms):
+        return sum(self(term) for term in terms)
+
+    def searchable(self, term):
+        return self.frequencies.get(term, 0) <= settings.RELATED_POSTS_MAX_TERM_POSTS
+
+
+def similarity(terms_a, terms_b, weights):
+    """Weighted Jaccard similarity of two term sets."""
+    shared = weights.sum(terms_a & terms_b)
+    if not shared:
+        return 0.0
+    return shared / weights.sum(terms_a | terms_b)
+
+
+def neighbours(post_id, terms_of, postings, weights):
+    """Top ``RELATED_POSTS_COUNT`` ``(score, post_id)`` among the posts in ``postings``."""
+    terms = terms_of.get(post_id, set())
+    shared = defaultdict(float)
+    for term in terms:
+        if weights.searchable(term):
+            weight = weights(term)
+            for other in postings.get(term, ()):
+                if other != post_id:
+                    shared[other] += weight
+    own = weights.sum(terms)
+    scored = (
+        (value / (own + weights.sum(terms_of[other]) - value), other)
+        for other, value in shared.items()
+    )
+    return nlargest(settings.RELATED_POSTS_COUNT, scored, key=lambda item: (item[0], -item[1]))
+
+
+def entry(score, post):
+    return {'id': post['id'], 'slug': post['slug'], 'title': post['title'], 'score': round(score, 4)}
+
+
+def save_lists(lists):
+    """Write ``{post_id: related list}`` for posts whose stored list differs."""
+    current = dict(Post.objects.filter(pk__in=list(lists)).values_list('id', 'related_posts'))
+    changed = [
+        Post(pk=pk, related_posts=value)
+        for pk, value in lists.items()
+        if pk in current and current[pk] != value
+    ]
+    Post.objects.bulk_update(changed, ['related_posts'], batch_size=BATCH_SIZE)
+    return len(changed)
+
+
+def build_all():
+    """Recompute every post's related list. Returns the number of posts whose list changed."""
+    terms_of = load_terms()
+    published = {
+        post['id']: post for post in Post.objects.filter(status='published').values('id', 'slug', 'title')
+    }
+    postings = defaultdict(list)
+    for post_id, terms in terms_of.items():
+        if post_id in published:
+            for term in terms:
+                postings[term].append(post_id)
+    weights = Weights({term: len(posts) for term, posts in postings.items()}, len(published))
+
+    changed = 0
+    post_ids = list(Post.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(post_ids), BATCH_SIZE):
+        changed += save_lists({
+            post_id: [
+                entry(score, published[other]) for score, other in neighbours(post_id, terms_of, postings, weights)
+            ]
+            for post_id in post_ids[start:start + BATCH_SIZE]
+        })
+    return changed
+
+
+def refresh(post_ids, extra_terms=()):
+    """
+    Recompute the lists of ``post_ids`` and update the lists of posts that
+    share any of their terms or ``extra_terms`` (terms they just lost).
+
+    A sharing post whose list includes one of ``post_ids`` is recomputed in
+    full. Any other sharing post only merges in the new scores of
+    ``post_ids``. Scores already stored are not re-weighted for the changed
+    term frequencies until the next full build.
+    """
+    post_ids = set(post_ids)
+    if not post_ids:
+        return 0
+    terms = set(extra_terms).union(*load_terms(post_ids).values())
+    weights = Weights(document_frequencies(terms), Post.objects.filter(status='published').count())
+    searchable = {term for term in terms if weights.searchable(term)}
+    sharing = set(load_terms(terms=searchable)) - post_ids if searchable else set()
+    current = dict(Post.objects.filter(pk__in=sharing).values_list('id', 'related_posts'))
+    recompute = post_ids | {
+        pk for pk, items in current.items() if any(item['id'] in post_ids for item in items)
+    }
+
+    # Candidates for the recomputed lists, with all of their terms
+    own_terms = load_terms(recompute)
+    wanted = set().union(*own_terms.values()) - terms
+    weights.frequencies.update(document_frequencies(wanted))
+    searchable |= {term for term in wanted if weights.searchable(term)}
+    candidates = load_terms(terms=searchable, published_only=True) if searchable else {}
+    terms_of = load_terms(set(candidates) | sharing | post_ids)
+    missing = set().union(*terms_of.values()) - set(weights.frequencies)
+    weights.frequencies.update(document_frequencies(missing))
+
+    posts = {
+        post['id']: post
+        for post in Post.objects.filter(pk__in=set(terms_of) | post_ids).values('id', 'slug', 'title', 'status')
+    }
+    published = {pk for pk, post in posts.items() if post['status'] == 'published'}
+    postings = defaultdict(list)
+    for other, other_terms in candidates.items():
+        if other in published:
+            for term in other_terms & searchable:
+                postings[term].append(other)
+
+    lists = {}
+    for post_id in recompute & set(posts):
+        lists[post_id] = [
+            entry(score, posts[other]) for score, other in neighbours(post_id, terms_of, postings, weights)
+        ]
+    for other in sharing - recompute:
+        kept = [(item['score'], item['id'], item) for item in current.get(other, ())]
+        for post_id in post_ids & published:
+            score = similarity(terms_of[other], terms_of[post_id], weights)
+            if score > 0:
+                kept.append((round(score, 4), post_id, entry(score, posts[post_id])))
+        kept.sort(key=lambda item: (-item[0], item[1]))
+        lists[other] = [item for _, _, item in kept[:settings.RELATED_POSTS_COUNT]]
+    return save_lists(lists)
+
+
+_pending = threading.local()
+
+
+def schedule(post_ids, terms=()):
+    """Refresh ``post_ids`` (and posts sharing ``terms``) when the current transaction commits."""
+    if not hasattr(_pending, 'posts'):
+        _pending.posts, _pending.terms = set(), set()
+    _pending.posts.update(post_ids)
+    _pending.terms.update(terms)
+    transaction.on_commit(run_pending)
+
+
+def run_pending():
+    """Refresh everything scheduled so far on this thread; later callbacks find nothing left."""
+    post_ids, terms = getattr(_pending, 'posts', None), getattr(_pending, 'terms', None)
+    if not post_ids:
+        return
+    _pending.posts, _pending.terms = set(), set()
+    try:
+        refresh(post_ids, terms)
+    except Exception:
+        logger.exception('Refreshing related posts for %s failed', sorted(post_ids))
@@ -0,0 +1,243 @@
+"""
+Revision history for posts and pages.
+
+Saving through the API records a :class:`~core.models.ContentRevision`
+of the object's revisioned fields. A revision usually stores only the
+changes from the previous revision. Short fields are stored whole. Long
+text fields are stored as ``difflib`` opcodes over tokens that end at a
+``>`` or a newline, so editing one paragraph of an HTML body stores that
+paragraph. The first revision is a full snapshot. So is every
+``SNAPSHOT_INTERVAL``-th revision, and any revision whose delta would be
+at least half the size of a snapshot. All data is zlib-compressed JSON.
+
+Any revision is reconstructed from the nearest snapshot at or below it
+plus the deltas that follow, which is at most ``SNAPSHOT_INTERVAL - 1``
+small rows. :func:`prune` deletes old revisions in batches and turns the
+oldest kept revision into a snapshot first, so the rest still
+reconstruct.
+"""
+
+import difflib
+import json
+import re
+import zlib
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F, Max, Min
+from django.utils import timezone
+
+from .models import ContentRevision
+
+# Deltas allowed between snapshots before a new snapshot is forced
+SNAPSHOT_INTERVAL = 20
+
+# Revisioned fields per model; text fields are diffed, the rest stored whole
+REVISIONED_FIELDS = {
+    'core.post': ('title', 'slug', 'content', 'excerpt', 'status', 'meta_description', 'meta_keywords'),
+    'core.page': ('title', 'slug', 'content', 'status', 'template', 'meta_description', 'meta_keywords'),
+}
+TEXT_FIELDS = frozenset({'content', 'excerpt'})
+
+TOKEN_END = re.compile(r'(?<=[>\n])')
+
+# Revisions deleted per statement when pruning
+PRUNE_BATCH_SIZE = 1000
+
+
+def encode(value):
+    return zlib.compress(json.dumps(value, separators=(',', ':')).encode())
+
+
+def decode(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def fields_of(instance):
+    """The revisioned field values of a post or page."""
+    return {field: getattr(instance, field) for field in REVISIONED_FIELDS[instance._meta.label_lower]}
+
+
+def diff_text(old, new):
+    """``[[start, end, text]]`` replacing old tokens ``start:end`` with ``text``."""
+    old_tokens, new_tokens = TOKEN_END.split(old), TOKEN_END.split(new)
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    return [
+        [i1, i2, ''.join(new_tokens[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != 'equal'
+    ]
+
+
+def patch_text(old, operations):
+    """Apply :func:`diff_text` operations to ``old``."""
+    tokens = TOKEN_END.split(old)
+    result, position = [], 0
+    for start, end, text in operations:
+        result.extend(tokens[position:start])
+        result.append(text)
+        position = end
+    result.extend(tokens[position:])
+    return ''.join(result)
+
+
+def make_delta(old, new):
+    """The changes from field values ``old`` to ``new``."""
+    delta = {}
+    for field, value in new.items():
+        if old.get(field) == value:
+            continue
+        if field in TEXT_FIELDS and old.get(field) is not None and value is not None:
+            delta[field] = {'diff': diff_text(old[field], value)}
+        else:
+            delta[field] = {'value': value}
+    return delta
+
+
+def apply_delta(fields, delta):
+    for field, change in delta.items():
+        fields[field] = patch_text(fields[field], change['diff']) if 'diff' in change else change['value']
+    return fields
+
+
+def revisions_of(instance):
+    return ContentRevision.objects.filter(model=instance._meta.label_lower, object_id=instance.pk)
+
+
+def _state(revisions, number):
+    """Field values at revision ``number`` of ``revisions``, and the snapshot they were rebuilt from."""
+    snapshot = (
+        revisions.filter(is_snapshot=True, number__lte=number)
+        .order_by('-number')
+        .only('number', 'data')
+        .first()
+    )
+    if snapshot is None:
+        raise ContentRevision.DoesNotExist(f'No snapshot precedes revision {number}.')
+    fields = decode(snapshot.data)
+    deltas = revisions.filter(number__gt=snapshot.number, number__lte=number).only('data').order_by('number')
+    for revision in deltas:
+        fields = apply_delta(fields, decode(revision.data))
+    return fields, snapshot.number
+
+
+def reconstruct(instance, number):
+    """
+    Return the revisioned fields of ``instance`` as of revision ``number``.
+
+    Raises ``ContentRevision.DoesNotExist`` if the revision is unknown.
+    """
+    revisions = revisions_of(instance)
+    if not revisions.filter(number=number).exists():
+        raise ContentRevision.DoesNotExist(f'Revision {number} does not exist.')
+    return _state(revisions, number)[0]
+
+
+def list_revisions(instance):
+    """Revision metadata, newest first, without loading revision data."""
+    return revisions_of(instance).defer('data').select_related('author').order_by('-number')
+
+
+def _lock(instance):
+    list(type(instance).objects.select_for_update().filter(pk=instance.pk).values_list('pk', flat=True))
+
+
+def record(instance, author=None):
+    """
+    Record the current revisioned fields of ``instance`` if they differ from
+    its latest revision. Returns the new revision, or ``None``.
+    """
+    fields = fields_of(instance)
+    with transaction.atomic():
+        _lock(instance)
+        revisions = revisions_of(instance)
+        head = revisions.aggregate(number=Max('number'))['number']
+        if head is None:
+            number, previous, snapshot_number = 1, None, None
+        else:
+            previous, snapshot_number = _state(revisions, head)
+            if previous == fields:
+                return None
+            number = head + 1
+
+        snapshot = encode(fields)
+        if previous is None:
+            data, is_snapshot, changed = snapshot, True, list(fields)
+        else:
+            delta = make_delta(previous, fields)
+            data, is_snapshot, changed = encode(delta), False, list(delta)
+            if number - snapshot_number >= SNAPSHOT_INTERVAL or len(data) * 2 >= len(snapshot):
+                data, is_snapshot = snapshot, True
+        return ContentRevision.objects.create(
+            model=instance._meta.label_lower,
+            object_id=instance.pk,
+            number=number,
+            is_snapshot=is_snapshot,
+            data=data,
+            size=len(data),
+            changed_fields=changed,
+            author=author,
+        )
+
+
+def _delete_in_batches(revisions, batch_size):
+    deleted = 0
+    while True:
+        ids = list(revisions.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += ContentRevision.objects.filter(id__in=ids).delete()[0]
+
+
+def _prune_object(model, object_id, keep, cutoff, batch_size):
+    revisions = ContentRevision.objects.filter(model=model, object_id=object_id)
+    with transaction.atomic():
+        bounds = revisions.aggregate(head=Max('number'), oldest=Min('number'))
+        first_kept = bounds['head'] - keep + 1
+        recent = revisions.filter(created_at__gte=cutoff).aggregate(number=Min('number'))['number']
+        if recent is not None:
+            first_kept = min(first_kept, recent)
+        if first_kept <= bounds['oldest']:
+            return 0
+        kept = revisions.filter(number__gte=first_kept).order_by('number').only('number', 'is_snapshot').first()
+        if not kept.is_snapshot:
+            # Later revisions must not depend on the snapshot about to be deleted
+            data = encode(_state(revisions, kept.number)[0])
+            revisions.filter(pk=kept.pk).update(is_snapshot=True, data=data, size=len(data))
+    return _delete_in_batches(revisions.filter(number__lt=kept.number), batch_size)
+
+
+def prune(keep=50, days=90, batch_size=PRUNE_BATCH_SIZE):
+    """
+    Delete revisions beyond the latest ``keep`` of each object once they are
+    older than ``days`` days, and every revision of deleted objects once the
+    newest is that old. Returns the number of revisions deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+
+    objects = (
+        ContentRevision.objects.values_list('model', 'object_id')
+        .annotate(head=Max('number'), oldest=Min('number'))
+        .filter(oldest__lte=F('head') - keep)
+        .values_list('model', 'object_id')
+        .order_by()
+    )
+    for model, object_id in list(objects):
+        deleted += _prune_object(model, object_id, keep, cutoff, batch_size)
+
+    for label in REVISIONED_FIELDS:
+        existing = apps.get_model(label).objects.values('pk')
+        orphans = (
+            ContentRevision.objects.filter(model=label)
+            .exclude(object_id__in=existing)
+            .values_list('object_id')
+            .annotate(newest=Max('created_at'))
+            .filter(newest__lt=cutoff)
+            .values_list('object_id', flat=True)
+            .order_by()
+        )
+        for object_id in list(orphans):
+            deleted += _delete_in_batches(ContentRevision.objects.filter(model=label, object_id=object_id), batch_size)
+    return deleted
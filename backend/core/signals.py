@@ -0,0 +1,217 @@
+"""
+Signal handlers for core models.
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import artifacts, autocomplete, feeds, post_counts, related, sitemaps
+from .changefeed import record_change, remember_visibility
+from .models import Category, Media, Page, Post, Tag, User
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Page)
+@receiver(pre_save, sender=Media)
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=Page)
+@receiver(pre_delete, sender=Media)
+def content_changing(sender, instance, raw=False, **kwargs):
+    """Remember whether the object was public for its change feed entry."""
+    if not raw:
+        remember_visibility(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Page)
+@receiver(post_save, sender=Media)
+def content_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Record the change in the change feed."""
+    if not raw:
+        record_change(instance, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Page)
+@receiver(post_delete, sender=Media)
+def content_deleted(sender, instance, **kwargs):
+    """Record the deletion in the change feed."""
+    record_change(instance, 'deleted')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, raw=False, **kwargs):
+    """Refresh the related posts of a saved post and of posts sharing its terms."""
+    if not raw:
+        related.schedule([instance.pk])
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    """Drop a post about to be deleted from the related posts of posts sharing its terms."""
+    terms = related.load_terms([instance.pk]).get(instance.pk, set())
+    related.schedule([instance.pk], terms)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_terms_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Refresh related posts when categories or tags are added to or removed from posts."""
+    prefix = 'c' if sender is Post.categories.through else 't'
+    if action in ('post_add', 'post_remove'):
+        if reverse:
+            related.schedule(pk_set, [(prefix, instance.pk)])
+        else:
+            related.schedule([instance.pk], [(prefix, pk) for pk in pk_set])
+    elif action == 'pre_clear':
+        if reverse:
+            related.schedule(instance.posts.values_list('pk', flat=True), [(prefix, instance.pk)])
+        else:
+            related.schedule([instance.pk], related.load_terms([instance.pk]).get(instance.pk, set()))
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Tag)
+def term_deleting(sender, instance, **kwargs):
+    """Refresh the related posts of posts losing a deleted category or tag."""
+    prefix = 'c' if sender is Category else 't'
+    related.schedule(instance.posts.values_list('pk', flat=True), [(prefix, instance.pk)])
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_counts_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Keep category and tag post counts in step with their posts."""
+    if reverse:
+        if action == 'post_add':
+            post_counts.term_gained(type(instance), instance.pk, pk_set)
+        elif action in ('pre_remove', 'pre_clear'):
+            post_counts.term_losing(type(instance), instance.pk, pk_set)
+    elif action == 'post_add':
+        post_counts.posts_added(model, instance.pk, pk_set)
+    elif action in ('pre_remove', 'pre_clear'):
+        post_counts.posts_removed(model, instance.pk, pk_set)
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, raw=False, **kwargs):
+    """Remember the stored status and publication date of a post being saved."""
+    if not raw and instance.pk is not None:
+        instance._stored = Post.objects.filter(pk=instance.pk).values('status', 'published_at').first()
+
+
+def was_published(post):
+    """Whether the stored post was published before the save in progress."""
+    stored = getattr(post, '_stored', None)
+    return bool(stored) and stored['status'] == 'published'
+
+
+@receiver(post_save, sender=Post)
+def post_status_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Move a post's terms between published and unpublished counts on status changes."""
+    if raw or created:
+        return
+    if was_published(instance) != instance.is_published:
+        post_counts.status_changed(instance.pk, instance.is_published)
+
+
+@receiver(pre_delete, sender=Post)
+def post_counts_deleting(sender, instance, **kwargs):
+    """Remove a post about to be deleted from its categories' and tags' counts."""
+    post_counts.post_deleting(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def autocomplete_changed(sender, update_fields=None, **kwargs):
+    """Rebuild the autocomplete index of the changed model in every worker."""
+    if sender is User and update_fields and set(update_fields) <= {'last_login'}:
+        return
+    kind = {Category: 'categories', Tag: 'tags', User: 'users'}[sender]
+    autocomplete.invalidate(kind)
+
+
+def invalidate_on_commit(groups):
+    """Mark sitemap and feed ``groups`` stale once the current transaction commits."""
+    groups = set(groups)
+    if groups:
+        transaction.on_commit(lambda: artifacts.invalidate(*groups))
+
+
+def published_post_groups(post_id, segments):
+    """Groups showing a published post: its sitemap segments and the feeds it appears in."""
+    return (
+        [sitemaps.INDEX_GROUP, feeds.POSTS_GROUP]
+        + [sitemaps.group(segment) for segment in segments]
+        + feeds.post_term_groups(post_id)
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_syndication_saved(sender, instance, raw=False, **kwargs):
+    """Invalidate the sitemap segments and feeds a post was or is now in."""
+    if raw:
+        return
+    segments = set()
+    if was_published(instance):
+        segments.add(sitemaps.month_segment(instance._stored['published_at']))
+    if instance.is_published:
+        segments.add(sitemaps.month_segment(instance.published_at))
+    if not segments:
+        return
+    groups = published_post_groups(instance.pk, segments)
+    if was_published(instance) != instance.is_published:
+        # Categories and tags may have gained or lost their only published post
+        groups += [sitemaps.group('categories'), sitemaps.group('tags')]
+    invalidate_on_commit(groups)
+
+
+@receiver(pre_delete, sender=Post)
+def post_syndication_deleting(sender, instance, **kwargs):
+    """Invalidate the sitemap segment and feeds of a published post about to be deleted."""
+    stored = Post.objects.filter(pk=instance.pk, status='published').values('published_at').first()
+    if stored:
+        groups = published_post_groups(instance.pk, [sitemaps.month_segment(stored['published_at'])])
+        invalidate_on_commit(groups + [sitemaps.group('categories'), sitemaps.group('tags')])
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_terms_syndication_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the feeds of categories and tags gaining or losing posts."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    kind, segment = ('category', 'categories') if sender is Post.categories.through else ('tag', 'tags')
+    if reverse:
+        term_ids = [instance.pk]
+    elif action == 'pre_clear':
+        term_ids = sender.objects.filter(post_id=instance.pk).values_list(f'{kind}_id', flat=True)
+    else:
+        term_ids = pk_set
+    invalidate_on_commit(
+        [sitemaps.INDEX_GROUP, sitemaps.group(segment)] + [feeds.term_group(kind, pk) for pk in term_ids]
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def term_syndication_changed(sender, instance, raw=False, **kwargs):
+    """Invalidate the sitemap and feeds of a changed category or tag."""
+    if not raw:
+        kind, segment = ('category', 'categories') if sender is Category else ('tag', 'tags')
+        invalidate_on_commit([sitemaps.INDEX_GROUP, sitemaps.group(segment), feeds.term_group(kind, instance.pk)])
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def page_syndication_changed(sender, instance, raw=False, **kwargs):
+    """Invalidate the pages sitemap."""
+    if not raw:
+        invalidate_on_commit([sitemaps.INDEX_GROUP, sitemaps.group('pages')])
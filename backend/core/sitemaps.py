@@ -0,0 +1,191 @@
+"""
+Sitemaps.
+
+The sitemap index lists one sitemap per segment part:
+
+* ``posts-YYYY-MM``: published posts by the month they were published,
+  read through the ``(status, published_at)`` index; ``posts-undated``
+  holds published posts without a date;
+* ``pages``, ``categories`` and ``tags``: published pages and the
+  categories and tags with published posts.
+
+Segments are split into parts of ``SITEMAP_URLS_PER_FILE`` URLs, e.g.
+``/sitemaps/posts-2026-10-1.xml``. Every segment is an artifact group
+(see :mod:`core.artifacts`). A content change invalidates only the
+segments it touches, plus the index, and only those files are rebuilt.
+"""
+
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.db.models.functions import TruncMonth
+from django.http import Http404
+from django.utils import timezone
+
+from . import artifacts
+from .models import Category, Page, Post, Tag
+
+INDEX_GROUP = 'sitemap:index'
+UNDATED = 'undated'
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = XML_DECLARATION + b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = b'</urlset>\n'
+INDEX_OPEN = XML_DECLARATION + b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_CLOSE = b'</sitemapindex>\n'
+
+
+def group(segment):
+    return f'sitemap:{segment}'
+
+
+def month_segment(published_at):
+    """The posts segment of a post published at ``published_at``."""
+    if published_at is None:
+        return f'posts-{UNDATED}'
+    return f'posts-{timezone.localtime(published_at):%Y-%m}'
+
+
+def absolute(path):
+    return settings.SITE_URL.rstrip('/') + path
+
+
+def w3c(value):
+    return timezone.localtime(value).isoformat(timespec='seconds') if value else None
+
+
+def segment_rows(segment):
+    """
+    ``(model, queryset)`` of the URLs in ``segment`` in a stable order, or
+    raise ``Http404``. Rows are ``(slug, lastmod)``, or ``(slug,)`` for
+    categories and tags.
+    """
+    if segment.startswith('posts-'):
+        posts = Post.objects.filter(status='published')
+        month = segment[len('posts-'):]
+        if month == UNDATED:
+            posts = posts.filter(published_at__isnull=True).order_by('id')
+        else:
+            try:
+                start = timezone.make_aware(datetime.strptime(month, '%Y-%m'))
+            except ValueError:
+                raise Http404('No such sitemap.')
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+            posts = posts.filter(published_at__gte=start, published_at__lt=end).order_by('published_at', 'id')
+        return Post, posts.values_list('slug', 'updated_at')
+    if segment == 'pages':
+        return Page, Page.objects.filter(status='published').order_by('id').values_list('slug', 'updated_at')
+    models = {'categories': Category, 'tags': Tag}
+    if segment in models:
+        model = models[segment]
+        return model, model.objects.filter(published_post_count__gt=0).order_by('id').values_list('slug')
+    raise Http404('No such sitemap.')
+
+
+def build_part(segment, part):
+    """The XML of one part of ``segment``, or raise ``Http404`` if it is empty."""
+    model, rows = segment_rows(segment)
+    size = settings.SITEMAP_URLS_PER_FILE
+    rows = rows[(part - 1) * size:part * size]
+    chunks = [URLSET_OPEN]
+    for slug, *lastmod in rows.iterator(chunk_size=2000):
+        entry = f'<url><loc>{escape(absolute(model(slug=slug).get_absolute_url()))}</loc>'
+        if lastmod and lastmod[0]:
+            entry += f'<lastmod>{w3c(lastmod[0])}</lastmod>'
+        chunks.append(f'{entry}</url>\n'.encode())
+    if len(chunks) == 1:
+        raise Http404('No such sitemap.')
+    chunks.append(URLSET_CLOSE)
+    return b''.join(chunks)
+
+
+def segments():
+    """``[(segment, urls, lastmod)]`` for every non-empty segment."""
+    published = Post.objects.filter(status='published')
+    result = [
+        (month_segment(row['month']), row['urls'], row['lastmod'])
+        for row in published.filter(published_at__isnull=False)
+        .annotate(month=TruncMonth('published_at'))
+        .values('month')
+        .annotate(urls=Count('id'), lastmod=Max('updated_at'))
+        .order_by('month')
+    ]
+    undated = published.filter(published_at__isnull=True).aggregate(urls=Count('id'), lastmod=Max('updated_at'))
+    pages = Page.objects.filter(status='published').aggregate(urls=Count('id'), lastmod=Max('updated_at'))
+    categories = Category.objects.filter(published_post_count__gt=0).count()
+    tags = Tag.objects.filter(published_post_count__gt=0).count()
+    for segment, urls, lastmod in (
+        (f'posts-{UNDATED}', undated['urls'], undated['lastmod']),
+        ('pages', pages['urls'], pages['lastmod']),
+        ('categories', categories, None),
+        ('tags', tags, None),
+    ):
+        if urls:
+            result.append((segment, urls, lastmod))
+    return result
+
+
+def parts(urls):
+    return range(1, -(-urls // settings.SITEMAP_URLS_PER_FILE) + 1)
+
+
+def build_index():
+    chunks = [INDEX_OPEN]
+    for segment, urls, lastmod in segments():
+        for part in parts(urls):
+            entry = f'<sitemap><loc>{escape(absolute(f"/sitemaps/{segment}-{part}.xml"))}</loc>'
+            if lastmod:
+                entry += f'<lastmod>{w3c(lastmod)}</lastmod>'
+            chunks.append(f'{entry}</sitemap>\n'.encode())
+    chunks.append(INDEX_CLOSE)
+    return b''.join(chunks)
+
+
+def index():
+    """The gzipped sitemap index."""
+    return artifacts.load('sitemaps/index.xml', INDEX_GROUP, build_index)
+
+
+def part(segment, number):
+    """A gzipped sitemap part, or raise ``Http404``."""
+    segment_rows(segment)  # reject unknown segments before touching their version
+    return artifacts.load(f'sitemaps/{segment}-{number}.xml', group(segment), lambda: build_part(segment, number))
+
+
+def invalidate(*segments):
+    """Mark ``segments`` and the index stale."""
+    artifacts.invalidate(INDEX_GROUP, *(group(segment) for segment in segments))
+
+
+def build_all(force=False):
+    """
+    Write every stale sitemap file and delete files of parts that no longer
+    exist. Returns the numbers of files built and removed.
+    """
+    current = segments()
+    if force:
+        invalidate(*(segment for segment, _, _ in current))
+    keep = set()
+    built = 0
+    path, was_built = artifacts.ensure('sitemaps/index.xml', INDEX_GROUP, build_index)
+    keep.add(path)
+    built += was_built
+    for segment, urls, _ in current:
+        for number in parts(urls):
+            try:
+                path, was_built = artifacts.ensure(
+                    f'sitemaps/{segment}-{number}.xml', group(segment), lambda: build_part(segment, number),
+                )
+            except Http404:
+                # Emptied since the segments were counted
+                continue
+            keep.add(path)
+            built += was_built
+    removed = 0
+    for path in (artifacts.root() / 'sitemaps').glob('*.gz'):
+        if path not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return built, removed
@@ -0,0 +1,33 @@
+"""
+Startup import budget.
+
+Each run starts Django in a fresh interpreter, as the startup_benchmark
+command does, so imports made by the test session do not hide anything.
+"""
+
+import os
+
+import pytest
+
+from core.management.commands.startup_benchmark import Command
+
+# Generous enough for a loaded CI runner; set STARTUP_BUDGET_MS to tighten it
+BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', '2000'))
+
+
+@pytest.fixture(scope='module')
+def startup():
+    # The fastest of a few runs, like the benchmark, to smooth out noise
+    return min((Command().probe() for _ in range(3)), key=lambda run: run['setup'] + run['urlconf'])
+
+
+@pytest.mark.integration
+def test_startup_within_budget(startup):
+    total_ms = (startup['setup'] + startup['urlconf']) * 1000
+    assert total_ms < BUDGET_MS, f'Startup took {total_ms:.1f} ms, over the {BUDGET_MS:.1f} ms budget.'
+
+
+@pytest.mark.integration
+def test_deferred_modules_not_imported(startup):
+    # DEFERRED_MODULES (PIL, the schema generator, the package scanner) and every app's admin module
+    assert startup['loaded'] == [], f'Imported at startup: {", ".join(startup["loaded"])}'
@@ -0,0 +1,146 @@
+"""
+Trending posts.
+
+Each post has a hot score: its views with every view's weight halving
+every ``TRENDING_HALF_LIFE_HOURS``. Scores are kept as ``log2`` values
+relative to a fixed epoch. A view at time ``t`` adds ``2 ** ((t - epoch) /
+half_life)``. Every score decays at the same rate, so scores never need
+decaying in place. A score only changes when its post gets more views,
+and comparing two scores compares current hotness.
+
+``fold_post_views`` feeds the views it folds into :func:`update`. It adds
+them to the stored scores and rewrites the top ``TRENDING_TOP_K`` published
+posts overall and per category and tag into the cache, under a new
+version. If the stored scores are missing, they are rebuilt from the last
+``TRENDING_WINDOW_DAYS`` of view buckets. Serving trending posts is one
+cache read for the version, one for the list and a primary-key fetch of at
+most K posts.
+"""
+
+import math
+import time
+from collections import defaultdict
+from datetime import datetime, time as day_time, timedelta
+from heapq import nlargest
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from .cache import bump_version, get_version
+from .models import Post, PostViewBucket
+
+VERSION_NAME = 'core:trending'
+CACHE_PREFIX = 'securepress:trending'
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Reference time for scores (2024-01-01 UTC)
+EPOCH = 1704067200
+
+# Scores this many half-lives below the current time are dropped
+PRUNE_HALF_LIVES = 20
+
+
+def half_life():
+    return settings.TRENDING_HALF_LIFE_HOURS * 3600
+
+
+def weight(timestamp):
+    """``log2`` weight of one view at ``timestamp``."""
+    return (timestamp - EPOCH) / half_life()
+
+
+def log_add(a, b):
+    """``log2(2 ** a + 2 ** b)`` without overflow."""
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def current_value(score, now=None):
+    """A stored score as the decayed number of views at ``now``."""
+    return 2 ** (score - weight(now or time.time()))
+
+
+def scores_key():
+    return f'{CACHE_PREFIX}:scores'
+
+
+def top_key(scope, version):
+    return f'{CACHE_PREFIX}:{version}:top:{scope}'
+
+
+def rebuild_scores(now=None):
+    """Compute scores from the view buckets of the last ``TRENDING_WINDOW_DAYS`` days."""
+    now = now or time.time()
+    start = timezone.localdate() - timedelta(days=settings.TRENDING_WINDOW_DAYS - 1)
+    scores = {}
+    rows = (
+        PostViewBucket.objects.filter(day__gte=start)
+        .values_list('post_id', 'day')
+        .annotate(total=Sum('views'))
+        .order_by()
+    )
+    for post_id, day, total in rows.iterator():
+        # Count a day's views at midday, or now if that is earlier
+        noon = datetime.combine(day, day_time(12), tzinfo=timezone.get_current_timezone()).timestamp()
+        scores[post_id] = log_add(scores.get(post_id), math.log2(total) + weight(min(noon, now)))
+    return scores
+
+
+def update(views, now=None):
+    """
+    Add newly folded views (``{post_id: count}``) to the scores and publish
+    new top lists. Returns the number of posts with a score.
+    """
+    now = now or time.time()
+    scores = cache.get(scores_key())
+    if scores is None:
+        # The rebuild already includes the views just folded
+        scores = rebuild_scores(now)
+    else:
+        for post_id, count in views.items():
+            if count > 0:
+                scores[post_id] = log_add(scores.get(post_id), math.log2(count) + weight(now))
+
+    floor = weight(now) - PRUNE_HALF_LIVES
+    scores = {post_id: score for post_id, score in scores.items() if score >= floor}
+    cache.set(scores_key(), scores, CACHE_TIMEOUT)
+    publish(scores)
+    return len(scores)
+
+
+def publish(scores):
+    """Write the top posts overall and per category and tag under a new version."""
+    published = set(Post.objects.filter(pk__in=list(scores), status='published').values_list('pk', flat=True))
+    scopes = defaultdict(list)
+    for post_id in published:
+        scopes['all'].append(post_id)
+    memberships = (
+        ('category', Post.categories.through, 'category_id'),
+        ('tag', Post.tags.through, 'tag_id'),
+    )
+    for prefix, through, field in memberships:
+        rows = through.objects.filter(post_id__in=published).values_list('post_id', field)
+        for post_id, scope_id in rows.iterator():
+            scopes[f'{prefix}:{scope_id}'].append(post_id)
+
+    top_k = settings.TRENDING_TOP_K
+    tops = {
+        scope: [(post_id, scores[post_id]) for post_id in nlargest(top_k, post_ids, key=scores.get)]
+        for scope, post_ids in scopes.items()
+    }
+    # Write the lists before switching readers to the new version
+    version = get_version(VERSION_NAME) + 1
+    cache.set_many({top_key(scope, version): entries for scope, entries in tops.items()}, CACHE_TIMEOUT)
+    bumped = bump_version(VERSION_NAME)
+    if bumped != version:
+        cache.set_many({top_key(scope, bumped): entries for scope, entries in tops.items()}, CACHE_TIMEOUT)
+
+
+def ranked(scope='all', limit=None):
+    """The top posts in ``scope`` (``all``, ``category:<id>`` or ``tag:<id>``) as ``[(post_id, score)]``."""
+    entries = cache.get(top_key(scope, get_version(VERSION_NAME))) or []
+    return entries[:limit] if limit else entries
@@ -0,0 +1,17 @@
+"""
+Sitemap and feed URLs, served at the site root.
+"""
+
+from django.urls import path, re_path
+
+from . import views
+
+FORMAT = r'(?P<fmt>rss|atom)'
+
+urlpatterns = [
+    path('sitemap.xml', views.sitemap_index, name='sitemap-index'),
+    path('sitemaps/<str:name>.xml', views.sitemap_part, name='sitemap-part'),
+    re_path(rf'^feeds/posts\.{FORMAT}$', views.post_feed, name='feed-posts'),
+    re_path(rf'^feeds/category/(?P<slug>[-\w]+)\.{FORMAT}$', views.category_feed, name='feed-category'),
+    re_path(rf'^feeds/tag/(?P<slug>[-\w]+)\.{FORMAT}$', views.tag_feed, name='feed-tag'),
+]
@@ -0,0 +1,201 @@
+"""
+Version numbers and version constraints.
+
+Versions are dotted release numbers with an optional pre-release tag
+(``1.2``, ``1.2.3``, ``v2.0.0-beta.1``). Constraints combine comparisons
+with commas or spaces (all must hold) and ``||`` (any group may hold)::
+
+    >=1.0.0, <2.0.0
+    ^1.4          # >=1.4.0, <2.0.0
+    ~1.4.2        # >=1.4.2, <1.5.0
+    ==1.0 || >=3
+    *
+
+Parsing is memoized, since the same few constraint strings recur across
+a catalog.
+"""
+
+import functools
+import re
+
+VERSION_RE = re.compile(
+    r'^\s*v?(?P<release>\d+(?:\.\d+)*)'
+    r'(?:-?(?P<pre>[0-9A-Za-z]+(?:\.[0-9A-Za-z]+)*))?'
+    r'(?:\+[0-9A-Za-z.-]+)?\s*$'
+)
+
+CLAUSE_RE = re.compile(r'^(>=|<=|==|!=|>|<|=|\^|~)?\s*(.+)$')
+
+OPERATORS = {
+    '>=': lambda version, bound: version >= bound,
+    '<=': lambda version, bound: version <= bound,
+    '>': lambda version, bound: version > bound,
+    '<': lambda version, bound: version < bound,
+    '==': lambda version, bound: version == bound,
+    '!=': lambda version, bound: version != bound,
+}
+
+
+class InvalidVersion(ValueError):
+    """Raised when a version or constraint string cannot be parsed."""
+
+
+class Version:
+    """A comparable, hashable version number."""
+
+    __slots__ = ('release', 'pre', '_key')
+
+    def __init__(self, text):
+        match = VERSION_RE.match(str(text))
+        if not match:
+            raise InvalidVersion(f'Invalid version: {text!r}')
+        release = tuple(int(part) for part in match.group('release').split('.'))
+        while len(release) > 1 and release[-1] == 0:
+            release = release[:-1]
+        self.release = release
+        self.pre = match.group('pre')
+        # A pre-release sorts before its release; numeric parts compare numerically
+        pre_key = (1,) if self.pre is None else (0,) + tuple(
+            (0, int(part), '') if part.isdigit() else (1, 0, part)
+            for part in self.pre.split('.')
+        )
+        self._key = (release, pre_key)
+
+    def __str__(self):
+        release = '.'.join(str(part) for part in self.release + (0,) * (3 - len(self.release)))
+        return f'{release}-{self.pre}' if self.pre else release
+
+    def __repr__(self):
+        return f'Version({str(self)!r})'
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __eq__(self, other):
+        return isinstance(other, Version) and self._key == other._key
+
+    def __lt__(self, other):
+        return self._key < other._key
+
+    def __le__(self, other):
+        return self._key <= other._key
+
+    def __gt__(self, other):
+        return self._key > other._key
+
+    def __ge__(self, other):
+        return self._key >= other._key
+
+    @property
+    def is_prerelease(self):
+        return self.pre is not None
+
+    def part(self, index):
+        """Release component ``index`` (missing components are 0)."""
+        return self.release[index] if index < len(self.release) else 0
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_version(text):
+    """Parse a version string (memoized)."""
+    return Version(text)
+
+
+def _given_parts(version, text):
+    """Release components as written, including trailing zeros."""
+    given = len(VERSION_RE.match(text).group('release').split('.'))
+    return [version.part(index) for index in range(given)]
+
+
+def _bump(parts, index):
+    return Version('.'.join(str(part) for part in parts[:index] + [parts[index] + 1]))
+
+
+def _caret_upper(version, text):
+    """Upper bound for ``^version``: bump the first non-zero component."""
+    parts = _given_parts(version, text)
+    for index, value in enumerate(parts):
+        if value:
+            return _bump(parts, index)
+    return _bump(parts, len(parts) - 1)
+
+
+def _tilde_upper(version, text):
+    """Upper bound for ``~version``: bump the minor (or major if only one given)."""
+    parts = _given_parts(version, text) + [0]
+    return _bump(parts, 0 if len(parts) == 2 else 1)
+
+
+def _parse_clause(clause):
+    match = CLAUSE_RE.match(clause.strip())
+    if not match:
+        raise InvalidVersion(f'Invalid constraint: {clause!r}')
+    operator, text = match.group(1) or '==', match.group(2).strip()
+    if text in ('*', 'x'):
+        return []
+    version = parse_version(text)
+    if operator == '=':
+        operator = '=='
+    if operator == '^':
+        return [('>=', version), ('<', _caret_upper(version, text))]
+    if operator == '~':
+        return [('>=', version), ('<', _tilde_upper(version, text))]
+    return [(operator, version)]
+
+
+class Constraint:
+    """A parsed version constraint."""
+
+    __slots__ = ('text', 'alternatives')
+
+    def __init__(self, text):
+        self.text = (text or '').strip()
+        alternatives = []
+        for group in self.text.split('||'):
+            clauses = []
+            # Allow ">= 1.0" as well as ">=1.0, <2" and ">=1.0 <2"
+            group = re.sub(r'(>=|<=|==|!=|>|<|=|\^|~)\s+', r'\1', group)
+            for clause in re.split(r'[,\s]+', group.strip()):
+                if clause:
+                    clauses.extend(_parse_clause(clause))
+            alternatives.append(tuple(clauses))
+        self.alternatives = tuple(alternatives)
+
+    def __str__(self):
+        return self.text or '*'
+
+    def __repr__(self):
+        return f'Constraint({str(self)!r})'
+
+    def __eq__(self, other):
+        return isinstance(other, Constraint) and self.alternatives == other.alternatives
+
+    def __hash__(self):
+        return hash(self.alternatives)
+
+    @property
+    def is_any(self):
+        return any(not clauses for clauses in self.alternatives)
+
+    def contains(self, version):
+        """Whether ``version`` (a :class:`Version` or string) satisfies the constraint."""
+        if not isinstance(version, Version):
+            version = parse_version(version)
+        return any(
+            all(OPERATORS[operator](version, bound) for operator, bound in clauses)
+            for clauses in self.alternatives
+        )
+
+    __contains__ = contains
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_constraint(text):
+    """Parse a constraint string (memoized)."""
+    return Constraint(text)
+
+
+@functools.lru_cache(maxsize=65536)
+def satisfies(version, constraint):
+    """Whether version string ``version`` satisfies constraint string ``constraint``."""
+    return parse_constraint(constraint).contains(parse_version(version))
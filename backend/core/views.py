@@ -0,0 +1,82 @@
+"""
+Sitemap and feed views.
+
+Serve the gzipped files written by ``core.sitemaps`` and ``core.feeds``
+as they are to clients accepting gzip, with an ETag of the file so
+crawlers polling unchanged files get ``304 Not Modified``.
+"""
+
+import gzip
+import hashlib
+import re
+
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from . import feeds, sitemaps
+from .models import Category, Tag
+
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+SEGMENT_PART = re.compile(r'^(?P<segment>[a-z0-9-]+)-(?P<part>[1-9][0-9]{0,5})$')
+
+CONTENT_TYPES = {
+    'xml': 'application/xml; charset=utf-8',
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+}
+
+# Seconds clients and proxies may reuse a response before revalidating
+MAX_AGE = 300
+
+
+def serve(request, content, kind):
+    """Respond with gzipped ``content``, honouring conditional and encoding headers."""
+    etag = f'W/"{hashlib.md5(content, usedforsecurity=False).hexdigest()}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        if ACCEPTS_GZIP.search(request.headers.get('Accept-Encoding', '')):
+            response = HttpResponse(content, content_type=CONTENT_TYPES[kind])
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(gzip.decompress(content), content_type=CONTENT_TYPES[kind])
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Accept-Encoding'])
+    patch_cache_control(response, public=True, max_age=MAX_AGE)
+    return response
+
+
+@require_safe
+def sitemap_index(request):
+    """The sitemap index."""
+    return serve(request, sitemaps.index(), 'xml')
+
+
+@require_safe
+def sitemap_part(request, name):
+    """One part of a sitemap segment, e.g. ``posts-2026-10-1``."""
+    match = SEGMENT_PART.match(name)
+    if not match:
+        raise Http404('No such sitemap.')
+    return serve(request, sitemaps.part(match['segment'], int(match['part'])), 'xml')
+
+
+@require_safe
+def post_feed(request, fmt):
+    """The latest published posts."""
+    return serve(request, feeds.load(None, fmt), fmt)
+
+
+@require_safe
+def category_feed(request, slug, fmt):
+    """The latest published posts in a category."""
+    category = get_object_or_404(Category.objects.only('id', 'name', 'slug', 'description'), slug=slug)
+    return serve(request, feeds.load(category, fmt), fmt)
+
+
+@require_safe
+def tag_feed(request, slug, fmt):
+    """The latest published posts with a tag."""
+    tag = get_object_or_404(Tag.objects.only('id', 'name', 'slug'), slug=slug)
+    return serve(request, feeds.load(tag, fmt), fmt)
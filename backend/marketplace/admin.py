@@ -6,6 +6,8 @@ from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
 from .models import AppReview, AppVersion, MarketplaceApp, SecurityVettingReport
+from .ratings import rebuild as rebuild_ratings
+from .scanner import scan_version
 
 
 @admin.register(MarketplaceApp)
@@ -20,7 +22,9 @@ class MarketplaceAppAdmin(admin.ModelAdmin):
     search_fields = ('name', 'slug', 'description', 'developer__email')
     readonly_fields = (
         'download_count', 'active_installations', 'rating_average', 
-        'rating_count', 'created_at', 'updated_at'
+        'rating_count', 'rating_sum', 'rating_1_count', 'rating_2_count',
+        'rating_3_count', 'rating_4_count', 'rating_5_count',
+        'created_at', 'updated_at'
     )
     
     fieldsets = (
@@ -70,7 +74,9 @@ class MarketplaceAppAdmin(admin.ModelAdmin):
         (_('Statistics'), {
             'fields': (
                 'download_count', 'active_installations',
-                'rating_average', 'rating_count'
+                'rating_average', 'rating_count', 'rating_sum',
+                'rating_1_count', 'rating_2_count', 'rating_3_count',
+                'rating_4_count', 'rating_5_count'
             ),
             'classes': ('collapse',)
         }),
@@ -132,6 +138,17 @@ class AppVersionAdmin(admin.ModelAdmin):
             'fields': ('is_stable', 'is_active', 'download_count')
         }),
     )
+    
+    actions = ['scan_versions']
+    
+    def scan_versions(self, request, queryset):
+        """Run the security scanner on selected versions."""
+        passed = 0
+        versions = queryset.select_related('app')
+        for version in versions:
+            passed += scan_version(version, reviewer=request.user).passed
+        self.message_user(request, f'{len(versions)} version(s) scanned, {passed} passed.')
+    scan_versions.short_description = _('Run security scan on selected versions')
 
 
 @admin.register(AppReview)
@@ -150,13 +167,17 @@ class AppReviewAdmin(admin.ModelAdmin):
     
     def approve_reviews(self, request, queryset):
         """Approve selected reviews."""
+        app_ids = set(queryset.values_list('app_id', flat=True))
         updated = queryset.update(is_approved=True, is_flagged=False)
+        rebuild_ratings(app_ids)
         self.message_user(request, f'{updated} review(s) approved.')
     approve_reviews.short_description = _('Approve selected reviews')
     
     def flag_reviews(self, request, queryset):
         """Flag selected reviews."""
+        app_ids = set(queryset.values_list('app_id', flat=True))
         updated = queryset.update(is_flagged=True)
+        rebuild_ratings(app_ids)
         self.message_user(request, f'{updated} review(s) flagged.')
     flag_reviews.short_description = _('Flag selected reviews')
 
@@ -0,0 +1,261 @@
+"""
+Static analysis rules for marketplace packages.
+
+This module is deliberately free of Django imports: its functions run in
+worker processes of the scanning pool and must be importable there
+without configured settings. Every function takes file contents and
+returns plain data, so results can be cached by content hash.
+"""
+
+import ast
+import json
+import re
+import tomllib
+
+# Bump when rules change so cached per-file results are discarded
+RULES_VERSION = 1
+
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+
+DYNAMIC_CODE_CALLS = {'eval', 'exec', 'compile', '__import__'}
+
+COMMAND_CALLS = {
+    'os.system', 'os.popen', 'os.execl', 'os.execle', 'os.execlp', 'os.execv',
+    'os.execve', 'os.execvp', 'os.spawnl', 'os.spawnv', 'os.startfile',
+    'subprocess.run', 'subprocess.call', 'subprocess.check_call',
+    'subprocess.check_output', 'subprocess.Popen', 'subprocess.getoutput',
+    'subprocess.getstatusoutput', 'pty.spawn',
+}
+
+DESERIALIZATION_CALLS = {
+    'pickle.load', 'pickle.loads', 'cPickle.load', 'cPickle.loads',
+    'marshal.load', 'marshal.loads', 'shelve.open', 'dill.load', 'dill.loads',
+}
+
+NETWORK_MODULES = {
+    'socket', 'ssl', 'urllib.request', 'http.client', 'ftplib', 'smtplib',
+    'telnetlib', 'requests', 'httpx', 'aiohttp', 'urllib3', 'paramiko',
+}
+
+SECRET_RE = re.compile(
+    r'(?i)(?:api[_-]?key|secret|password|passwd|token)\s*[:=]\s*[\'"][^\'"\s]{12,}[\'"]'
+)
+
+REQUIREMENT_RE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*(.*?)\s*(?:#.*)?$')
+
+# Other text files are only checked for embedded credentials
+TEXT_SUFFIXES = {
+    '.js', '.mjs', '.ts', '.php', '.html', '.json', '.yml', '.yaml', '.toml',
+    '.cfg', '.ini', '.env', '.txt', '.sh',
+}
+
+
+def finding(rule, severity, message, line=None):
+    """Build a finding dict."""
+    result = {'rule': rule, 'severity': severity, 'message': message}
+    if line is not None:
+        result['line'] = line
+    return result
+
+
+def _dotted(node):
+    """Return ``a.b.c`` for a Name/Attribute chain, else ``None``."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+    return None
+
+
+class RuleVisitor(ast.NodeVisitor):
+    """Collect findings from a module's AST, resolving import aliases."""
+
+    def __init__(self):
+        self.aliases = {}
+        self.findings = []
+
+    def resolve(self, name):
+        head, _, rest = name.partition('.')
+        target = self.aliases.get(head, head)
+        return f'{target}.{rest}' if rest else target
+
+    def _network(self, module, line):
+        if module in NETWORK_MODULES or module.split('.')[0] in NETWORK_MODULES:
+            self.findings.append(finding('network-access', 'medium', f'Imports network module {module!r}.', line))
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                top = alias.name.split('.')[0]
+                self.aliases[top] = top
+            self._network(alias.name, node.lineno)
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        module = node.module or ''
+        for alias in node.names:
+            self.aliases[alias.asname or alias.name] = f'{module}.{alias.name}' if module else alias.name
+        if module:
+            self._network(module, node.lineno)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        name = _dotted(node.func)
+        if name:
+            resolved = self.resolve(name)
+            if name in DYNAMIC_CODE_CALLS and name not in self.aliases:
+                self.findings.append(finding('dynamic-code', 'high', f'Calls {name}().', node.lineno))
+            elif resolved in COMMAND_CALLS:
+                self.findings.append(finding('command-execution', 'high', f'Calls {resolved}().', node.lineno))
+            elif resolved in DESERIALIZATION_CALLS:
+                self.findings.append(
+                    finding('unsafe-deserialization', 'medium', f'Calls {resolved}().', node.lineno)
+                )
+            elif resolved == 'yaml.load' and len(node.args) < 2 and not any(
+                kw.arg == 'Loader' for kw in node.keywords
+            ):
+                self.findings.append(
+                    finding('unsafe-deserialization', 'medium', 'Calls yaml.load() without a Loader.', node.lineno)
+                )
+            if resolved.startswith('subprocess.') and any(
+                kw.arg == 'shell' and isinstance(kw.value, ast.Constant) and kw.value.value is True
+                for kw in node.keywords
+            ):
+                self.findings.append(
+                    finding('shell-injection', 'critical', f'Calls {resolved}() with shell=True.', node.lineno)
+                )
+        self.generic_visit(node)
+
+
+def scan_python(source):
+    """Return findings for Python source code."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError) as exc:
+        return [finding('unparseable', 'low', f'Could not parse file: {exc}')]
+    except (RecursionError, MemoryError):
+        # Pathologically nested code; flag it rather than let it hide anything
+        return [finding('unparseable', 'medium', 'File is too deeply nested to analyse.')]
+    visitor = RuleVisitor()
+    try:
+        visitor.visit(tree)
+    except RecursionError:
+        visitor.findings.append(finding('unparseable', 'medium', 'File is too deeply nested to analyse.'))
+    return visitor.findings
+
+
+def scan_secrets(text):
+    """Return findings for credentials that look hard-coded."""
+    return [
+        finding(
+            'hardcoded-secret', 'high', 'Possible hard-coded credential.',
+            text.count('\n', 0, match.start()) + 1,
+        )
+        for match in SECRET_RE.finditer(text)
+    ]
+
+
+def _requirement(name, spec, ecosystem):
+    return {'name': name.lower(), 'spec': spec.strip(), 'ecosystem': ecosystem}
+
+
+def parse_requirements(text):
+    """Parse a pip requirements file."""
+    dependencies = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(('#', '-r', '-c', '--')):
+            continue
+        if '://' in line or line.startswith(('-e', 'git+')):
+            dependencies.append({'name': line, 'spec': '', 'ecosystem': 'pypi', 'url': True})
+            continue
+        match = REQUIREMENT_RE.match(line)
+        if match:
+            dependencies.append(_requirement(match.group(1), match.group(3).split(';')[0], 'pypi'))
+    return dependencies
+
+
+def parse_package_json(text):
+    """Parse npm dependencies from package.json."""
+    data = json.loads(text)
+    dependencies = []
+    for section in ('dependencies', 'optionalDependencies'):
+        for name, spec in (data.get(section) or {}).items():
+            entry = _requirement(name, str(spec), 'npm')
+            if '://' in str(spec) or str(spec).startswith(('git', 'file:')):
+                entry['url'] = True
+            dependencies.append(entry)
+    return dependencies
+
+
+def parse_pyproject(text):
+    """Parse PEP 621 dependencies from pyproject.toml."""
+    data = tomllib.loads(text)
+    return parse_requirements('\n'.join(data.get('project', {}).get('dependencies', [])))
+
+
+def scan_dependencies(dependencies):
+    """Return findings for declared dependencies."""
+    findings = []
+    for dependency in dependencies:
+        if dependency.get('url'):
+            findings.append(
+                finding('url-dependency', 'medium', f"Dependency installed from a URL: {dependency['name']}")
+            )
+        elif not dependency['spec'] or dependency['spec'] in ('*', 'latest'):
+            findings.append(
+                finding('unpinned-dependency', 'low', f"Dependency {dependency['name']!r} is not pinned.")
+            )
+    return findings
+
+
+def file_kind(path):
+    """Return the analyser for a path, or ``None`` if the file is not scanned."""
+    name = path.rsplit('/', 1)[-1].lower()
+    if name.endswith('.py'):
+        return 'python'
+    if name in ('package.json', 'pyproject.toml'):
+        return name
+    if name.startswith('requirements') and name.endswith('.txt'):
+        return 'requirements'
+    if '.' in name and name[name.rindex('.'):] in TEXT_SUFFIXES:
+        return 'text'
+    return None
+
+
+def scan_file(kind, data):
+    """
+    Analyse one file's contents with the analyser for ``kind``.
+
+    Returns ``{'findings': [...], 'dependencies': [...]}``. The result
+    depends only on ``kind`` and the contents, so it can be cached by
+    content hash.
+    """
+    text = data.decode('utf-8', errors='replace')
+    findings = scan_secrets(text)
+    dependencies = []
+
+    if kind == 'python':
+        findings.extend(scan_python(data))
+    elif kind in ('requirements', 'package.json', 'pyproject.toml'):
+        try:
+            if kind == 'package.json':
+                dependencies = parse_package_json(text)
+            elif kind == 'pyproject.toml':
+                dependencies = parse_pyproject(text)
+            else:
+                dependencies = parse_requirements(text)
+        except (ValueError, tomllib.TOMLDecodeError, AttributeError, RecursionError, MemoryError) as exc:
+            findings.append(finding('invalid-manifest', 'low', f'Could not parse manifest: {exc}'))
+        findings.extend(scan_dependencies(dependencies))
+    return {'findings': findings, 'dependencies': dependencies}
+
+
+def scan_batch(items):
+    """Scan ``[(kind, data), ...]``; the unit of work sent to the pool."""
+    return [scan_file(kind, data) for kind, data in items]
@@ -7,3 +7,7 @@ class MarketplaceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'marketplace'
     verbose_name = 'App Marketplace'
+    
+    def ready(self):
+        """Connect signal handlers."""
+        from . import signals  # noqa: F401
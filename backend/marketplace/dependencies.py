@@ -0,0 +1,251 @@
+"""
+Dependency resolution for marketplace apps.
+
+Each active version of an approved app is a candidate. A candidate is
+compatible with this installation when the running SecurePress version
+lies within its ``min``/``max_securepress_version``, and it depends on
+other apps through ``requires_plugins``. Entries may be strings
+(``"seo-tools>=1.2"``, ``"seo-tools"``) or objects
+(``{"slug": "seo-tools", "version": "^1.2"}``).
+
+The catalog graph is built once per worker and catalog version.
+Resolution is a depth-first search with backtracking over candidates,
+newest stable first. Candidate filtering is memoized per
+``(slug, constraints)``, and finished install plans are stored in the
+shared cache under the catalog version.
+"""
+
+import functools
+import hashlib
+import re
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import get_version
+from core.versioning import InvalidVersion, parse_constraint, parse_version
+
+from .models import AppVersion
+from .search import VERSION_NAME
+
+CACHE_PREFIX = 'marketplace:resolve'
+CACHE_TIMEOUT = 60 * 60
+
+# Upper bound on candidate attempts before giving up on a resolution
+MAX_STEPS = 20000
+
+REQUIREMENT_RE = re.compile(r'^\s*([a-z0-9][a-z0-9_-]*)\s*(.*)$', re.IGNORECASE)
+
+Candidate = namedtuple('Candidate', ['slug', 'version', 'requires', 'is_stable'])
+
+
+class ResolutionError(Exception):
+    """Raised when no consistent set of versions exists."""
+
+
+def parse_requirement(entry):
+    """
+    Parse a ``requires_plugins`` entry into ``(slug, Constraint)``.
+
+    Raises ``InvalidVersion`` for entries that cannot be understood.
+    """
+    if isinstance(entry, dict):
+        slug = entry.get('slug') or entry.get('name')
+        spec = entry.get('version') or ''
+    elif isinstance(entry, str):
+        match = REQUIREMENT_RE.match(entry)
+        if not match:
+            raise InvalidVersion(f'Invalid requirement: {entry!r}')
+        slug, spec = match.groups()
+    else:
+        raise InvalidVersion(f'Invalid requirement: {entry!r}')
+    if not slug:
+        raise InvalidVersion(f'Requirement has no slug: {entry!r}')
+    return str(slug).lower(), parse_constraint(str(spec).strip())
+
+
+@functools.lru_cache(maxsize=4096)
+def core_compatible(minimum, maximum, core):
+    """Whether ``core`` lies within the inclusive ``minimum``/``maximum`` bounds."""
+    try:
+        version = parse_version(core)
+        if minimum and version < parse_version(minimum):
+            return False
+        if maximum and version > parse_version(maximum):
+            return False
+    except InvalidVersion:
+        return False
+    return True
+
+
+class DependencyGraph:
+    """Installable candidates per app slug, newest stable first."""
+
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.matching = functools.lru_cache(maxsize=16384)(self._matching)
+
+    @classmethod
+    def build(cls, core_version=None):
+        """Load every active version of approved apps with one query."""
+        core = core_version or settings.SECUREPRESS_VERSION
+        rows = AppVersion.objects.filter(app__status='approved', is_active=True).values_list(
+            'app__slug', 'version', 'is_stable', 'requires_plugins',
+            'min_securepress_version', 'app__max_securepress_version',
+        )
+        candidates = {}
+        for slug, version, is_stable, requires, minimum, maximum in rows:
+            if not core_compatible(minimum or '', maximum or '', core):
+                continue
+            try:
+                candidate = Candidate(
+                    slug,
+                    parse_version(version),
+                    tuple(parse_requirement(entry) for entry in (requires or [])),
+                    is_stable,
+                )
+            except InvalidVersion:
+                continue
+            candidates.setdefault(slug, []).append(candidate)
+        for versions in candidates.values():
+            versions.sort(key=lambda candidate: (candidate.is_stable, candidate.version), reverse=True)
+        return cls(candidates)
+
+    def _matching(self, slug, constraints):
+        """Candidates of ``slug`` satisfying every constraint, in preference order."""
+        return tuple(
+            candidate for candidate in self.candidates.get(slug, ())
+            if all(constraint.contains(candidate.version) for constraint in constraints)
+        )
+
+    def resolve(self, slug, constraint=None):
+        """
+        Return an install plan for ``slug`` as a list of candidates,
+        dependencies before their dependents.
+
+        Raises :class:`ResolutionError` if no consistent plan exists.
+        """
+        root = (slug, constraint or parse_constraint(''), None)
+        state = {'steps': 0, 'conflict': None}
+        chosen = self._solve({}, {}, (root,), state)
+        if chosen is None:
+            raise ResolutionError(state['conflict'] or f'Cannot resolve {slug!r}.')
+        return self._order(chosen, slug)
+
+    def _solve(self, chosen, constraints, pending, state):
+        """
+        Depth-first search; returns ``{slug: candidate}`` or ``None``.
+
+        Recursion only happens when a new app is chosen, so the depth is
+        bounded by the size of the plan.
+        """
+        constraints = dict(constraints)
+        while pending:
+            (slug, constraint, required_by), pending = pending[0], pending[1:]
+            known = constraints.get(slug, ())
+            if constraint not in known:
+                constraints[slug] = known = known + (constraint,)
+            if slug not in chosen:
+                break
+            if not constraint.contains(chosen[slug].version):
+                state['conflict'] = (
+                    f'{slug} {chosen[slug].version} is selected but {required_by or "the request"} '
+                    f'requires {slug} {constraint}.'
+                )
+                return None
+        else:
+            return chosen
+
+        options = self.matching(slug, tuple(sorted(known, key=str)))
+        if not options:
+            if slug not in self.candidates:
+                state['conflict'] = f'{slug} is not available in the marketplace.'
+            else:
+                state['conflict'] = (
+                    f'No version of {slug} satisfies {", ".join(str(item) for item in known)}'
+                    f' (required by {required_by or "the request"}).'
+                )
+            return None
+
+        for candidate in options:
+            state['steps'] += 1
+            if state['steps'] > MAX_STEPS:
+                raise ResolutionError('Dependency resolution is too complex.')
+            label = f'{slug} {candidate.version}'
+            result = self._solve(
+                dict(chosen, **{slug: candidate}),
+                constraints,
+                pending + tuple((dep, dep_constraint, label) for dep, dep_constraint in candidate.requires),
+                state,
+            )
+            if result is not None:
+                return result
+        return None
+
+    def _order(self, chosen, root):
+        """Topologically order the chosen candidates, dependencies first."""
+        plan = []
+        visited = set()
+
+        def visit(slug):
+            if slug in visited:
+                return
+            visited.add(slug)
+            for dependency, _ in chosen[slug].requires:
+                visit(dependency)
+            plan.append(chosen[slug])
+
+        visit(root)
+        return plan
+
+
+class DependencyResolver:
+    """Per-process holder of the dependency graph."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._graph = None
+
+    def graph(self):
+        """Return the current graph, rebuilding it if the catalog changed."""
+        version = get_version(VERSION_NAME)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._graph = DependencyGraph.build()
+                    self._version = version
+        return self._graph
+
+    def resolve(self, slug, constraint=''):
+        """
+        Return the install plan for ``slug`` as a list of dicts.
+
+        Plans are cached per catalog version and core version.
+        Raises :class:`ResolutionError` or ``InvalidVersion``.
+        """
+        parsed = parse_constraint(constraint or '')
+        digest = hashlib.sha256(repr(parsed.alternatives).encode()).hexdigest()[:32]
+        key = f'{CACHE_PREFIX}:{get_version(VERSION_NAME)}:{settings.SECUREPRESS_VERSION}:{slug}:{digest}'
+        plan = cache.get(key)
+        if plan is None:
+            plan = [
+                {
+                    'slug': candidate.slug,
+                    'version': str(candidate.version),
+                    'requires': [f'{dependency} {spec.text}'.strip() for dependency, spec in candidate.requires],
+                }
+                for candidate in self.graph().resolve(slug, parsed)
+            ]
+            cache.set(key, plan, CACHE_TIMEOUT)
+        return plan
+
+
+resolver = DependencyResolver()
+
+
+def resolve_install_plan(slug, constraint=''):
+    """Resolve an install plan for an app."""
+    return resolver.resolve(slug, constraint)
@@ -0,0 +1,257 @@
+"""
+Package delivery for marketplace app versions.
+
+Packages are verified once, when a version's file is uploaded: the
+SHA-256 and size are computed by streaming the file and checked against
+``package_checksum``. Downloads then never re-hash the file; they are
+either handed to the front-end server with ``X-Accel-Redirect`` or
+streamed with a file response that supports single byte ranges.
+
+Download counts are buffered per worker and written to both
+``AppVersion`` and ``MarketplaceApp`` with one bulk ``UPDATE`` per table
+when the buffer is flushed: once ``MARKETPLACE_DOWNLOAD_FLUSH_THRESHOLD``
+downloads are buffered, or by a timer ``MARKETPLACE_DOWNLOAD_FLUSH_INTERVAL``
+seconds after a download arrives.
+"""
+
+import atexit
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+
+from .models import AppVersion, MarketplaceApp
+
+logger = logging.getLogger('securepress.marketplace')
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_digest(file):
+    """Return ``(sha256 hex digest, size)`` of a file, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    file.open('rb')
+    try:
+        for chunk in file.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    finally:
+        file.seek(0)
+    return digest.hexdigest(), size
+
+
+def verify_package(version):
+    """
+    Hash a newly uploaded package and check it against ``package_checksum``.
+
+    Fills in ``package_size`` (and ``package_checksum`` when it was left
+    blank). Raises ``ValidationError`` on a mismatch. Files that are
+    already stored are not re-read.
+    """
+    package = version.package_file
+    if not package or getattr(package, '_committed', True):
+        return
+    checksum, size = file_digest(package)
+    expected = (version.package_checksum or '').strip().lower()
+    if expected and expected != checksum:
+        raise ValidationError({
+            'package_checksum': f'Checksum mismatch: uploaded file has SHA-256 {checksum}.'
+        })
+    version.package_checksum = checksum
+    version.package_size = size
+
+
+def parse_range(header, size):
+    """
+    Parse a single ``bytes=`` range against a file of ``size`` bytes.
+
+    Returns ``(start, end)`` inclusive, ``None`` when the header should be
+    ignored (absent, multiple ranges or malformed), or ``False`` when the
+    range cannot be satisfied.
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(handle, start, length):
+    try:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def package_response(request, version):
+    """
+    Build the response that delivers ``version.package_file``.
+
+    Returns ``(response, counted)`` where ``counted`` says whether the
+    request is a new download rather than a resumed range or a cache
+    revalidation.
+    """
+    package = version.package_file
+    extension = '.tar.gz' if package.name.endswith('.tar.gz') else Path(package.name).suffix
+    filename = f'{version.app.slug}-{version.version}{extension}'
+    etag = f'"{version.package_checksum}"'
+
+    if request.headers.get('If-None-Match') == etag:
+        return HttpResponseNotModified(headers={'ETag': etag}), False
+
+    prefix = settings.MARKETPLACE_DOWNLOAD_ACCEL_PREFIX
+    if prefix:
+        response = HttpResponse(content_type='application/octet-stream')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(package.name)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        byte_range = parse_range(request.headers.get('Range'), version.package_size)
+        counted = byte_range is None or byte_range[0] == 0
+    else:
+        size = package.size
+        byte_range = parse_range(request.headers.get('Range'), size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response, False
+        if byte_range is None or byte_range == (0, size - 1):
+            # Full downloads go through the server's file wrapper (sendfile)
+            response = FileResponse(package.open('rb'), as_attachment=True, filename=filename)
+            counted = True
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(package.open('rb'), start, end - start + 1),
+                status=206,
+                content_type='application/octet-stream',
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            counted = start == 0
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['X-Checksum-SHA256'] = version.package_checksum
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response, counted
+
+
+def _bulk_increment(model, counts):
+    """Add ``counts[pk]`` to ``download_count`` of each row in one UPDATE."""
+    increment = Case(
+        *(When(pk=pk, then=Value(count)) for pk, count in counts.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    model.objects.filter(pk__in=list(counts)).update(download_count=F('download_count') + increment)
+
+
+class DownloadCounter:
+    """Per-process buffer of download counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = Counter()
+        self._apps = Counter()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    def record(self, version):
+        """Count one download of ``version`` and flush if the buffer is due."""
+        with self._lock:
+            self._versions[version.pk] += 1
+            self._apps[version.app_id] += 1
+            self._pending += 1
+            due = (
+                self._pending >= settings.MARKETPLACE_DOWNLOAD_FLUSH_THRESHOLD
+                or time.monotonic() - self._last_flush >= settings.MARKETPLACE_DOWNLOAD_FLUSH_INTERVAL
+            )
+            if not due:
+                self._schedule()
+        if due:
+            self.flush()
+
+    def _schedule(self):
+        """Flush within the interval even if no further downloads arrive. Call with the lock held."""
+        if self._timer is None:
+            self._timer = threading.Timer(settings.MARKETPLACE_DOWNLOAD_FLUSH_INTERVAL, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            # The timer thread's database connection is not reused
+            connections.close_all()
+
+    def flush(self):
+        """Write buffered counts to the database. Returns the number flushed."""
+        with self._lock:
+            versions, apps, pending = self._versions, self._apps, self._pending
+            self._versions, self._apps, self._pending = Counter(), Counter(), 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            with transaction.atomic():
+                _bulk_increment(AppVersion, versions)
+                _bulk_increment(MarketplaceApp, apps)
+        except DatabaseError:
+            logger.exception('Failed to flush %d buffered download(s)', pending)
+            with self._lock:
+                self._versions.update(versions)
+                self._apps.update(apps)
+                self._pending += pending
+                self._schedule()
+            return 0
+        return pending
+
+
+counter = DownloadCounter()
+
+
+def record_download(version):
+    """Buffer one download of ``version``."""
+    counter.record(version)
+
+
+def flush_downloads():
+    """Flush this worker's buffered download counts."""
+    return counter.flush()
+
+
+atexit.register(flush_downloads)
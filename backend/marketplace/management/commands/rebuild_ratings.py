@@ -0,0 +1,38 @@
+"""
+Recompute marketplace rating aggregates from reviews.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marketplace.ratings import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or with --verify, check) stored rating aggregates for marketplace apps.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Report apps whose stored aggregates drifted without writing; exits non-zero on drift.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Apps processed per batch.')
+        parser.add_argument('--app', type=int, action='append', dest='app_ids', help='Limit to an app id (repeatable).')
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        checked, drifted = rebuild(
+            app_ids=options['app_ids'],
+            batch_size=options['batch_size'],
+            dry_run=options['verify'],
+        )
+        if options['verify']:
+            if drifted:
+                raise CommandError(
+                    f'{len(drifted)} of {checked} app(s) have stale ratings: '
+                    + ', '.join(str(pk) for pk in drifted)
+                )
+            self.stdout.write(self.style.SUCCESS(f'All {checked} app(s) have consistent ratings.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Checked {checked} app(s), rebuilt {len(drifted)}.'))
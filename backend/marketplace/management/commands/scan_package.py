@@ -0,0 +1,44 @@
+"""
+Run the security scanning pipeline on marketplace packages.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marketplace.models import AppVersion
+from marketplace.scanner import scan_version
+
+
+class Command(BaseCommand):
+    help = 'Scan app version packages and record security vetting reports.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('app', nargs='?', help='App slug.')
+        parser.add_argument('--app-version', dest='app_version', help='Version to scan (default: all active versions).')
+        parser.add_argument('--unscanned', action='store_true', help='Scan every version that has never been scanned.')
+        parser.add_argument('--workers', type=int, help='Worker processes for analysis (default: CPU count).')
+    
+    def handle(self, *args, **options):
+        versions = AppVersion.objects.select_related('app').order_by('app__slug', 'created_at')
+        if options['app']:
+            versions = versions.filter(app__slug=options['app'])
+            if options['app_version']:
+                versions = versions.filter(version=options['app_version'])
+            else:
+                versions = versions.filter(is_active=True)
+        elif options['unscanned']:
+            versions = versions.filter(security_scan_date__isnull=True)
+        else:
+            raise CommandError('Give an app slug or --unscanned.')
+        
+        versions = list(versions)
+        if not versions:
+            raise CommandError('No matching app versions.')
+        
+        for version in versions:
+            report = scan_version(version, workers=options['workers'])
+            status = self.style.SUCCESS('passed') if report.passed else self.style.ERROR('failed')
+            self.stdout.write(
+                f'{version}: {status}, score {report.security_score} ({report.risk_level}), '
+                f"{report.static_analysis_results['files_scanned']} file(s), "
+                f"{report.static_analysis_results['cache_hits']} cached"
+            )
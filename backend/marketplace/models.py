@@ -4,7 +4,7 @@ Marketplace models for apps, themes, and plugins with security vetting.
 
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 
@@ -138,6 +138,12 @@ class MarketplaceApp(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(5)]
     )
     rating_count = models.PositiveIntegerField(_('rating count'), default=0)
+    rating_sum = models.PositiveIntegerField(_('rating sum'), default=0)
+    rating_1_count = models.PositiveIntegerField(_('1-star ratings'), default=0)
+    rating_2_count = models.PositiveIntegerField(_('2-star ratings'), default=0)
+    rating_3_count = models.PositiveIntegerField(_('3-star ratings'), default=0)
+    rating_4_count = models.PositiveIntegerField(_('4-star ratings'), default=0)
+    rating_5_count = models.PositiveIntegerField(_('5-star ratings'), default=0)
     
     # Flags
     is_featured = models.BooleanField(_('is featured'), default=False)
@@ -167,6 +173,11 @@ class MarketplaceApp(models.Model):
         """Check if app is approved for marketplace."""
         return self.status == 'approved'
     
+    @property
+    def rating_histogram(self):
+        """Number of counted reviews per star rating."""
+        return {star: getattr(self, f'rating_{star}_count') for star in range(1, 6)}
+    
     @property
     def passed_all_security_checks(self):
         """Check if app passed all security checks."""
@@ -222,6 +233,17 @@ class AppVersion(models.Model):
     
     def __str__(self):
         return f"{self.app.name} v{self.version}"
+    
+    def clean(self):
+        """Verify an uploaded package against its checksum."""
+        from .downloads import verify_package
+        verify_package(self)
+    
+    def save(self, *args, **kwargs):
+        """Record checksum and size of a newly uploaded package."""
+        from .downloads import verify_package
+        verify_package(self)
+        super().save(*args, **kwargs)
 
 
 class AppReview(models.Model):
@@ -270,6 +292,11 @@ class AppReview(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.app.name} ({self.rating}★)"
+    
+    def save(self, *args, **kwargs):
+        """Save in a transaction so the rating signals can lock the stored row (see ratings.py)."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class SecurityVettingReport(models.Model):
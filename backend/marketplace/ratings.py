@@ -0,0 +1,187 @@
+"""
+Incremental rating aggregation for marketplace apps.
+
+Each app stores a running sum, a count and a per-star histogram of the
+reviews that count towards its rating (approved and not flagged). Review
+writes lock the stored review row, compare it with the new state and
+translate the difference into deltas that are applied with a single atomic
+``UPDATE`` using ``F()`` expressions, which also recomputes
+``rating_average`` from the new sum and count. Nothing ever runs ``AVG()``
+over an app's reviews on the write path.
+
+``rebuild`` recomputes the aggregates from scratch in batches and is
+used by bulk moderation actions and the ``rebuild_ratings`` command.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Value, When
+from django.db.models.functions import Cast, Round
+
+from .models import AppReview, MarketplaceApp
+from .search import invalidate_catalog
+
+STARS = range(1, 6)
+
+TRACKED_FIELDS = ('app_id', 'rating', 'is_approved', 'is_flagged')
+
+
+def is_counted(review):
+    """Whether a review contributes to its app's rating."""
+    return review.is_approved and not review.is_flagged
+
+
+def review_state(review):
+    """
+    Return ``(app_id, rating)`` if the review is counted, else ``None``.
+    """
+    if is_counted(review) and review.rating in STARS:
+        return review.app_id, review.rating
+    return None
+
+
+def lock_previous_state(review):
+    """
+    Lock the review's stored row and record its counted state.
+
+    Called before a write, inside the write's transaction, so the delta is
+    computed from what the row holds rather than from a possibly stale
+    instance, and concurrent writes to the same review are serialized.
+    """
+    stored = None
+    if review.pk is not None:
+        stored = AppReview.objects.select_for_update().filter(pk=review.pk).only(*TRACKED_FIELDS).first()
+    review._rating_state = review_state(stored) if stored is not None else None
+
+
+def apply_deltas(deltas):
+    """
+    Apply ``{app_id: {'sum': n, 'count': n, star: n}}`` deltas atomically.
+
+    All right-hand sides of an UPDATE see the old row, so the new average
+    is derived from the old sum and count plus the deltas in the same
+    statement.
+    """
+    changed = False
+    for app_id, delta in deltas.items():
+        if not any(delta.values()):
+            continue
+        new_sum = F('rating_sum') + delta['sum']
+        new_count = F('rating_count') + delta['count']
+        updates = {
+            'rating_sum': new_sum,
+            'rating_count': new_count,
+            'rating_average': Case(
+                When(
+                    rating_count__gt=-delta['count'],
+                    then=Round(
+                        Cast(new_sum, DecimalField(max_digits=12, decimal_places=4)) / new_count,
+                        2,
+                    ),
+                ),
+                default=Value(Decimal('0')),
+                output_field=DecimalField(max_digits=3, decimal_places=2),
+            ),
+        }
+        for star in STARS:
+            if delta.get(star):
+                field = f'rating_{star}_count'
+                updates[field] = F(field) + delta[star]
+        MarketplaceApp.objects.filter(pk=app_id).update(**updates)
+        changed = True
+    if changed:
+        transaction.on_commit(invalidate_catalog)
+
+
+def _add(deltas, state, sign):
+    if state is None:
+        return
+    app_id, rating = state
+    delta = deltas.setdefault(app_id, defaultdict(int))
+    delta['sum'] += sign * rating
+    delta['count'] += sign
+    delta[rating] += sign
+
+
+def review_saved(review):
+    """Apply the difference between a review's previous and current state."""
+    deltas = {}
+    _add(deltas, review._rating_state, -1)
+    _add(deltas, review_state(review), 1)
+    apply_deltas(deltas)
+
+
+def review_deleted(review):
+    """Remove a deleted review's contribution."""
+    deltas = {}
+    _add(deltas, review._rating_state, -1)
+    apply_deltas(deltas)
+
+
+def compute(app_ids):
+    """Return ``{app_id: histogram}`` for the given apps with one query."""
+    histograms = {app_id: dict.fromkeys(STARS, 0) for app_id in app_ids}
+    rows = (
+        AppReview.objects.filter(app_id__in=app_ids, is_approved=True, is_flagged=False, rating__in=STARS)
+        .values('app_id', 'rating')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        histograms[row['app_id']][row['rating']] = row['total']
+    return histograms
+
+
+def aggregate_fields(histogram):
+    """Stored field values for a histogram."""
+    count = sum(histogram.values())
+    total = sum(star * n for star, n in histogram.items())
+    fields = {
+        'rating_sum': total,
+        'rating_count': count,
+        'rating_average': (Decimal(total) / count).quantize(Decimal('0.01')) if count else Decimal('0.00'),
+    }
+    for star in STARS:
+        fields[f'rating_{star}_count'] = histogram[star]
+    return fields
+
+
+AGGREGATE_FIELDS = ['rating_sum', 'rating_count', 'rating_average'] + [f'rating_{star}_count' for star in STARS]
+
+
+def rebuild(app_ids=None, batch_size=500, dry_run=False):
+    """
+    Recompute stored aggregates from reviews, ``batch_size`` apps at a time.
+
+    Returns ``(checked, drifted)`` where ``drifted`` lists the ids of apps
+    whose stored values were wrong. With ``dry_run`` nothing is written.
+    """
+    queryset = MarketplaceApp.objects.order_by('pk')
+    if app_ids is not None:
+        queryset = queryset.filter(pk__in=list(app_ids))
+    checked = 0
+    drifted = []
+    last_pk = 0
+    while True:
+        apps = list(queryset.filter(pk__gt=last_pk).only('pk', *AGGREGATE_FIELDS)[:batch_size])
+        if not apps:
+            break
+        last_pk = apps[-1].pk
+        histograms = compute([app.pk for app in apps])
+        stale = []
+        for app in apps:
+            expected = aggregate_fields(histograms[app.pk])
+            if any(getattr(app, field) != value for field, value in expected.items()):
+                for field, value in expected.items():
+                    setattr(app, field, value)
+                stale.append(app)
+        checked += len(apps)
+        drifted.extend(app.pk for app in stale)
+        if stale and not dry_run:
+            with transaction.atomic():
+                MarketplaceApp.objects.bulk_update(stale, AGGREGATE_FIELDS)
+    if drifted and not dry_run:
+        transaction.on_commit(invalidate_catalog)
+    return checked, drifted
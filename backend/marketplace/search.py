@@ -0,0 +1,270 @@
+"""
+Marketplace catalog search and faceting.
+
+Each worker builds an in-memory index over approved apps: an inverted
+index from terms to weighted postings over name, description, tags and
+features, plus one bitmap (a Python int used as a bitset) per term and
+per facet value. Filters and facet counts are bitwise ANDs and popcounts,
+so a query never scans the table or filters JSON in Python.
+
+The index is rebuilt when the catalog version in the shared cache is
+bumped by a MarketplaceApp change.
+"""
+
+import bisect
+import math
+import re
+import threading
+from collections import defaultdict
+
+from core.cache import bump_version, get_version
+
+from .models import MarketplaceApp
+
+VERSION_NAME = 'marketplace:catalog'
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with', 'your', 'you',
+})
+
+# Relative weight of a term occurrence in each field
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'tags': 2.0,
+    'features': 1.5,
+    'description': 1.0,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Blend of text relevance and popularity signals in the final score
+TEXT_WEIGHT = 0.7
+RATING_WEIGHT = 0.2
+DOWNLOAD_WEIGHT = 0.1
+
+# Ratings from few reviews are shrunk towards zero
+RATING_CONFIDENCE = 10
+
+FACETS = ('app_type', 'tag', 'price', 'security_level')
+
+DOCUMENT_FIELDS = (
+    'id', 'name', 'slug', 'description', 'app_type', 'current_version',
+    'is_free', 'price', 'security_level', 'rating_average', 'rating_count',
+    'download_count', 'tags', 'features', 'is_featured', 'is_verified',
+)
+
+
+def tokenize(text):
+    """Lowercase and split text into index terms."""
+    return [
+        token for token in TOKEN_RE.findall(str(text).lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def _strings(value):
+    if isinstance(value, list):
+        return [str(item) for item in value if isinstance(item, (str, int, float))]
+    return []
+
+
+def iter_bits(bits):
+    """Yield the ordinals set in a bitmap."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class CatalogIndex:
+    """Immutable search index over a snapshot of approved apps."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.all_bits = (1 << len(documents)) - 1
+        self.postings = defaultdict(dict)
+        self.term_bits = defaultdict(int)
+        self.facet_bits = {facet: defaultdict(int) for facet in FACETS}
+        self.lengths = []
+        self.max_downloads = max((doc['download_count'] for doc in documents), default=0)
+
+        for ordinal, doc in enumerate(documents):
+            bit = 1 << ordinal
+            weights = defaultdict(float)
+            for field, weight in FIELD_WEIGHTS.items():
+                value = doc[field]
+                text = ' '.join(_strings(value)) if isinstance(value, list) else value
+                for token in tokenize(text):
+                    weights[token] += weight
+            self.lengths.append(sum(weights.values()))
+            for term, weight in weights.items():
+                self.postings[term][ordinal] = weight
+                self.term_bits[term] |= bit
+
+            self.facet_bits['app_type'][doc['app_type']] |= bit
+            self.facet_bits['price']['free' if doc['is_free'] else 'paid'] |= bit
+            if doc['security_level']:
+                self.facet_bits['security_level'][doc['security_level']] |= bit
+            for tag in {tag.lower() for tag in _strings(doc['tags'])}:
+                self.facet_bits['tag'][tag] |= bit
+
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        self.sorted_terms = sorted(self.postings)
+
+    @classmethod
+    def build(cls):
+        """Build an index from all approved apps with one query."""
+        rows = MarketplaceApp.objects.filter(status='approved').order_by('pk').values(*DOCUMENT_FIELDS)
+        documents = []
+        for row in rows:
+            row['price'] = str(row['price'])
+            row['rating_average'] = float(row['rating_average'])
+            documents.append(row)
+        return cls(documents)
+
+    def expand(self, term, prefix):
+        """Terms matching a query term; the last term also matches as a prefix."""
+        if not prefix:
+            return [term] if term in self.postings else []
+        start = bisect.bisect_left(self.sorted_terms, term)
+        matches = []
+        for candidate in self.sorted_terms[start:]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def match(self, terms):
+        """
+        Return ``(bitmap, expanded terms)`` for documents matching every query term.
+
+        The last term is treated as a prefix to support search-as-you-type.
+        """
+        bits = self.all_bits
+        expanded = []
+        for position, term in enumerate(terms):
+            variants = self.expand(term, prefix=position == len(terms) - 1)
+            term_bits = 0
+            for variant in variants:
+                term_bits |= self.term_bits[variant]
+            bits &= term_bits
+            expanded.extend(variants)
+            if not bits:
+                break
+        return bits, expanded
+
+    def filter_bits(self, filters, exclude=None):
+        """AND together facet filters; values within one facet are ORed."""
+        bits = self.all_bits
+        for facet, values in filters.items():
+            if facet == exclude or not values:
+                continue
+            facet_bits = 0
+            for value in values:
+                facet_bits |= self.facet_bits[facet].get(value, 0)
+            bits &= facet_bits
+        return bits
+
+    def facet_counts(self, text_bits, filters):
+        """Disjunctive facet counts: each facet ignores its own filter."""
+        counts = {}
+        for facet in FACETS:
+            base = text_bits & self.filter_bits(filters, exclude=facet)
+            counts[facet] = {
+                value: count
+                for value, bits in sorted(self.facet_bits[facet].items())
+                if (count := (base & bits).bit_count())
+            }
+        return counts
+
+    def text_scores(self, ordinals, terms):
+        """BM25 scores of the given documents for the expanded query terms."""
+        total = len(self.documents)
+        scores = dict.fromkeys(ordinals, 0.0)
+        for term in terms:
+            postings = self.postings[term]
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for ordinal in ordinals:
+                tf = postings.get(ordinal)
+                if tf is None:
+                    continue
+                norm = 1 - B + B * self.lengths[ordinal] / (self.average_length or 1)
+                scores[ordinal] += idf * tf * (K1 + 1) / (tf + K1 * norm)
+        return scores
+
+    def quality(self, ordinal):
+        """Popularity signal in [0, 1] from ratings and downloads."""
+        doc = self.documents[ordinal]
+        confidence = doc['rating_count'] / (doc['rating_count'] + RATING_CONFIDENCE)
+        rating = doc['rating_average'] / 5 * confidence
+        downloads = (
+            math.log1p(doc['download_count']) / math.log1p(self.max_downloads)
+            if self.max_downloads else 0.0
+        )
+        total = RATING_WEIGHT + DOWNLOAD_WEIGHT
+        return (RATING_WEIGHT * rating + DOWNLOAD_WEIGHT * downloads) / total
+
+    def search(self, query='', filters=None, offset=0, limit=20):
+        """
+        Run a query and return ``(total, results, facets)``.
+
+        ``filters`` maps facet names to lists of accepted values.
+        """
+        filters = {facet: values for facet, values in (filters or {}).items() if facet in FACETS}
+        terms = tokenize(query)
+        text_bits, expanded = self.match(terms) if terms else (self.all_bits, [])
+        bits = text_bits & self.filter_bits(filters)
+        ordinals = list(iter_bits(bits))
+
+        if expanded:
+            text = self.text_scores(ordinals, expanded)
+            best = max(text.values(), default=0.0) or 1.0
+            scores = {
+                ordinal: TEXT_WEIGHT * text[ordinal] / best + (1 - TEXT_WEIGHT) * self.quality(ordinal)
+                for ordinal in ordinals
+            }
+        else:
+            scores = {ordinal: self.quality(ordinal) for ordinal in ordinals}
+
+        ranked = sorted(ordinals, key=lambda ordinal: (-scores[ordinal], ordinal))
+        results = [
+            dict(self.documents[ordinal], score=round(scores[ordinal], 4))
+            for ordinal in ranked[offset:offset + limit]
+        ]
+        return len(ordinals), results, self.facet_counts(text_bits, filters)
+
+
+class CatalogSearch:
+    """Per-process holder of the catalog index."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._index = None
+
+    def index(self):
+        """Return the current index, rebuilding it if the catalog changed."""
+        version = get_version(VERSION_NAME)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._index = CatalogIndex.build()
+                    self._version = version
+        return self._index
+
+
+catalog = CatalogSearch()
+
+
+def search_catalog(query='', filters=None, offset=0, limit=20):
+    """Search approved marketplace apps."""
+    return catalog.index().search(query, filters, offset, limit)
+
+
+def invalidate_catalog():
+    """Force every worker to rebuild its catalog index."""
+    bump_version(VERSION_NAME)
@@ -0,0 +1,87 @@
+"""
+Serializers for marketplace endpoints.
+"""
+
+from rest_framework import serializers
+
+from .models import MarketplaceApp
+
+
+class MarketplaceAppListSerializer(serializers.ModelSerializer):
+    """Compact serializer for catalog listings."""
+    
+    class Meta:
+        model = MarketplaceApp
+        fields = [
+            'id',
+            'name',
+            'slug',
+            'app_type',
+            'current_version',
+            'is_free',
+            'price',
+            'security_level',
+            'rating_average',
+            'rating_count',
+            'download_count',
+            'tags',
+            'is_featured',
+            'is_verified',
+        ]
+        read_only_fields = fields
+
+
+class MarketplaceAppSerializer(serializers.ModelSerializer):
+    """Full public representation of an approved app."""
+    
+    developer = serializers.CharField(source='developer.get_full_name', read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    
+    class Meta:
+        model = MarketplaceApp
+        fields = [
+            'id',
+            'name',
+            'slug',
+            'description',
+            'app_type',
+            'developer',
+            'developer_website',
+            'support_email',
+            'current_version',
+            'download_count',
+            'active_installations',
+            'is_free',
+            'price',
+            'security_level',
+            'security_score',
+            'homepage_url',
+            'documentation_url',
+            'source_code_url',
+            'license',
+            'icon',
+            'banner',
+            'min_securepress_version',
+            'max_securepress_version',
+            'requires_plugins',
+            'features',
+            'tags',
+            'rating_average',
+            'rating_count',
+            'rating_histogram',
+            'is_featured',
+            'is_verified',
+            'requires_api_key',
+            'collects_data',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class CatalogSearchSerializer(serializers.Serializer):
+    """Query parameters for catalog search."""
+    
+    q = serializers.CharField(required=False, allow_blank=True, max_length=200)
+    page = serializers.IntegerField(required=False, min_value=1, default=1)
+    page_size = serializers.IntegerField(required=False, min_value=1, max_value=100, default=20)
@@ -0,0 +1,57 @@
+"""
+Signal handlers for marketplace models.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import ratings
+from .models import AppReview, AppVersion, MarketplaceApp
+from .search import invalidate_catalog
+
+
+@receiver(post_save, sender=MarketplaceApp)
+@receiver(post_delete, sender=MarketplaceApp)
+def app_changed(sender, instance, **kwargs):
+    """Rebuild catalog search indexes once the change is committed."""
+    transaction.on_commit(invalidate_catalog)
+
+
+# AppVersion fields that do not affect search or dependency resolution
+VERSION_BOOKKEEPING_FIELDS = {
+    'download_count', 'security_scan_passed', 'security_scan_date', 'security_issues_found',
+}
+
+
+@receiver(post_save, sender=AppVersion)
+def version_saved(sender, instance, update_fields=None, **kwargs):
+    """Rebuild catalog indexes when an installable version changes."""
+    if update_fields is not None and VERSION_BOOKKEEPING_FIELDS.issuperset(update_fields):
+        return
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(post_delete, sender=AppVersion)
+def version_deleted(sender, instance, **kwargs):
+    """Rebuild catalog indexes when a version is removed."""
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(pre_save, sender=AppReview)
+@receiver(pre_delete, sender=AppReview)
+def review_changing(sender, instance, **kwargs):
+    """Lock the stored review and record its state before it is overwritten."""
+    ratings.lock_previous_state(instance)
+
+
+@receiver(post_save, sender=AppReview)
+def review_saved(sender, instance, **kwargs):
+    """Update the app's rating aggregates from the review change."""
+    ratings.review_saved(instance)
+
+
+@receiver(post_delete, sender=AppReview)
+def review_deleted(sender, instance, **kwargs):
+    """Remove the review from the app's rating aggregates."""
+    ratings.review_deleted(instance)
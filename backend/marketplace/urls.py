@@ -0,0 +1,15 @@
+"""
+URL configuration for marketplace endpoints.
+"""
+
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter
+
+from .views import MarketplaceAppViewSet
+
+router = SimpleRouter()
+router.register(r'apps', MarketplaceAppViewSet, basename='marketplace-app')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,110 @@
+"""
+Views for marketplace endpoints.
+"""
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.versioning import InvalidVersion
+
+from .dependencies import ResolutionError, resolve_install_plan
+from .downloads import package_response, record_download
+from .models import AppVersion, MarketplaceApp
+from .search import FACETS, search_catalog
+from .serializers import CatalogSearchSerializer, MarketplaceAppListSerializer, MarketplaceAppSerializer
+
+
+class MarketplaceAppViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only catalog of approved marketplace apps.
+    
+    Listing and detail views only expose apps that passed vetting.
+    """
+    
+    queryset = MarketplaceApp.objects.filter(status='approved').select_related('developer')
+    serializer_class = MarketplaceAppSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    lookup_field = 'slug'
+    
+    def get_serializer_class(self):
+        """Use list serializer for list action."""
+        if self.action == 'list':
+            return MarketplaceAppListSerializer
+        return MarketplaceAppSerializer
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search with facet counts.
+        
+        Accepts ``q`` plus repeatable facet filters ``app_type``, ``tag``,
+        ``price`` (free/paid) and ``security_level``.
+        """
+        params = CatalogSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        page = params.validated_data['page']
+        page_size = params.validated_data['page_size']
+        filters = {
+            facet: [value.lower() if facet == 'tag' else value for value in request.query_params.getlist(facet)]
+            for facet in FACETS
+            if request.query_params.getlist(facet)
+        }
+        total, results, facets = search_catalog(
+            params.validated_data.get('q', ''),
+            filters,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+        )
+        return Response({
+            'count': total,
+            'page': page,
+            'page_size': page_size,
+            'results': results,
+            'facets': facets,
+        })
+    
+    @action(detail=True, methods=['get'], url_path=r'versions/(?P<version>[^/]+)/download')
+    def download(self, request, slug=None, version=None):
+        """
+        Download the package of an active app version.
+        
+        Single byte ranges are supported for resumed downloads; only
+        requests starting at the first byte are counted.
+        """
+        app = self.get_object()
+        app_version = get_object_or_404(
+            AppVersion.objects.select_related('app'),
+            app=app,
+            version=version,
+            is_active=True,
+        )
+        response, counted = package_response(request, app_version)
+        if counted:
+            record_download(app_version)
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def resolve(self, request, slug=None):
+        """
+        Resolve an install plan for the app and its dependencies.
+        
+        ``version`` optionally constrains the app itself (e.g. ``^1.2``).
+        Responds with 409 when no consistent set of versions exists.
+        """
+        app = self.get_object()
+        try:
+            plan = resolve_install_plan(app.slug, request.query_params.get('version', ''))
+        except InvalidVersion as exc:
+            raise ValidationError({'version': [str(exc)]})
+        except ResolutionError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response({
+            'app': app.slug,
+            'securepress_version': settings.SECUREPRESS_VERSION,
+            'plan': plan,
+        })
@@ -0,0 +1,18 @@
+"""
+Admin URLs, included lazily from ``securepress.urls`` under the ``admin``
+namespace.
+
+Importing this module runs admin autodiscovery, so it happens on the
+first request under ``/admin/`` rather than when a worker starts.
+"""
+
+from django.contrib import admin
+
+admin.autodiscover()
+
+# Custom admin site configuration
+admin.site.site_header = 'SecurePress Administration'
+admin.site.site_title = 'SecurePress Admin'
+admin.site.index_title = 'Welcome to SecurePress Administration'
+
+urlpatterns = admin.site.get_urls()
@@ -0,0 +1,29 @@
+"""
+Application configs for SecurePress project-level apps.
+"""
+
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
+
+
+def check_admin(app_configs, **kwargs):
+    """Run the admin checks once the admin modules have been imported."""
+    from django.contrib import admin
+    
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+class AdminConfig(SimpleAdminConfig):
+    """
+    Django admin without autodiscovery at startup.
+    
+    The apps' ``admin`` modules (and everything they import, such as the
+    package scanner) are loaded by ``securepress.admin_urls`` on the first
+    request under ``/admin/``, or by the system checks.
+    """
+    
+    def ready(self):
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_admin, checks.Tags.admin)
@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'securepress.settings.production')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up
+from themes.collab import layout_socket  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """Send WebSocket connections to collaborative editing and everything else to Django."""
+    if scope['type'] == 'websocket':
+        await layout_socket(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,39 @@
+"""
+Connection pool metrics.
+
+With ``OPTIONS['pool']`` set (see ``settings/production.py``), each
+process keeps one bounded psycopg pool per database alias, shared by all
+its threads. Connections are checked on checkout and replaced after their
+maximum lifetime. :func:`pool_stats` reports the counters of those pools.
+"""
+
+from django.db import connections
+
+
+def pool_stats():
+    """Counters of this process's connection pools by database alias; empty without pooling."""
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is None:
+            continue
+        raw = pool.get_stats()
+        size = raw.get('pool_size', 0)
+        available = raw.get('pool_available', 0)
+        stats[alias] = {
+            'min_size': raw.get('pool_min', 0),
+            'max_size': raw.get('pool_max', 0),
+            'size': size,
+            'in_use': size - available,
+            'available': available,
+            'waiting': raw.get('requests_waiting', 0),
+            'requests': raw.get('requests_num', 0),
+            'waits': raw.get('requests_queued', 0),
+            'wait_ms': raw.get('requests_wait_ms', 0),
+            'timeouts': raw.get('requests_errors', 0),
+            'connections_opened': raw.get('connections_num', 0),
+            'connection_errors': raw.get('connections_errors', 0),
+            'connections_lost': raw.get('connections_lost', 0),
+            'bad_returns': raw.get('returns_bad', 0),
+        }
+    return stats
@@ -0,0 +1,191 @@
+"""
+Read-replica routing.
+
+Aliases listed in ``DATABASE_REPLICAS`` are read-only copies of
+``default``. :class:`ReplicaRoutingMiddleware` marks safe-method API
+requests and admin change lists as replica reads. For those requests
+:class:`ReplicaRouter` sends ORM reads to one replica, picked per request.
+Everything else, including all writes, migrations, management commands
+and on-commit work outside a request, uses the primary.
+
+A client that has just written is pinned to the primary for
+``DATABASE_REPLICA_PIN_SECONDS`` so it reads its own writes while the
+replicas catch up. The client is identified by its ``Authorization``
+header or session cookie, and the pin is stored in the shared cache so
+every worker sees it. Anonymous requests carry neither and never pay for
+the pin lookup. Authentication tokens, sessions and users are always read
+from the primary, so a token issued a moment ago, and the account it
+belongs to, work straight away.
+
+Routing decisions are counted per process; see :func:`routing_stats`.
+"""
+
+import contextvars
+import hashlib
+import logging
+import random
+import threading
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger('securepress.db_router')
+
+PIN_KEY_PREFIX = 'securepress:db-pin'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Models read from the primary even in replica requests
+PRIMARY_MODELS = {'knox.authtoken', 'sessions.session'}
+
+_request_state = contextvars.ContextVar('securepress_db_route', default=None)
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def count(*keys):
+    with _counts_lock:
+        for key in keys:
+            _counts[key] += 1
+
+
+def routing_stats():
+    """Routing counters of this process, e.g. ``{'requests.replica': 10, 'reads.replica1': 42}``."""
+    with _counts_lock:
+        return dict(sorted(_counts.items()))
+
+
+def primary_models():
+    """:data:`PRIMARY_MODELS` plus the user model, which authentication loads next."""
+    return PRIMARY_MODELS | {settings.AUTH_USER_MODEL.lower()}
+
+
+def replicas():
+    return [alias for alias in getattr(settings, 'DATABASE_REPLICAS', ()) if alias in settings.DATABASES]
+
+
+class RouteState:
+    """Routing state of the current request."""
+
+    def __init__(self, identity):
+        self.identity = identity
+        self.replica = None
+        self.wrote = False
+
+
+def client_identity(request):
+    """A stable key for the client making ``request``, or None for anonymous requests."""
+    credential = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credential:
+        return None
+    return hashlib.sha256(credential.encode()).hexdigest()
+
+
+def pin_key(identity):
+    return f'{PIN_KEY_PREFIX}:{identity}'
+
+
+def wants_replica(request):
+    """Whether the request is a read that may be served from a replica."""
+    if request.method not in SAFE_METHODS:
+        return False
+    match = request.resolver_match
+    if match is not None and match.namespace == 'admin':
+        return match.url_name is not None and match.url_name.endswith('_changelist')
+    return request.path_info.startswith('/api/')
+
+
+class ReplicaRouter:
+    """Send reads in replica requests to the request's replica and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or state.replica is None:
+            return None
+        if model._meta.label_lower in primary_models() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            count('reads.default')
+            return DEFAULT_DB_ALIAS
+        count(f'reads.{state.replica}')
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+            if state.replica is not None:
+                # Read the rest of the request from the primary as well
+                logger.debug('Write during a replica request; switching to the primary')
+                state.replica = None
+                count('requests.switched')
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Decide per request whether reads may go to a replica, and pin clients after they write."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RouteState(client_identity(request))
+        request.db_route = state
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if self.should_pin(request, state):
+            cache.set(pin_key(state.identity), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        state = RouteState(client_identity(request))
+        request.db_route = state
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if self.should_pin(request, state):
+            await cache.aset(pin_key(state.identity), True, settings.DATABASE_REPLICA_PIN_SECONDS)
+        return response
+
+    def should_pin(self, request, state):
+        return state.wrote and state.identity is not None and request.method not in SAFE_METHODS
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Runs after URL resolution, so admin change lists can be recognised
+        state = request.db_route
+        aliases = replicas()
+        if not aliases or not wants_replica(request):
+            count('requests.primary')
+            return None
+        if state.identity is not None and cache.get(pin_key(state.identity)):
+            count('requests.pinned')
+            logger.debug('Client pinned to the primary for %s %s', request.method, request.path)
+            return None
+        state.replica = random.choice(aliases)
+        count('requests.replica')
+        return None
@@ -0,0 +1,21 @@
+"""
+URL includes that defer importing their urlconf.
+
+``django.urls.include()`` imports the module it is given straight away.
+A ``URLResolver`` built with a dotted module path instead imports it the
+first time a request path reaches its prefix (or when URLs are reversed),
+which keeps rarely used, import-heavy sections out of worker startup.
+"""
+
+from django.urls import URLResolver
+from django.urls.resolvers import RoutePattern
+
+
+def lazy_include(route, urlconf_module, app_name=None, namespace=None):
+    """Like ``path(route, include(urlconf_module))``, importing on first use."""
+    return URLResolver(
+        RoutePattern(route, is_endpoint=False),
+        urlconf_module,
+        app_name=app_name,
+        namespace=namespace or app_name,
+    )
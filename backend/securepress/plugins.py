@@ -0,0 +1,156 @@
+"""
+Plugin discovery and loading.
+
+Plugins live in ``PLUGINS_DIR`` and are enabled with the
+``PLUGINS_ENABLED`` environment variable. At settings load the loader
+only reads each plugin's ``plugin.json`` and checks it: the manifest
+must parse, ``requires.securepress`` must admit the running core version,
+and plugins listed in ``requires.plugins`` must be enabled too. Rejected
+plugins are logged and left out of ``INSTALLED_APPS``. Nothing is
+imported here, since Django imports app modules itself during setup.
+
+Plugin URLs are mounted under ``api/plugins/<name>/`` with a string
+urlconf. The plugin's ``urls`` module (and the views it pulls in) is
+imported on the first request that reaches that prefix, not at startup.
+
+This module runs during settings import, so it must not import Django
+settings or models.
+"""
+
+import json
+import logging
+import sys
+
+from core.versioning import InvalidVersion, parse_constraint, parse_version
+
+logger = logging.getLogger('securepress.plugins')
+
+MANIFEST_NAME = 'plugin.json'
+URL_PREFIX = 'api/plugins/'
+
+
+class PluginError(Exception):
+    """Raised when a plugin cannot be loaded."""
+
+
+class Plugin:
+    """An enabled plugin and its manifest."""
+
+    def __init__(self, name, path, manifest):
+        self.name = name
+        self.path = path
+        self.manifest = manifest
+
+    def __repr__(self):
+        return f'<Plugin {self.name} {self.version}>'
+
+    @property
+    def version(self):
+        return self.manifest.get('version', '')
+
+    @property
+    def title(self):
+        return self.manifest.get('name', self.name)
+
+    @property
+    def requires(self):
+        requires = self.manifest.get('requires') or {}
+        return requires if isinstance(requires, dict) else {}
+
+    @property
+    def required_plugins(self):
+        plugins = self.requires.get('plugins') or []
+        return [str(name) for name in plugins] if isinstance(plugins, list) else []
+
+    def has_module(self, module):
+        """Whether the plugin ships ``<name>.<module>``, checked without importing it."""
+        return (self.path / f'{module}.py').exists() or (self.path / module / '__init__.py').exists()
+
+
+def read_manifest(path):
+    """Read and parse a plugin's ``plugin.json``."""
+    manifest_path = path / MANIFEST_NAME
+    try:
+        with open(manifest_path, encoding='utf-8') as handle:
+            manifest = json.load(handle)
+    except FileNotFoundError:
+        raise PluginError(f'missing {MANIFEST_NAME}')
+    except (OSError, ValueError) as exc:
+        raise PluginError(f'unreadable {MANIFEST_NAME}: {exc}')
+    if not isinstance(manifest, dict):
+        raise PluginError(f'{MANIFEST_NAME} must contain an object')
+    return manifest
+
+
+def check_core_requirement(plugin, core_version):
+    """Raise ``PluginError`` unless ``requires.securepress`` admits ``core_version``."""
+    spec = plugin.requires.get('securepress', '')
+    try:
+        if not parse_constraint(str(spec)).contains(parse_version(core_version)):
+            raise PluginError(f'requires SecurePress {spec}, running {core_version}')
+    except InvalidVersion as exc:
+        raise PluginError(f'invalid requires.securepress: {exc}')
+
+
+def load_plugin(plugins_dir, name, core_version):
+    """Validate one plugin directory and return a :class:`Plugin`."""
+    if not name.isidentifier():
+        raise PluginError('plugin names must be valid Python identifiers')
+    path = plugins_dir / name
+    if not (path / '__init__.py').exists():
+        raise PluginError(f'no package at {path}')
+    plugin = Plugin(name, path, read_manifest(path))
+    check_core_requirement(plugin, core_version)
+    return plugin
+
+
+def discover(plugins_dir, enabled, core_version):
+    """
+    Return the enabled plugins that pass validation, in the given order.
+
+    Problems are logged as warnings; a broken plugin never prevents the
+    site from starting.
+    """
+    names = [name.strip() for name in enabled if name.strip()]
+    if not names:
+        return []
+    if not plugins_dir.exists():
+        logger.warning('PLUGINS_ENABLED is set but %s does not exist', plugins_dir)
+        return []
+
+    candidates = {}
+    for name in names:
+        try:
+            candidates[name] = load_plugin(plugins_dir, name, core_version)
+        except PluginError as exc:
+            logger.warning('Plugin %r disabled: %s', name, exc)
+
+    # Drop plugins whose required plugins are missing, until stable
+    changed = True
+    while changed:
+        changed = False
+        for name, plugin in list(candidates.items()):
+            missing = [required for required in plugin.required_plugins if required not in candidates]
+            if missing:
+                logger.warning('Plugin %r disabled: requires plugin(s) %s', name, ', '.join(missing))
+                del candidates[name]
+                changed = True
+
+    if candidates and str(plugins_dir) not in sys.path:
+        sys.path.insert(0, str(plugins_dir))
+    return list(candidates.values())
+
+
+def plugin_urlpatterns(plugins):
+    """
+    URL patterns for plugins that ship a ``urls`` module.
+
+    Each urlconf is only imported when a request first reaches its prefix.
+    """
+    from securepress.lazy_urls import lazy_include
+
+    return [
+        lazy_include(f'{URL_PREFIX}{plugin.name}/', f'{plugin.name}.urls', app_name=plugin.name)
+        for plugin in plugins
+        if plugin.has_module('urls')
+    ]
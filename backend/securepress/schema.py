@@ -0,0 +1,154 @@
+"""
+Cached OpenAPI schema.
+
+Generating the schema introspects every view and serializer, so it is
+done once per code version and stored as rendered bytes in the shared
+cache (and in worker memory). The code version is ``SECUREPRESS_RELEASE``
+when set at deploy time, otherwise a fingerprint of the project's source
+files, so any code change produces a new schema. ``manage.py build_schema``
+warms the cache at deploy time; otherwise the first request generates it.
+
+Responses carry an ETag so clients can revalidate with ``If-None-Match``.
+Swagger UI and Redoc load the schema from the same endpoint.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import translation
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+logger = logging.getLogger('securepress.schema')
+
+CACHE_PREFIX = 'securepress:schema'
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Renderers warmed by build_schema
+DEFAULT_RENDERERS = (OpenApiYamlRenderer, OpenApiJsonRenderer)
+
+_artifacts = {}
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def code_version():
+    """
+    Identify the running code.
+
+    Uses ``SECUREPRESS_RELEASE`` if set; otherwise hashes the path, size and
+    modification time of every Python file in the project's apps and plugins.
+    """
+    digest = hashlib.sha256()
+    digest.update(settings.SECUREPRESS_VERSION.encode())
+    digest.update(repr(sorted(settings.SPECTACULAR_SETTINGS.items())).encode())
+    release = getattr(settings, 'SECUREPRESS_RELEASE', '')
+    if release:
+        digest.update(release.encode())
+    else:
+        roots = {Path(settings.BASE_DIR).resolve(), Path(settings.PLUGINS_DIR).resolve()}
+        for config in apps.get_app_configs():
+            path = Path(config.path).resolve()
+            if not any(root == path or root in path.parents for root in roots):
+                continue
+            for source in sorted(path.rglob('*.py')):
+                stat = source.stat()
+                digest.update(f'{source}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_key(renderer, api_version=None, lang=None):
+    """Cache key of a rendered schema artifact."""
+    return f'{CACHE_PREFIX}:{code_version()}:{renderer.format}:{api_version or ""}:{lang or ""}'
+
+
+def generate_schema(api_version=None, lang=None):
+    """Generate the public schema as a dict."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(api_version=api_version)
+    if lang:
+        with translation.override(lang):
+            return generator.get_schema(request=None, public=True)
+    return generator.get_schema(request=None, public=True)
+
+
+def build_artifact(renderer, api_version=None, lang=None, schema=None):
+    """Render the schema and return ``(etag, content)``."""
+    if schema is None:
+        schema = generate_schema(api_version, lang)
+    content = renderer.render(schema, renderer.media_type, {})
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"', content
+
+
+def build_schema_artifacts(renderers=DEFAULT_RENDERERS, api_version=None, lang=None):
+    """Generate the schema once and store each rendering; returns ``{format: etag}``."""
+    schema = generate_schema(api_version, lang)
+    etags = {}
+    for renderer_class in renderers:
+        renderer = renderer_class()
+        artifact = build_artifact(renderer, api_version, lang, schema)
+        key = cache_key(renderer, api_version, lang)
+        cache.set(key, artifact, CACHE_TIMEOUT)
+        _artifacts[key] = artifact
+        etags[renderer.format] = artifact[0]
+    return etags
+
+
+def get_artifact(renderer, api_version=None, lang=None):
+    """
+    Return ``(etag, content)`` for the schema rendered with ``renderer``.
+
+    Looks in worker memory, then the shared cache. On a miss the schema is
+    generated once and stored in every default format.
+    """
+    key = cache_key(renderer, api_version, lang)
+    artifact = _artifacts.get(key)
+    if artifact is not None:
+        return artifact
+    with _lock:
+        artifact = _artifacts.get(key) or cache.get(key)
+        if artifact is None:
+            logger.info('Generating OpenAPI schema %s', key)
+            renderers = dict.fromkeys((type(renderer),) + DEFAULT_RENDERERS)
+            build_schema_artifacts(renderers, api_version, lang)
+            artifact = _artifacts[key]
+        _artifacts[key] = artifact
+    return artifact
+
+
+def etag_matches(request, etag):
+    """Whether the request's ``If-None-Match`` header covers ``etag``."""
+    tags = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in tags or etag in tags
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """``SpectacularAPIView`` serving the cached artifact for the negotiated format."""
+
+    def _get_schema_response(self, request):
+        version = self.api_version or request.version or self._get_version_parameter(request)
+        lang = translation.get_language() if settings.USE_I18N and request.GET.get('lang') else None
+        renderer = request.accepted_renderer
+        etag, content = get_artifact(renderer, version, lang)
+
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = HttpResponse(content, content_type=content_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, version)}"'
+        response['ETag'] = etag
+        patch_vary_headers(response, ['Accept'])
+        patch_cache_control(response, no_cache=True)
+        return response
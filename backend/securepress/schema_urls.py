@@ -0,0 +1,18 @@
+"""
+API documentation URLs, included lazily from ``securepress.urls``.
+
+drf-spectacular's views pull in the schema generator, which is only
+imported on the first request under ``/api/schema/``. Swagger UI and Redoc
+load the cached schema served by the ``schema`` URL.
+"""
+
+from django.urls import path
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+
+from securepress.schema import CachedSpectacularAPIView
+
+urlpatterns = [
+    path('', CachedSpectacularAPIView.as_view(), name='schema'),
+    path('swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+]
@@ -28,7 +28,8 @@ ALLOWED_HOSTS = os.getenv('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split('
 
 # Application definition
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Admin without startup autodiscovery; see securepress/apps.py
+    'securepress.apps.AdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -58,6 +59,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'securepress.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -97,6 +99,23 @@ DATABASES = {
     }
 }
 
+# Read replicas: comma-separated host[:port] list, same credentials as the primary.
+# Safe-method API reads and admin change lists are routed to them; see
+# securepress/db_router.py
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv('DATABASE_REPLICA_HOSTS', '').split(',')), 1):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+DATABASE_ROUTERS = ['securepress.db_router.ReplicaRouter']
+# Seconds a client reads from the primary after writing
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', '5'))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -149,6 +168,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        # Views one client can record of each post; see api/throttles.py
+        'post_views': os.getenv('POST_VIEWS_THROTTLE_RATE', '10/hour'),
+    },
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -217,6 +240,11 @@ SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
 
+# Release identifier of the deployed code (e.g. the git commit). The OpenAPI
+# schema is cached per release; when empty, a fingerprint of the source files
+# is used instead. See securepress/schema.py
+SECUREPRESS_RELEASE = os.getenv('SECUREPRESS_RELEASE', '')
+
 # Security Settings
 # These are conservative defaults. Override in production.py for production environment.
 
@@ -291,17 +319,65 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@securepress.local')
 
+# Core version, checked against plugin and marketplace app requirements
+SECUREPRESS_VERSION = '1.0.0'
+
+# Marketplace Package Delivery
+# When set, downloads are handed off to the front-end server via
+# X-Accel-Redirect; the prefix must map to MEDIA_ROOT as an internal location.
+MARKETPLACE_DOWNLOAD_ACCEL_PREFIX = os.getenv('MARKETPLACE_DOWNLOAD_ACCEL_PREFIX', '')
+# Buffered download counts are written once either limit is reached
+MARKETPLACE_DOWNLOAD_FLUSH_INTERVAL = int(os.getenv('MARKETPLACE_DOWNLOAD_FLUSH_INTERVAL', '30'))  # seconds
+MARKETPLACE_DOWNLOAD_FLUSH_THRESHOLD = int(os.getenv('MARKETPLACE_DOWNLOAD_FLUSH_THRESHOLD', '100'))
+
+# Post View Analytics
+# Buffered post views are written as daily buckets once either limit is reached;
+# run `manage.py fold_post_views` periodically to update Post.view_count
+POST_VIEW_FLUSH_INTERVAL = int(os.getenv('POST_VIEW_FLUSH_INTERVAL', '30'))  # seconds
+POST_VIEW_FLUSH_THRESHOLD = int(os.getenv('POST_VIEW_FLUSH_THRESHOLD', '100'))
+
+# Trending Posts
+# Views lose half their weight every TRENDING_HALF_LIFE_HOURS; the top
+# TRENDING_TOP_K posts overall and per category and tag are cached
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', '24'))
+TRENDING_TOP_K = int(os.getenv('TRENDING_TOP_K', '50'))
+# Days of view buckets used to rebuild scores after a cache loss
+TRENDING_WINDOW_DAYS = int(os.getenv('TRENDING_WINDOW_DAYS', '14'))
+
+# Related Posts
+# Each post stores its RELATED_POSTS_COUNT most similar published posts;
+# categories and tags on more published posts than RELATED_POSTS_MAX_TERM_POSTS
+# are too common to relate posts. Rebuild with `manage.py build_related_posts`
+RELATED_POSTS_COUNT = int(os.getenv('RELATED_POSTS_COUNT', '5'))
+RELATED_POSTS_MAX_TERM_POSTS = int(os.getenv('RELATED_POSTS_MAX_TERM_POSTS', '1000'))
+
+# Autocomplete
+# Tag, category and user suggestions come from per-worker prefix indexes,
+# rebuilt on changes and at least this often to pick up usage counts
+AUTOCOMPLETE_REFRESH_SECONDS = int(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', '300'))
+
+# Sitemaps and Feeds
+# Public site address used in sitemap and feed links
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:3000')
+SITE_NAME = os.getenv('SITE_NAME', 'SecurePress')
+# Gzipped sitemap and feed files are written here and rebuilt when stale;
+# run `manage.py build_sitemaps` to pre-build them
+SYNDICATION_ROOT = os.getenv('SYNDICATION_ROOT', str(BASE_DIR / 'syndication'))
+SITEMAP_URLS_PER_FILE = int(os.getenv('SITEMAP_URLS_PER_FILE', '10000'))
+FEED_ITEMS = int(os.getenv('FEED_ITEMS', '20'))
+
+# Collaborative Layout Editing
+# Operations from a WebSocket editing session are saved as one revision
+# once either limit is reached; see themes/collab.py
+LAYOUT_COLLAB_SAVE_INTERVAL = float(os.getenv('LAYOUT_COLLAB_SAVE_INTERVAL', '5'))  # seconds
+LAYOUT_COLLAB_SAVE_OPERATIONS = int(os.getenv('LAYOUT_COLLAB_SAVE_OPERATIONS', '200'))
+
 # Plugin System Configuration
 PLUGINS_ENABLED = os.getenv('PLUGINS_ENABLED', '').split(',') if os.getenv('PLUGINS_ENABLED') else []
 
-# Dynamically load enabled plugins
-if PLUGINS_ENABLED and PLUGINS_DIR.exists():
-    import sys
-    sys.path.insert(0, str(PLUGINS_DIR))
-    for plugin_name in PLUGINS_ENABLED:
-        plugin_name = plugin_name.strip()
-        if plugin_name:
-            try:
-                INSTALLED_APPS.append(plugin_name)
-            except Exception:
-                pass  # Plugin not found or invalid
+# Validate enabled plugins against their plugin.json manifests and add them
+# as apps; see securepress/plugins.py
+from securepress.plugins import discover as discover_plugins  # noqa: E402
+
+PLUGINS = discover_plugins(PLUGINS_DIR, PLUGINS_ENABLED, SECUREPRESS_VERSION)
+INSTALLED_APPS += [plugin.name for plugin in PLUGINS]
@@ -59,10 +59,29 @@ CORS_ALLOWED_ORIGINS = os.getenv(
 ).split(',')
 
 # Database - Use connection pooling in production
-DATABASES['default']['CONN_MAX_AGE'] = 600
-DATABASES['default']['OPTIONS'] = {
-    'connect_timeout': 10,
-}
+# One bounded psycopg pool per process and database alias, shared by every
+# thread. Connections are health-checked on checkout and recycled after
+# DATABASE_POOL_MAX_LIFETIME. Set DATABASE_POOL=False to fall back to
+# persistent per-thread connections.
+DATABASE_POOL = os.getenv('DATABASE_POOL', 'True') == 'True'
+for database in DATABASES.values():
+    database['CONN_HEALTH_CHECKS'] = True
+    database['OPTIONS'] = {
+        'connect_timeout': 10,
+    }
+    if DATABASE_POOL:
+        # Pooled connections go back to the pool at the end of each request
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+            'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '10')),  # seconds to wait for a connection
+            'max_waiting': int(os.getenv('DATABASE_POOL_MAX_WAITING', '0')),  # 0 = unlimited
+            'max_lifetime': float(os.getenv('DATABASE_POOL_MAX_LIFETIME', '1800')),
+            'max_idle': float(os.getenv('DATABASE_POOL_MAX_IDLE', '300')),
+        }
+    else:
+        database['CONN_MAX_AGE'] = 600
 
 # Email - Use real SMTP in production
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -0,0 +1,28 @@
+"""
+Test settings for SecurePress.
+
+Used by pytest (see pytest.ini). Tests run on SQLite, so they need no
+database server.
+"""
+
+from .development import *
+
+# ``replica`` is a separate database for the read-replica routing tests,
+# which add it to DATABASE_REPLICAS themselves. It is not a replica when
+# the test databases are created, so it is migrated like the primary.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-replica.sqlite3',
+    },
+}
+DATABASE_REPLICAS = []
+
+# Fast hashing for test users
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+LOGGING['loggers']['django']['level'] = 'INFO'
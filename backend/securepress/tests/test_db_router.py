@@ -0,0 +1,120 @@
+"""
+Read-replica routing.
+
+The ``replica`` database of the test settings stands in for a replica that
+has not caught up: each test writes different rows to it and to the
+primary, so responses show which database served them. Reads inside a
+transaction go to the primary, so tests run outside one.
+"""
+
+import pytest
+from django.core.cache import cache
+from knox.models import AuthToken
+from rest_framework.test import APIClient
+
+from core.models import Category, User
+from securepress.db_router import ReplicaRouter, RouteState, _request_state
+
+pytestmark = pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+
+
+@pytest.fixture(autouse=True)
+def replica(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    cache.clear()
+    Category.objects.create(name='On primary', slug='on-primary')
+    Category.objects.using('replica').create(name='On replica', slug='on-replica')
+    yield 'replica'
+    cache.clear()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user('reader@example.com', 'correct-horse-battery')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {AuthToken.objects.create(user)[1]}')
+    return client
+
+
+def category_names(response):
+    assert response.status_code == 200, response.content
+    return {category['name'] for category in response.json()['results']}
+
+
+def test_api_reads_use_replica():
+    assert category_names(APIClient().get('/api/categories/')) == {'On replica'}
+
+
+def test_reads_use_primary_without_replicas(settings):
+    settings.DATABASE_REPLICAS = []
+    assert category_names(APIClient().get('/api/categories/')) == {'On primary'}
+
+
+def test_authenticated_reads_use_replica(client):
+    assert category_names(client.get('/api/categories/')) == {'On replica'}
+
+
+def test_write_switches_request_to_primary():
+    router = ReplicaRouter()
+    state = RouteState(identity=None)
+    state.replica = 'replica'
+    token = _request_state.set(state)
+    try:
+        assert router.db_for_read(Category) == 'replica'
+        assert router.db_for_write(Category) == 'default'
+        assert router.db_for_read(Category) is None
+        assert state.wrote
+    finally:
+        _request_state.reset(token)
+
+
+def test_client_is_pinned_to_primary_after_write(client):
+    response = client.post('/api/categories/', {'name': 'New', 'slug': 'new'}, format='json')
+    assert response.status_code == 201, response.content
+    assert category_names(client.get('/api/categories/')) == {'On primary', 'New'}
+    # Other clients still read from the replica
+    assert category_names(APIClient().get('/api/categories/')) == {'On replica'}
+
+
+def test_pin_expires(client, settings):
+    settings.DATABASE_REPLICA_PIN_SECONDS = 0
+    client.post('/api/categories/', {'name': 'New', 'slug': 'new'}, format='json')
+    assert category_names(client.get('/api/categories/')) == {'On replica'}
+
+
+def test_new_account_works_before_replica_catches_up():
+    response = APIClient().post('/api/auth/register/', {
+        'email': 'new@example.com',
+        'password': 'correct-horse-battery',
+        'password_confirm': 'correct-horse-battery',
+        'first_name': 'New',
+        'last_name': 'User',
+    }, format='json')
+    assert response.status_code == 201, response.content
+    assert not User.objects.using('replica').filter(email='new@example.com').exists()
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {response.json()['token']}")
+    response = client.get('/api/users/me/')
+    assert response.status_code == 200, response.content
+    assert response.json()['email'] == 'new@example.com'
+
+
+def test_admin_change_list_uses_replica_and_change_form_primary():
+    admin = User.objects.create_superuser('admin@example.com', 'correct-horse-battery')
+    client = APIClient()
+    client.force_login(admin)
+
+    response = client.get('/admin/core/category/')
+    assert response.status_code == 200
+    assert b'On replica' in response.content
+    assert b'On primary' not in response.content
+
+    category = Category.objects.get(slug='on-primary')
+    response = client.get(f'/admin/core/category/{category.pk}/change/')
+    assert response.status_code == 200
+    assert b'On primary' in response.content
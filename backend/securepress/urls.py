@@ -5,19 +5,22 @@ The `urlpatterns` list routes URLs to views. For more information please see:
     https://docs.djangoproject.com/en/6.0/topics/http/urls/
 """
 
+import os
+
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api.permissions import IsAdminUser
+from securepress.db_pool import pool_stats
+from securepress.db_router import routing_stats
+from securepress.lazy_urls import lazy_include
+from securepress.plugins import plugin_urlpatterns
+
 
 @api_view(['GET'])
 def health_check(request):
@@ -27,29 +30,41 @@ def health_check(request):
     return Response({'status': 'healthy'}, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def database_status(request):
+    """
+    Database routing and connection pool counters of the worker process
+    serving the request.
+    """
+    return Response({'pid': os.getpid(), 'routing': routing_stats(), 'pools': pool_stats()})
+
+
 urlpatterns = [
-    # Admin interface
-    path('admin/', admin.site.urls),
+    # Admin interface (admin modules load on first use)
+    lazy_include('admin/', 'securepress.admin_urls', app_name='admin'),
     
     # Health check
     path('api/health/', health_check, name='health-check'),
+    path('api/health/database/', database_status, name='database-status'),
     
-    # API Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    # API Documentation (schema generator loads on first use)
+    lazy_include('api/schema/', 'securepress.schema_urls'),
     
     # API endpoints
     path('api/auth/', include('authentication.urls')),
     path('api/', include('api.urls')),
+    path('api/', include('themes.urls')),
+    path('api/marketplace/', include('marketplace.urls')),
+    
+    # Sitemaps and feeds
+    path('', include('core.urls')),
 ]
 
+# Plugin URLs are imported on first request under api/plugins/<name>/
+urlpatterns += plugin_urlpatterns(settings.PLUGINS)
+
 # Serve media files in development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-
-# Custom admin site configuration
-admin.site.site_header = 'SecurePress Administration'
-admin.site.site_title = 'SecurePress Admin'
-admin.site.index_title = 'Welcome to SecurePress Administration'
@@ -7,3 +7,7 @@ class ThemesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'themes'
     verbose_name = 'Theme Manager'
+    
+    def ready(self):
+        """Connect signal handlers."""
+        from . import signals  # noqa: F401
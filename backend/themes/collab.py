@@ -0,0 +1,415 @@
+"""
+Collaborative editing of PageLayout documents over WebSockets.
+
+Editors connect to ``/ws/layouts/<id>/?token=<knox token>``. Each worker
+process keeps one :class:`Session` per layout being edited. The session
+holds the document in memory and is the only place operations are
+applied. A client sends a small JSON Patch against the session version it
+has seen. The session applies it, gives it the next version and
+broadcasts it to every connected editor, the sender included as an
+acknowledgement. An operation based on an older version is rejected and
+the client rebases it onto the operations it has missed.
+
+Operations are not written to the database one by one. The session
+collects them and stores them as a single revision through
+:mod:`themes.revisions` every ``LAYOUT_COLLAB_SAVE_INTERVAL`` seconds,
+after ``LAYOUT_COLLAB_SAVE_OPERATIONS`` operations, when an editor asks to
+save and when the last editor leaves. A revision written through the
+REST endpoints in the meantime makes the next save conflict. The session
+then reloads the head revision, replays its unsaved operations on top
+where they still apply and sends every editor the merged document.
+
+Messages between connections go through a channel layer with the group
+interface of Django Channels. :class:`InMemoryChannelLayer` delivers
+within the process. Sessions are per process, so editors of the same
+layout must reach the same worker (sticky routing or a single ASGI
+worker for editing).
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import re
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import revisions
+from .jsonpatch import MAX_OPERATIONS, JsonPatchError, apply_patch
+from .models import PageLayout
+
+logger = logging.getLogger('securepress.collab')
+
+PATH_RE = re.compile(r'^/ws/layouts/(?P<pk>\d+)/$')
+
+# Largest message accepted from a client, in bytes
+MAX_MESSAGE_SIZE = 256 * 1024
+
+# Messages queued for a connection before it is dropped as too slow
+CHANNEL_CAPACITY = 100
+
+# Close codes sent to clients
+CLOSE_NOT_FOUND = 4404
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_TOO_LARGE = 1009
+CLOSE_TRY_AGAIN = 1013
+
+
+class InMemoryChannelLayer:
+    """
+    In-process channel layer.
+
+    Implements the subset of the Django Channels layer interface used here
+    (``new_channel``, ``receive``, ``group_add``, ``group_discard`` and
+    ``group_send``). A channel that falls ``capacity`` messages behind is
+    marked as overflowed so its connection can close.
+    """
+
+    def __init__(self, capacity=CHANNEL_CAPACITY):
+        self.capacity = capacity
+        self.channels = {}
+        self.groups = {}
+        self.overflowed = set()
+        self._counter = itertools.count(1)
+
+    async def new_channel(self, prefix='collab'):
+        name = f'{prefix}.{next(self._counter)}'
+        self.channels[name] = asyncio.Queue(self.capacity)
+        return name
+
+    def close_channel(self, name):
+        self.channels.pop(name, None)
+        self.overflowed.discard(name)
+        for members in self.groups.values():
+            members.discard(name)
+
+    async def send(self, channel, message):
+        queue = self.channels.get(channel)
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed.add(channel)
+
+    async def receive(self, channel):
+        return await self.channels[channel].get()
+
+    async def group_add(self, group, channel):
+        self.groups.setdefault(group, set()).add(channel)
+
+    async def group_discard(self, group, channel):
+        members = self.groups.get(group)
+        if members is not None:
+            members.discard(channel)
+            if not members:
+                del self.groups[group]
+
+    async def group_send(self, group, message):
+        for channel in list(self.groups.get(group, ())):
+            await self.send(channel, message)
+
+
+channel_layer = InMemoryChannelLayer()
+
+
+def _run_db(func, *args, **kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_db(func, *args, **kwargs):
+    """Run ORM code in the sync thread, closing stale connections around it."""
+    return await sync_to_async(_run_db)(func, *args, **kwargs)
+
+
+def _load_layout(pk):
+    layout = PageLayout.objects.select_related('page', 'post').filter(pk=pk).first()
+    if layout is None:
+        return None, None
+    return layout, revisions.head_document(layout)
+
+
+def _load_head(layout):
+    layout.refresh_from_db(fields=['layout', 'blocks_data', 'revision', 'snapshot_revision'])
+    return layout.revision, revisions.head_document(layout)
+
+
+def _authenticate(token):
+    from knox.auth import TokenAuthentication
+
+    user, _ = TokenAuthentication().authenticate_credentials(token.encode())
+    return user
+
+
+class Session:
+    """The in-memory document of one layout and the editors connected to it."""
+
+    def __init__(self, layout, document):
+        self.layout = layout
+        self.group = f'layout.{layout.pk}'
+        self.document = document
+        # Head revision in the database; unsaved operations apply on top of it
+        self.revision = layout.revision
+        # Operations applied since the session started; clients track this
+        self.version = 0
+        self.pending = []
+        self.pending_author = None
+        self.editors = {}
+        self.lock = asyncio.Lock()
+        self.save_task = None
+
+    def presence(self):
+        return [{'id': user.pk, 'name': user.get_full_name() or user.email} for user in self.editors.values()]
+
+    def state(self):
+        return {
+            'type': 'init',
+            'version': self.version,
+            'revision': self.revision,
+            'document': self.document,
+            'editors': self.presence(),
+        }
+
+    async def join(self, channel, user):
+        await channel_layer.group_add(self.group, channel)
+        self.editors[channel] = user
+        await channel_layer.send(channel, self.state())
+        await channel_layer.group_send(self.group, {'type': 'presence', 'editors': self.presence()})
+
+    async def leave(self, channel):
+        await channel_layer.group_discard(self.group, channel)
+        self.editors.pop(channel, None)
+        if self.editors:
+            await channel_layer.group_send(self.group, {'type': 'presence', 'editors': self.presence()})
+
+    async def apply(self, channel, message):
+        """Apply a client's operation, or tell the client why it was not applied."""
+        user = self.editors[channel]
+        async with self.lock:
+            if message.get('version') != self.version:
+                await channel_layer.send(channel, {
+                    'type': 'reject',
+                    'id': message.get('id'),
+                    'version': self.version,
+                    'detail': 'Operation is based on an old version.',
+                })
+                return
+            patch = message.get('patch')
+            try:
+                document = revisions.validate_document(apply_patch(self.document, patch))
+            except JsonPatchError as exc:
+                await channel_layer.send(channel, {'type': 'error', 'id': message.get('id'), 'detail': str(exc)})
+                return
+            self.document = document
+            self.version += 1
+            self.pending.extend(patch)
+            self.pending_author = user
+            await channel_layer.group_send(self.group, {
+                'type': 'op',
+                'id': message.get('id'),
+                'version': self.version,
+                'patch': patch,
+                'user': user.pk,
+            })
+        if len(self.pending) >= settings.LAYOUT_COLLAB_SAVE_OPERATIONS:
+            await self.save()
+        else:
+            self.schedule_save()
+
+    def schedule_save(self):
+        if self.save_task is None or self.save_task.done():
+            self.save_task = asyncio.get_running_loop().create_task(self.save_later())
+
+    async def save_later(self):
+        await asyncio.sleep(settings.LAYOUT_COLLAB_SAVE_INTERVAL)
+        # A save that conflicts schedules the next one itself
+        self.save_task = None
+        try:
+            await self.save()
+        except Exception:
+            logger.exception('Saving collaborative session for layout %s failed', self.layout.pk)
+
+    async def save(self, snapshot=False):
+        """
+        Store the operations applied since the last save as one revision.
+
+        The collected operations are written as a delta, or as a snapshot
+        when they are too many for one patch, would be larger than the
+        document itself, or ``snapshot`` is set.
+        """
+        async with self.lock:
+            if not self.pending and not snapshot:
+                return
+            operations, document, author = self.pending, self.document, self.pending_author
+            try:
+                if (
+                    snapshot
+                    or len(operations) > MAX_OPERATIONS
+                    or revisions._size(operations) > revisions._size(document)
+                ):
+                    number = await run_db(
+                        revisions.save_snapshot, self.layout, self.revision, document, author,
+                    )
+                else:
+                    number = await run_db(revisions.autosave, self.layout, self.revision, operations, author)
+            except revisions.RevisionConflict:
+                await self.rebase(operations)
+                return
+            self.revision = number
+            self.pending = []
+            await channel_layer.group_send(self.group, {
+                'type': 'saved',
+                'version': self.version,
+                'revision': self.revision,
+            })
+
+    async def rebase(self, operations):
+        """Reload the head revision after a conflicting save and replay unsaved operations on it."""
+        self.revision, head = await run_db(_load_head, self.layout)
+        try:
+            self.document = revisions.validate_document(apply_patch(head, operations))
+        except JsonPatchError:
+            logger.warning('Discarding unsaved operations on layout %s after a conflicting save', self.layout.pk)
+            self.document = head
+            self.pending = []
+        self.version += 1
+        await channel_layer.group_send(self.group, self.state())
+        if self.pending:
+            self.schedule_save()
+
+
+class SessionRegistry:
+    """Sessions of this process, created on first join and dropped after the last editor leaves."""
+
+    def __init__(self):
+        self.sessions = {}
+        self.lock = None
+
+    async def join(self, layout, document, channel, user):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            session = self.sessions.get(layout.pk)
+            if session is None:
+                session = self.sessions[layout.pk] = Session(layout, document)
+            await session.join(channel, user)
+        return session
+
+    async def leave(self, session, channel):
+        async with self.lock:
+            await session.leave(channel)
+            if session.editors:
+                return
+            if session.save_task is not None:
+                session.save_task.cancel()
+            # Save before dropping so a new session starts from the latest revision
+            try:
+                await session.save()
+            except Exception:
+                logger.exception('Saving collaborative session for layout %s failed', session.layout.pk)
+            finally:
+                del self.sessions[session.layout.pk]
+
+
+registry = SessionRegistry()
+
+
+async def _forward(channel, send):
+    """Send channel layer messages to the client until the channel overflows."""
+    while True:
+        try:
+            message = await asyncio.wait_for(channel_layer.receive(channel), 1.0)
+        except asyncio.TimeoutError:
+            message = None
+        if channel in channel_layer.overflowed:
+            return CLOSE_TRY_AGAIN
+        if message is not None:
+            await send({'type': 'websocket.send', 'text': json.dumps(message)})
+
+
+async def _dispatch(session, channel, receive):
+    """Handle client messages until the client disconnects."""
+    while True:
+        event = await receive()
+        if event['type'] == 'websocket.disconnect':
+            return None
+        text = event.get('text')
+        if text is None and event.get('bytes') is not None:
+            text = event['bytes'].decode('utf-8', 'replace')
+        if text is None:
+            continue
+        if len(text) > MAX_MESSAGE_SIZE:
+            return CLOSE_TOO_LARGE
+        try:
+            message = json.loads(text)
+        except ValueError:
+            message = None
+        kind = message.get('type') if isinstance(message, dict) else None
+        if kind == 'op':
+            await session.apply(channel, message)
+        elif kind == 'save':
+            await session.save(snapshot=True)
+        elif kind == 'presence':
+            await channel_layer.group_send(session.group, {
+                'type': 'cursor',
+                'user': session.editors[channel].pk,
+                'data': message.get('data'),
+            })
+        elif kind == 'ping':
+            await channel_layer.send(channel, {'type': 'pong', 'time': time.time()})
+        else:
+            await channel_layer.send(channel, {'type': 'error', 'detail': 'Unknown message.'})
+
+
+async def close(send, code):
+    await send({'type': 'websocket.close', 'code': code})
+
+
+async def layout_socket(scope, receive, send):
+    """ASGI application for ``/ws/layouts/<id>/`` connections."""
+    match = PATH_RE.match(scope['path'])
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+    if match is None:
+        return await close(send, CLOSE_NOT_FOUND)
+
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [''])[0]
+    try:
+        user = await run_db(_authenticate, token)
+    except AuthenticationFailed:
+        return await close(send, CLOSE_UNAUTHORIZED)
+    layout, document = await run_db(_load_layout, int(match['pk']))
+    if layout is None:
+        return await close(send, CLOSE_NOT_FOUND)
+
+    from .views import can_edit_layout
+
+    if not await run_db(can_edit_layout, user, layout):
+        return await close(send, CLOSE_FORBIDDEN)
+
+    await send({'type': 'websocket.accept'})
+    channel = await channel_layer.new_channel()
+    session = await registry.join(layout, document, channel, user)
+    forward = asyncio.ensure_future(_forward(channel, send))
+    dispatch = asyncio.ensure_future(_dispatch(session, channel, receive))
+    try:
+        done, _ = await asyncio.wait({forward, dispatch}, return_when=asyncio.FIRST_COMPLETED)
+        code = done.pop().result()
+    finally:
+        forward.cancel()
+        dispatch.cancel()
+        channel_layer.close_channel(channel)
+        await registry.leave(session, channel)
+    if code is not None:
+        await close(send, code)
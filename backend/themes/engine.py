@@ -0,0 +1,219 @@
+"""
+Block rendering engine for the visual editor.
+
+Compiles ``Block.template`` sources once per block revision and renders
+whole ``PageLayout.blocks_data`` trees in a single pass.
+
+A block instance in ``blocks_data`` has the shape::
+
+    {
+        "type": "hero",                 # Block.type
+        "attributes": {"title": "..."},  # overrides Block.attributes defaults
+        "innerBlocks": [...]             # optional nested instances
+    }
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.template import Context, Engine, TemplateSyntaxError
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .models import Block
+
+logger = logging.getLogger('securepress.themes')
+
+# Rendered output of static blocks is memoized in the shared cache.
+RENDER_CACHE_PREFIX = 'themes:block-html'
+RENDER_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Blocks in these categories depend on request state and are never memoized.
+DYNAMIC_CATEGORIES = {'form', 'widget'}
+
+# Upper bound on compiled templates kept per process.
+MAX_COMPILED_TEMPLATES = 512
+
+# Guard against runaway nesting in user-supplied layouts.
+MAX_DEPTH = 32
+
+# Dedicated engine so block templates cannot reach project template dirs.
+_engine = Engine(autoescape=True, debug=False)
+
+
+class BlockTemplateCache:
+    """
+    Per-process LRU of compiled block templates.
+
+    Entries are keyed by ``(block id, updated_at)`` so editing a block
+    naturally invalidates its compiled template in every worker.
+    """
+
+    def __init__(self, maxsize=MAX_COMPILED_TEMPLATES):
+        self.maxsize = maxsize
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, block):
+        """Return the compiled template for a block, compiling on a miss."""
+        key = (block.pk, block.updated_at)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                return template
+
+        try:
+            template = _engine.from_string(block.template)
+        except TemplateSyntaxError:
+            logger.warning('Invalid template for block %s', block.type, exc_info=True)
+            template = _engine.from_string('')
+
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        return template
+
+    def clear(self):
+        """Drop all compiled templates."""
+        with self._lock:
+            self._templates.clear()
+
+
+template_cache = BlockTemplateCache()
+
+
+def iter_instances(blocks_data, depth=0):
+    """Yield every block instance in a ``blocks_data`` tree."""
+    if depth > MAX_DEPTH or not isinstance(blocks_data, list):
+        return
+    for instance in blocks_data:
+        if not isinstance(instance, dict):
+            continue
+        yield instance
+        yield from iter_instances(instance.get('innerBlocks') or [], depth + 1)
+
+
+def load_blocks(blocks_data):
+    """Fetch every Block referenced by a tree with a single query."""
+    types = {
+        instance['type'] for instance in iter_instances(blocks_data)
+        if isinstance(instance.get('type'), str)
+    }
+    if not types:
+        return {}
+    queryset = Block.objects.filter(type__in=types, is_active=True).only(
+        'id', 'type', 'category', 'attributes', 'template', 'styles', 'scripts', 'updated_at'
+    )
+    return {block.type: block for block in queryset}
+
+
+def default_attributes(block):
+    """Extract default attribute values from a block's attribute schema."""
+    defaults = {}
+    for name, spec in (block.attributes or {}).items():
+        if isinstance(spec, dict) and 'default' in spec:
+            defaults[name] = spec['default']
+    return defaults
+
+
+class LayoutRenderer:
+    """
+    Render a ``blocks_data`` tree against a preloaded set of blocks.
+
+    Use :func:`render_blocks` or :func:`render_layout` rather than
+    instantiating this directly.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.used = OrderedDict()
+
+    def render(self, blocks_data, depth=0):
+        if depth > MAX_DEPTH or not isinstance(blocks_data, list):
+            return ''
+        parts = []
+        for instance in blocks_data:
+            if isinstance(instance, dict):
+                parts.append(self.render_instance(instance, depth))
+        return ''.join(parts)
+
+    def render_instance(self, instance, depth):
+        block = self.blocks.get(instance.get('type'))
+        if block is None:
+            # Unknown or inactive blocks render as nothing rather than failing the page
+            return ''
+        self.used[block.type] = block
+
+        attributes = default_attributes(block)
+        if isinstance(instance.get('attributes'), dict):
+            attributes.update(instance['attributes'])
+        inner = instance.get('innerBlocks') or []
+
+        cache_key = None
+        if not inner and block.category not in DYNAMIC_CATEGORIES:
+            cache_key = self.cache_key(block, attributes)
+            html = cache.get(cache_key)
+            if html is not None:
+                return html
+
+        inner_html = self.render(inner, depth + 1)
+        template = template_cache.get(block)
+        html = template.render(Context({
+            'attributes': attributes,
+            'inner_blocks': mark_safe(inner_html),
+            'block': {'type': block.type, 'category': block.category},
+        }))
+        html = format_html(
+            '<div class="sp-block sp-block-{}">{}</div>',
+            block.type,
+            mark_safe(html),
+        )
+
+        if cache_key is not None:
+            cache.set(cache_key, html, RENDER_CACHE_TIMEOUT)
+        return html
+
+    @staticmethod
+    def cache_key(block, attributes):
+        digest = hashlib.sha256(
+            json.dumps(attributes, sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+        return f'{RENDER_CACHE_PREFIX}:{block.pk}:{block.updated_at.timestamp()}:{digest}'
+
+    def assets(self):
+        """Collect styles and scripts of every block used, once each."""
+        styles = [block.styles for block in self.used.values() if block.styles]
+        scripts = [block.scripts for block in self.used.values() if block.scripts]
+        return '\n'.join(styles), '\n'.join(scripts)
+
+
+def render_blocks(blocks_data):
+    """
+    Render a ``blocks_data`` tree.
+
+    Returns a dict with ``html``, ``styles``, ``scripts`` and the list of
+    block ``types`` that were rendered.
+    """
+    renderer = LayoutRenderer(load_blocks(blocks_data))
+    html = renderer.render(blocks_data)
+    styles, scripts = renderer.assets()
+    return {
+        'html': html,
+        'styles': styles,
+        'scripts': scripts,
+        'types': list(renderer.used),
+    }
+
+
+def render_layout(layout):
+    """Render a PageLayout instance."""
+    result = render_blocks(layout.blocks_data)
+    result['layout'] = layout.layout
+    return result
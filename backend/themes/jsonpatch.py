@@ -0,0 +1,152 @@
+"""
+Minimal JSON Patch (RFC 6902) implementation.
+
+Supports the ``add``, ``remove``, ``replace``, ``move``, ``copy`` and
+``test`` operations on documents made of dicts, lists and scalars.
+"""
+
+import copy
+
+OPERATIONS = {'add', 'remove', 'replace', 'move', 'copy', 'test'}
+
+# Upper bound on operations accepted in a single patch
+MAX_OPERATIONS = 1000
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied."""
+
+
+def parse_pointer(pointer):
+    """Split a JSON Pointer (RFC 6901) into unescaped reference tokens."""
+    if not isinstance(pointer, str):
+        raise JsonPatchError('Pointer must be a string.')
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f'Invalid pointer: {pointer!r}')
+    return [part.replace('~1', '/').replace('~0', '~') for part in pointer[1:].split('/')]
+
+
+def _list_index(container, token, allow_end=False):
+    if allow_end and token == '-':
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise JsonPatchError(f'Invalid array index: {token!r}')
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise JsonPatchError(f'Array index out of range: {index}')
+    return index
+
+
+def _resolve_parent(document, tokens):
+    """Return the container holding the target of ``tokens``."""
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise JsonPatchError(f'Path not found: {token!r}')
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_list_index(target, token)]
+        else:
+            raise JsonPatchError(f'Cannot traverse into scalar at {token!r}')
+    return target
+
+
+def _get(document, tokens):
+    if not tokens:
+        return document
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f'Path not found: {token!r}')
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_list_index(parent, token)]
+    raise JsonPatchError('Cannot read from a scalar.')
+
+
+def _add(document, tokens, value):
+    if not tokens:
+        return value
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError('Cannot add to a scalar.')
+    return document
+
+
+def _remove(document, tokens):
+    if not tokens:
+        raise JsonPatchError('Cannot remove the document root.')
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f'Path not found: {token!r}')
+        return parent.pop(token)
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, token))
+    raise JsonPatchError('Cannot remove from a scalar.')
+
+
+def validate_patch(operations):
+    """Check the structure of a patch without applying it."""
+    if not isinstance(operations, list):
+        raise JsonPatchError('Patch must be a list of operations.')
+    if len(operations) > MAX_OPERATIONS:
+        raise JsonPatchError(f'Patch exceeds {MAX_OPERATIONS} operations.')
+    for operation in operations:
+        if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+            raise JsonPatchError(f'Invalid operation: {operation!r}')
+        parse_pointer(operation.get('path'))
+        if operation['op'] in ('add', 'replace', 'test') and 'value' not in operation:
+            raise JsonPatchError(f"'{operation['op']}' requires a value.")
+        if operation['op'] in ('move', 'copy'):
+            parse_pointer(operation.get('from'))
+
+
+def apply_patch(document, operations, in_place=False):
+    """
+    Apply a JSON Patch and return the resulting document.
+
+    The input document is left untouched unless ``in_place`` is set.
+    Raises :class:`JsonPatchError` if any operation fails; in that case
+    no partial result is returned.
+    """
+    validate_patch(operations)
+    if not in_place:
+        document = copy.deepcopy(document)
+
+    for operation in operations:
+        op = operation['op']
+        tokens = parse_pointer(operation['path'])
+        if op == 'add':
+            document = _add(document, tokens, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            _remove(document, tokens)
+        elif op == 'replace':
+            _get(document, tokens)
+            if tokens:
+                _remove(document, tokens)
+            document = _add(document, tokens, copy.deepcopy(operation['value']))
+        elif op == 'move':
+            source = parse_pointer(operation['from'])
+            if tokens[:len(source)] == source and len(tokens) > len(source):
+                raise JsonPatchError('Cannot move a value into one of its children.')
+            value = _remove(document, source) if source else document
+            document = _add(document, tokens, value)
+        elif op == 'copy':
+            value = copy.deepcopy(_get(document, parse_pointer(operation['from'])))
+            document = _add(document, tokens, value)
+        elif op == 'test':
+            if _get(document, tokens) != operation['value']:
+                raise JsonPatchError(f"Test failed at {operation['path']!r}")
+    return document
@@ -0,0 +1,207 @@
+"""
+Menu resolution engine.
+
+``Menu.items`` is a free-form JSON tree whose entries may point at pages,
+posts or categories::
+
+    {"type": "page", "object_id": 3, "label": "About", "children": [...]}
+    {"type": "custom", "label": "Docs", "url": "https://docs.example.com"}
+
+The resolver walks the tree once to collect referenced ids, fetches each
+model with a single query, drops entries whose target is missing or
+unpublished, and caches the resolved tree per menu revision. The ``a``-
+prefixed functions are the same steps for async views.
+"""
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from core.cache import aget_version, bump_version, get_version
+from core.models import Category, Page, Post
+
+from .models import Menu
+
+CACHE_PREFIX = 'themes:menu'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Version bumped whenever content referenced by menus changes
+CONTENT_VERSION_NAME = 'themes:menu-content'
+
+# Guard against runaway nesting in user-supplied menus
+MAX_DEPTH = 16
+
+# Fields whose change affects how a target renders in a menu
+CONTENT_FIELDS = {'title', 'name', 'slug', 'status'}
+
+# Custom links may only use these schemes (or be site-relative)
+ALLOWED_SCHEMES = ('http://', 'https://', 'mailto:', 'tel:')
+
+# type -> (model, label field, visibility filter)
+TARGETS = {
+    'page': (Page, 'title', Q(status='published')),
+    'post': (Post, 'title', Q(status='published')),
+    'category': (Category, 'name', Q()),
+}
+
+
+def iter_items(items, depth=0):
+    """Yield every item dict in a menu tree."""
+    if depth > MAX_DEPTH or not isinstance(items, list):
+        return
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        yield item
+        yield from iter_items(item.get('children') or [], depth + 1)
+
+
+def _object_id(item):
+    try:
+        return int(item.get('object_id'))
+    except (TypeError, ValueError):
+        return None
+
+
+def collect_references(items):
+    """Return ``{type: {ids}}`` for every object referenced by the tree."""
+    references = {}
+    for item in iter_items(items):
+        if item.get('type') in TARGETS:
+            object_id = _object_id(item)
+            if object_id is not None:
+                references.setdefault(item['type'], set()).add(object_id)
+    return references
+
+
+def target_queryset(item_type, ids):
+    """Visible objects of ``item_type`` among ``ids``, with only the fields menus use."""
+    model, label_field, visible = TARGETS[item_type]
+    return model.objects.filter(visible, pk__in=ids).only('id', 'slug', label_field)
+
+
+def fetch_targets(references):
+    """Fetch referenced objects with one query per model."""
+    return {
+        item_type: {obj.pk: obj for obj in target_queryset(item_type, ids)}
+        for item_type, ids in references.items()
+    }
+
+
+async def afetch_targets(references):
+    """Async version of :func:`fetch_targets`."""
+    return {
+        item_type: {obj.pk: obj async for obj in target_queryset(item_type, ids)}
+        for item_type, ids in references.items()
+    }
+
+
+def is_safe_url(url):
+    """Allow site-relative URLs and a small set of schemes."""
+    url = url.strip()
+    if url.startswith('/') and not url.startswith('//'):
+        return True
+    return url.lower().startswith(ALLOWED_SCHEMES)
+
+
+def build_tree(items, targets, depth=0):
+    """Build the resolved tree, dropping unresolvable entries and their children."""
+    if depth > MAX_DEPTH or not isinstance(items, list):
+        return []
+    resolved = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_type = item.get('type', 'custom')
+        label = item.get('label') or ''
+        if item_type in TARGETS:
+            obj = targets.get(item_type, {}).get(_object_id(item))
+            if obj is None:
+                continue
+            label = label or getattr(obj, TARGETS[item_type][1])
+            url = obj.get_absolute_url()
+        else:
+            url = str(item.get('url') or '')
+            if not url or not is_safe_url(url):
+                continue
+            item_type = 'custom'
+        resolved.append({
+            'id': item.get('id'),
+            'type': item_type,
+            'object_id': _object_id(item) if item_type != 'custom' else None,
+            'label': label,
+            'url': url,
+            'children': build_tree(item.get('children') or [], targets, depth + 1),
+        })
+    return resolved
+
+
+def resolve_items(items):
+    """Resolve a raw ``Menu.items`` tree, bypassing the cache."""
+    return build_tree(items, fetch_targets(collect_references(items)))
+
+
+def cache_key(menu, content_version=None):
+    """Cache key of a menu's resolved tree."""
+    if content_version is None:
+        content_version = get_version(CONTENT_VERSION_NAME)
+    return f'{CACHE_PREFIX}:{menu.pk}:{menu.updated_at.timestamp()}:{content_version}'
+
+
+def resolve_menu(menu):
+    """Return the resolved tree for a menu, served from cache when current."""
+    key = cache_key(menu)
+    tree = cache.get(key)
+    if tree is None:
+        tree = resolve_items(menu.items)
+        cache.set(key, tree, CACHE_TIMEOUT)
+    return tree
+
+
+async def aresolve_menu(menu):
+    """Async version of :func:`resolve_menu`."""
+    key = cache_key(menu, await aget_version(CONTENT_VERSION_NAME))
+    tree = await cache.aget(key)
+    if tree is None:
+        tree = build_tree(menu.items, await afetch_targets(collect_references(menu.items)))
+        await cache.aset(key, tree, CACHE_TIMEOUT)
+    return tree
+
+
+def location_queryset(location):
+    return Menu.objects.filter(location=location).order_by('-updated_at')
+
+
+def get_menu_for_location(location):
+    """Return the menu assigned to a theme location, or ``None``."""
+    return location_queryset(location).first()
+
+
+async def aget_menu_for_location(location):
+    """Async version of :func:`get_menu_for_location`."""
+    return await location_queryset(location).afirst()
+
+
+def menu_representation(menu, items):
+    return {
+        'id': menu.pk,
+        'name': menu.name,
+        'slug': menu.slug,
+        'location': menu.location,
+        'settings': menu.settings,
+        'items': items,
+    }
+
+
+def serialize_menu(menu):
+    """Return a ready-to-render representation of a menu."""
+    return menu_representation(menu, resolve_menu(menu))
+
+
+async def aserialize_menu(menu):
+    """Async version of :func:`serialize_menu`."""
+    return menu_representation(menu, await aresolve_menu(menu))
+
+
+def invalidate_menu_content():
+    """Invalidate every resolved menu after referenced content changed."""
+    bump_version(CONTENT_VERSION_NAME)
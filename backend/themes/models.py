@@ -3,7 +3,7 @@ Theme models for visual editing and customization.
 """
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 
@@ -73,9 +73,11 @@ class Theme(models.Model):
     
     def activate(self):
         """Activate this theme and deactivate others."""
-        Theme.objects.filter(status='active').update(status='inactive')
-        self.status = 'active'
-        self.save()
+        with transaction.atomic():
+            Theme.objects.filter(status='active').exclude(pk=self.pk).update(status='inactive')
+            self.status = 'active'
+            # post_save invalidates the active theme registry in every worker
+            self.save()
 
 
 class Block(models.Model):
@@ -164,6 +166,11 @@ class PageLayout(models.Model):
     layout = models.JSONField(_('layout'), default=dict)
     blocks_data = models.JSONField(_('blocks data'), default=list)
     
+    # Revisions: layout/blocks_data hold the document as of snapshot_revision,
+    # later autosaves are stored as deltas in LayoutRevision
+    revision = models.PositiveIntegerField(_('revision'), default=0)
+    snapshot_revision = models.PositiveIntegerField(_('snapshot revision'), default=0)
+    
     # Metadata
     is_active = models.BooleanField(_('is active'), default=True)
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
@@ -181,6 +188,50 @@ class PageLayout(models.Model):
         return f"Layout {self.id}"
 
 
+class LayoutRevision(models.Model):
+    """
+    One revision of a PageLayout document.
+    
+    Snapshots store the full document; other revisions store the JSON
+    Patch that produced them from the previous revision.
+    """
+    
+    layout = models.ForeignKey(
+        PageLayout,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+        verbose_name=_('layout')
+    )
+    number = models.PositiveIntegerField(_('number'))
+    is_snapshot = models.BooleanField(_('is snapshot'), default=False)
+    
+    # Exactly one of these is populated, depending on is_snapshot
+    document = models.JSONField(_('document'), null=True, blank=True)
+    patch = models.JSONField(_('patch'), null=True, blank=True)
+    size = models.PositiveIntegerField(_('size (bytes)'), default=0)
+    
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='layout_revisions'
+    )
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('layout revision')
+        verbose_name_plural = _('layout revisions')
+        ordering = ['layout', '-number']
+        unique_together = [['layout', 'number']]
+        indexes = [
+            models.Index(fields=['layout', 'is_snapshot', 'number']),
+        ]
+    
+    def __str__(self):
+        return f"Layout {self.layout_id} r{self.number}"
+
+
 class Menu(models.Model):
     """
     Navigation menu with visual builder support.
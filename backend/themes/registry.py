@@ -0,0 +1,165 @@
+"""
+In-process registry for the active theme.
+
+Each worker loads the active theme once and keeps an immutable snapshot
+of it. Saving or activating a theme bumps a version key in the shared
+cache; workers compare that version on access and reload only when it
+has changed, so theme lookups on the render path issue no queries.
+"""
+
+import threading
+
+from core.cache import bump_version, get_version
+
+from .models import Theme
+
+VERSION_NAME = 'themes:active'
+
+_MISSING = object()
+
+
+class ActiveTheme:
+    """Read-only snapshot of the active theme with typed settings accessors."""
+
+    __slots__ = (
+        'id', 'name', 'slug', 'version', 'directory', 'settings',
+        'widget_areas', 'block_patterns', 'supports_blocks',
+        'supports_widgets', 'supports_visual_editor', 'updated_at',
+    )
+
+    def __init__(self, theme):
+        self.id = theme.pk
+        self.name = theme.name
+        self.slug = theme.slug
+        self.version = theme.version
+        self.directory = theme.directory
+        self.settings = theme.settings if isinstance(theme.settings, dict) else {}
+        self.widget_areas = theme.widget_areas if isinstance(theme.widget_areas, list) else []
+        self.block_patterns = theme.block_patterns if isinstance(theme.block_patterns, list) else []
+        self.supports_blocks = theme.supports_blocks
+        self.supports_widgets = theme.supports_widgets
+        self.supports_visual_editor = theme.supports_visual_editor
+        self.updated_at = theme.updated_at
+
+    def __repr__(self):
+        return f'<ActiveTheme {self.slug}>'
+
+    @property
+    def widget_area_ids(self):
+        """Identifiers of the theme's widget areas, in declaration order."""
+        ids = []
+        for area in self.widget_areas:
+            if isinstance(area, str):
+                ids.append(area)
+            elif isinstance(area, dict) and area.get('id'):
+                ids.append(area['id'])
+        return ids
+
+    def get_setting(self, path, default=None):
+        """
+        Look up a setting by dotted path, e.g. ``colors.primary``.
+
+        Returns ``default`` when any segment of the path is missing.
+        """
+        value = self.settings
+        for part in path.split('.'):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
+
+    def get_str(self, path, default=''):
+        """Return a setting as a string."""
+        value = self.get_setting(path, _MISSING)
+        if value is _MISSING or value is None:
+            return default
+        return str(value)
+
+    def get_int(self, path, default=0):
+        """Return a setting as an integer."""
+        value = self.get_setting(path, _MISSING)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, path, default=0.0):
+        """Return a setting as a float."""
+        value = self.get_setting(path, _MISSING)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, path, default=False):
+        """Return a setting as a boolean, accepting common string spellings."""
+        value = self.get_setting(path, _MISSING)
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in ('true', '1', 'yes', 'on'):
+                return True
+            if lowered in ('false', '0', 'no', 'off'):
+                return False
+        if isinstance(value, (int, float)):
+            return bool(value)
+        return default
+
+    def get_list(self, path, default=None):
+        """Return a setting that must be a list."""
+        value = self.get_setting(path, _MISSING)
+        if isinstance(value, list):
+            return value
+        return [] if default is None else default
+
+    def get_dict(self, path, default=None):
+        """Return a setting that must be a dict."""
+        value = self.get_setting(path, _MISSING)
+        if isinstance(value, dict):
+            return value
+        return {} if default is None else default
+
+
+class ThemeRegistry:
+    """Per-process holder of the active theme snapshot."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._theme = None
+
+    def get(self):
+        """Return the active theme snapshot, or ``None`` if no theme is active."""
+        version = get_version(VERSION_NAME)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._theme = self._load()
+                    # Store the version read before loading so a concurrent bump forces a reload
+                    self._version = version
+        return self._theme
+
+    def _load(self):
+        theme = Theme.objects.filter(status='active').order_by('-updated_at').first()
+        return ActiveTheme(theme) if theme is not None else None
+
+    def reset(self):
+        """Forget the local snapshot; the next access reloads it."""
+        with self._lock:
+            self._version = None
+            self._theme = None
+
+
+registry = ThemeRegistry()
+
+
+def get_active_theme():
+    """Return the active theme snapshot for this worker."""
+    return registry.get()
+
+
+def invalidate_active_theme():
+    """Invalidate the active theme snapshot in every worker."""
+    bump_version(VERSION_NAME)
+    registry.reset()
@@ -0,0 +1,197 @@
+"""
+Revisioned storage for PageLayout documents.
+
+A layout document is ``{"layout": ..., "blocks_data": ...}``. Autosaves
+send JSON Patch deltas against a known base revision; the server applies
+them and appends a small delta row instead of rewriting the full
+document. Every ``SNAPSHOT_INTERVAL`` revisions (and on explicit saves)
+the full document is written as a snapshot and materialized back into
+the PageLayout row, which is what the public renderer reads.
+
+Any revision is reconstructed from the nearest snapshot at or below it
+plus the deltas that follow.
+"""
+
+import json
+
+from django.db import transaction
+
+from .jsonpatch import JsonPatchError, apply_patch
+from .models import LayoutRevision, PageLayout
+
+# Deltas allowed between snapshots before a new snapshot is forced
+SNAPSHOT_INTERVAL = 25
+
+
+class RevisionConflict(Exception):
+    """Raised when a write is based on a revision that is no longer the head."""
+
+    def __init__(self, head):
+        super().__init__(f'Layout has moved on to revision {head}.')
+        self.head = head
+
+
+def _size(value):
+    return len(json.dumps(value, separators=(',', ':')).encode())
+
+
+def materialized_document(layout):
+    """The document stored on the PageLayout row (as of ``snapshot_revision``)."""
+    return {'layout': layout.layout, 'blocks_data': layout.blocks_data}
+
+
+def validate_document(document):
+    """Raise :class:`~themes.jsonpatch.JsonPatchError` unless ``document`` has the layout document shape."""
+    if not isinstance(document, dict):
+        raise JsonPatchError('The layout document must be an object.')
+    if not isinstance(document.get('layout'), dict):
+        raise JsonPatchError('"layout" must be an object.')
+    if not isinstance(document.get('blocks_data'), list):
+        raise JsonPatchError('"blocks_data" must be a list.')
+    return document
+
+
+def _apply_deltas(document, revisions):
+    for revision in revisions:
+        document = apply_patch(document, revision.patch, in_place=True)
+    return document
+
+
+def head_document(layout):
+    """Return the document at the layout's head revision."""
+    deltas = (
+        LayoutRevision.objects.filter(
+            layout=layout,
+            number__gt=layout.snapshot_revision,
+            number__lte=layout.revision,
+            is_snapshot=False,
+        )
+        .only('patch')
+        .order_by('number')
+    )
+    return _apply_deltas(materialized_document(layout), deltas)
+
+
+def reconstruct(layout, number):
+    """
+    Return the document as it was at revision ``number``.
+
+    Raises ``LayoutRevision.DoesNotExist`` if the revision is unknown.
+    """
+    if number > layout.revision:
+        raise LayoutRevision.DoesNotExist(f'Revision {number} does not exist.')
+    snapshot = (
+        LayoutRevision.objects.filter(layout=layout, is_snapshot=True, number__lte=number)
+        .order_by('-number')
+        .only('number', 'document')
+        .first()
+    )
+    if snapshot is None:
+        raise LayoutRevision.DoesNotExist(f'No snapshot precedes revision {number}.')
+    deltas = (
+        LayoutRevision.objects.filter(
+            layout=layout,
+            number__gt=snapshot.number,
+            number__lte=number,
+            is_snapshot=False,
+        )
+        .only('patch')
+        .order_by('number')
+    )
+    return _apply_deltas(snapshot.document, deltas)
+
+
+def list_revisions(layout):
+    """Revision metadata, newest first, without loading documents or patches."""
+    return (
+        LayoutRevision.objects.filter(layout=layout)
+        .defer('document', 'patch')
+        .select_related('author')
+        .order_by('-number')
+    )
+
+
+def _write_snapshot(layout, number, document, author):
+    LayoutRevision.objects.create(
+        layout=layout,
+        number=number,
+        is_snapshot=True,
+        document=document,
+        size=_size(document),
+        author=author,
+    )
+    layout.layout = document.get('layout', {})
+    layout.blocks_data = document.get('blocks_data', [])
+    layout.revision = number
+    layout.snapshot_revision = number
+    layout.save(update_fields=['layout', 'blocks_data', 'revision', 'snapshot_revision', 'updated_at'])
+
+
+def _lock(layout):
+    return PageLayout.objects.select_for_update().get(pk=layout.pk)
+
+
+def _ensure_base_snapshot(layout, author):
+    """Record revision 0 so the pre-history document stays reconstructable."""
+    if layout.revision == 0 and not LayoutRevision.objects.filter(layout=layout, number=0).exists():
+        document = materialized_document(layout)
+        LayoutRevision.objects.create(
+            layout=layout,
+            number=0,
+            is_snapshot=True,
+            document=document,
+            size=_size(document),
+            author=author,
+        )
+
+
+def autosave(layout, base_revision, operations, author=None):
+    """
+    Apply a JSON Patch on top of ``base_revision`` and record it.
+
+    Returns the new revision number. Raises :class:`RevisionConflict` if
+    ``base_revision`` is not the current head and
+    :class:`~themes.jsonpatch.JsonPatchError` if the patch does not apply
+    or leaves an invalid document.
+    """
+    with transaction.atomic():
+        layout = _lock(layout)
+        if base_revision != layout.revision:
+            raise RevisionConflict(layout.revision)
+        _ensure_base_snapshot(layout, author)
+
+        document = validate_document(apply_patch(head_document(layout), operations))
+        number = layout.revision + 1
+
+        if number - layout.snapshot_revision >= SNAPSHOT_INTERVAL:
+            _write_snapshot(layout, number, document, author)
+        else:
+            LayoutRevision.objects.create(
+                layout=layout,
+                number=number,
+                patch=operations,
+                size=_size(operations),
+                author=author,
+            )
+            layout.revision = number
+            layout.save(update_fields=['revision', 'updated_at'])
+    return number
+
+
+def save_snapshot(layout, base_revision, document, author=None):
+    """
+    Store a full document as a new snapshot revision and materialize it.
+
+    Used for explicit saves and publishing. Returns the new revision number.
+    Raises :class:`~themes.jsonpatch.JsonPatchError` if ``document`` is not
+    a valid layout document.
+    """
+    validate_document(document)
+    with transaction.atomic():
+        layout = _lock(layout)
+        if base_revision != layout.revision:
+            raise RevisionConflict(layout.revision)
+        _ensure_base_snapshot(layout, author)
+        number = layout.revision + 1
+        _write_snapshot(layout, number, document, author)
+    return number
@@ -0,0 +1,33 @@
+"""
+Serializers for theme endpoints.
+"""
+
+from rest_framework import serializers
+
+from .models import LayoutRevision
+
+
+class LayoutRevisionSerializer(serializers.ModelSerializer):
+    """Revision metadata without the stored document or patch."""
+    
+    author = serializers.CharField(source='author.email', read_only=True, default=None)
+    
+    class Meta:
+        model = LayoutRevision
+        fields = ['number', 'is_snapshot', 'size', 'author', 'created_at']
+        read_only_fields = fields
+
+
+class LayoutAutosaveSerializer(serializers.Serializer):
+    """JSON Patch delta against a base revision."""
+    
+    base_revision = serializers.IntegerField(min_value=0)
+    patch = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+
+class LayoutSnapshotSerializer(serializers.Serializer):
+    """Full layout document saved as a new snapshot."""
+    
+    base_revision = serializers.IntegerField(min_value=0)
+    layout = serializers.DictField()
+    blocks_data = serializers.ListField()
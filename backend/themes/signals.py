@@ -0,0 +1,64 @@
+"""
+Signal handlers for theme models.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core.changefeed import record_change, remember_visibility
+from core.models import Category, Page, Post
+
+from .menus import CONTENT_FIELDS, invalidate_menu_content
+from .models import Menu, Theme, Widget
+from .registry import invalidate_active_theme
+
+
+@receiver(post_save, sender=Theme)
+@receiver(post_delete, sender=Theme)
+def theme_changed(sender, instance, **kwargs):
+    """Invalidate the active theme in all workers once the change is committed."""
+    transaction.on_commit(invalidate_active_theme)
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+def menu_content_saved(sender, instance, update_fields=None, **kwargs):
+    """Invalidate resolved menus when a potential menu target changes."""
+    if update_fields is not None and not CONTENT_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(invalidate_menu_content)
+
+
+@receiver(post_delete, sender=Page)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Category)
+def menu_content_deleted(sender, instance, **kwargs):
+    """Invalidate resolved menus when a potential menu target is removed."""
+    transaction.on_commit(invalidate_menu_content)
+
+
+@receiver(pre_save, sender=Menu)
+@receiver(pre_save, sender=Widget)
+@receiver(pre_delete, sender=Menu)
+@receiver(pre_delete, sender=Widget)
+def feed_content_changing(sender, instance, raw=False, **kwargs):
+    """Remember whether the object was public for its change feed entry."""
+    if not raw:
+        remember_visibility(instance)
+
+
+@receiver(post_save, sender=Menu)
+@receiver(post_save, sender=Widget)
+def feed_content_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Record the change in the change feed."""
+    if not raw:
+        record_change(instance, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Menu)
+@receiver(post_delete, sender=Widget)
+def feed_content_deleted(sender, instance, **kwargs):
+    """Record the deletion in the change feed."""
+    record_change(instance, 'deleted')
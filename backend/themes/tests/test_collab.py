@@ -0,0 +1,227 @@
+"""
+Collaborative layout editing sessions.
+
+Each test drives ``layout_socket`` directly with in-memory ASGI queues and
+a fresh :class:`~themes.collab.InMemoryChannelLayer`.
+"""
+
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+from knox.models import AuthToken
+
+from core.models import User
+from themes import collab, revisions
+from themes.models import PageLayout
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+# Seconds to wait for a message before failing
+TIMEOUT = 5
+
+
+class Client:
+    """A WebSocket client talking to ``layout_socket`` through ASGI queues."""
+
+    def __init__(self, layout, token):
+        self.to_server = asyncio.Queue()
+        self.from_server = asyncio.Queue()
+        scope = {
+            'type': 'websocket',
+            'path': f'/ws/layouts/{layout.pk}/',
+            'query_string': f'token={token}'.encode(),
+        }
+        self.task = asyncio.ensure_future(collab.layout_socket(scope, self.to_server.get, self.from_server.put))
+
+    async def connect(self):
+        await self.to_server.put({'type': 'websocket.connect'})
+        event = await asyncio.wait_for(self.from_server.get(), TIMEOUT)
+        assert event['type'] == 'websocket.accept', event
+        return await self.expect('init')
+
+    async def send(self, message):
+        await self.to_server.put({'type': 'websocket.receive', 'text': json.dumps(message)})
+
+    async def expect(self, kind):
+        """Return the next message of type ``kind``, skipping presence and cursor updates."""
+        while True:
+            event = await asyncio.wait_for(self.from_server.get(), TIMEOUT)
+            assert event['type'] == 'websocket.send', event
+            message = json.loads(event['text'])
+            if message['type'] == kind:
+                return message
+            assert message['type'] in ('presence', 'cursor'), message
+
+    async def disconnect(self):
+        await self.to_server.put({'type': 'websocket.disconnect'})
+        await asyncio.wait_for(self.task, TIMEOUT)
+
+
+@pytest.fixture(autouse=True)
+def channel_layer(monkeypatch, settings):
+    settings.LAYOUT_COLLAB_SAVE_INTERVAL = 60
+    settings.LAYOUT_COLLAB_SAVE_OPERATIONS = 200
+    layer = collab.InMemoryChannelLayer()
+    monkeypatch.setattr(collab, 'channel_layer', layer)
+    monkeypatch.setattr(collab, 'registry', collab.SessionRegistry())
+    return layer
+
+
+@pytest.fixture
+def editor():
+    return User.objects.create_user('editor@example.com', 'correct-horse-battery', role='editor')
+
+
+@pytest.fixture
+def token(editor):
+    return AuthToken.objects.create(editor)[1]
+
+
+@pytest.fixture
+def layout():
+    return PageLayout.objects.create(layout={'title': 'Home'}, blocks_data=[])
+
+
+def add_block(name):
+    return [{'op': 'add', 'path': '/blocks_data/-', 'value': {'type': name}}]
+
+
+def refreshed(layout):
+    layout.refresh_from_db()
+    return layout
+
+
+def test_join_sends_document(layout, token, editor):
+    async def scenario():
+        client = Client(layout, token)
+        init = await client.connect()
+        await client.disconnect()
+        return init
+
+    init = asyncio.run(scenario())
+    assert init['version'] == 0
+    assert init['revision'] == 0
+    assert init['document'] == {'layout': {'title': 'Home'}, 'blocks_data': []}
+    assert init['editors'] == [{'id': editor.pk, 'name': editor.email}]
+
+
+def test_rejects_bad_token(layout):
+    async def scenario():
+        client = Client(layout, 'not-a-token')
+        await client.to_server.put({'type': 'websocket.connect'})
+        return await asyncio.wait_for(client.from_server.get(), TIMEOUT)
+
+    assert asyncio.run(scenario()) == {'type': 'websocket.close', 'code': collab.CLOSE_UNAUTHORIZED}
+
+
+def test_op_is_broadcast_and_saved_when_last_editor_leaves(layout, token, editor):
+    async def scenario():
+        first, second = Client(layout, token), Client(layout, token)
+        await first.connect()
+        await second.connect()
+        await first.send({'type': 'op', 'id': 'a', 'version': 0, 'patch': add_block('text')})
+        acknowledged, received = await first.expect('op'), await second.expect('op')
+        await first.disconnect()
+        await second.disconnect()
+        return acknowledged, received
+
+    acknowledged, received = asyncio.run(scenario())
+    assert acknowledged == received == {
+        'type': 'op', 'id': 'a', 'version': 1, 'patch': add_block('text'), 'user': editor.pk,
+    }
+    layout = refreshed(layout)
+    assert layout.revision == 1
+    assert revisions.head_document(layout)['blocks_data'] == [{'type': 'text'}]
+
+
+def test_op_on_old_version_is_rejected(layout, token):
+    async def scenario():
+        first, second = Client(layout, token), Client(layout, token)
+        await first.connect()
+        await second.connect()
+        await first.send({'type': 'op', 'id': 'a', 'version': 0, 'patch': add_block('text')})
+        await second.expect('op')
+        await second.send({'type': 'op', 'id': 'b', 'version': 0, 'patch': add_block('image')})
+        reject = await second.expect('reject')
+        await first.disconnect()
+        await second.disconnect()
+        return reject
+
+    reject = asyncio.run(scenario())
+    assert reject['id'] == 'b'
+    assert reject['version'] == 1
+    assert revisions.head_document(refreshed(layout))['blocks_data'] == [{'type': 'text'}]
+
+
+@pytest.mark.parametrize('patch', [
+    [{'op': 'replace', 'path': '', 'value': []}],
+    [{'op': 'replace', 'path': '/layout', 'value': 'x'}],
+    [{'op': 'remove', 'path': '/blocks_data'}],
+    [{'op': 'remove', 'path': '/missing'}],
+])
+def test_invalid_op_is_an_error(layout, token, patch):
+    async def scenario():
+        client = Client(layout, token)
+        await client.connect()
+        await client.send({'type': 'op', 'id': 'bad', 'version': 0, 'patch': patch})
+        error = await client.expect('error')
+        # The session is still usable at the same version
+        await client.send({'type': 'op', 'id': 'good', 'version': 0, 'patch': add_block('text')})
+        op = await client.expect('op')
+        await client.disconnect()
+        remaining = [client.from_server.get_nowait() for _ in range(client.from_server.qsize())]
+        return error, op, remaining
+
+    error, op, remaining = asyncio.run(scenario())
+    assert error['id'] == 'bad'
+    assert op['version'] == 1
+    # The session ended cleanly and its edits were saved
+    assert not any(event['type'] == 'websocket.close' for event in remaining)
+    assert revisions.head_document(refreshed(layout)) == {
+        'layout': {'title': 'Home'},
+        'blocks_data': [{'type': 'text'}],
+    }
+
+
+def test_save_writes_snapshot(layout, token):
+    async def scenario():
+        client = Client(layout, token)
+        await client.connect()
+        await client.send({'type': 'op', 'id': 'a', 'version': 0, 'patch': add_block('text')})
+        await client.expect('op')
+        await client.send({'type': 'save'})
+        saved = await client.expect('saved')
+        await client.disconnect()
+        return saved
+
+    saved = asyncio.run(scenario())
+    assert saved == {'type': 'saved', 'version': 1, 'revision': 1}
+    layout = refreshed(layout)
+    assert layout.snapshot_revision == 1
+    assert layout.blocks_data == [{'type': 'text'}]
+
+
+def test_conflicting_save_rebases_unsaved_operations(layout, token, editor):
+    async def scenario():
+        client = Client(layout, token)
+        await client.connect()
+        await client.send({'type': 'op', 'id': 'a', 'version': 0, 'patch': add_block('text')})
+        await client.expect('op')
+        # A REST autosave moves the head on while the session has unsaved operations
+        await sync_to_async(revisions.autosave)(
+            layout, 0, [{'op': 'replace', 'path': '/layout/title', 'value': 'Welcome'}], editor,
+        )
+        await client.send({'type': 'save'})
+        merged = await client.expect('init')
+        await client.disconnect()
+        return merged
+
+    merged = asyncio.run(scenario())
+    assert merged['revision'] == 1
+    assert merged['version'] == 2
+    assert merged['document'] == {'layout': {'title': 'Welcome'}, 'blocks_data': [{'type': 'text'}]}
+    layout = refreshed(layout)
+    assert layout.revision == 2
+    assert revisions.head_document(layout) == merged['document']
@@ -0,0 +1,33 @@
+"""
+URL configuration for theme endpoints.
+"""
+
+from django.urls import path
+
+from .views import (
+    layout_autosave_view,
+    layout_document_view,
+    layout_revision_detail_view,
+    layout_revision_list_view,
+    layout_snapshot_view,
+    menu_by_location_view,
+    public_menu_view,
+    render_layout_view,
+    rendered_widgets_view,
+)
+
+urlpatterns = [
+    path('layouts/<int:pk>/render/', render_layout_view, name='layout-render'),
+    path('layouts/<int:pk>/document/', layout_document_view, name='layout-document'),
+    path('layouts/<int:pk>/autosave/', layout_autosave_view, name='layout-autosave'),
+    path('layouts/<int:pk>/snapshot/', layout_snapshot_view, name='layout-snapshot'),
+    path('layouts/<int:pk>/revisions/', layout_revision_list_view, name='layout-revision-list'),
+    path(
+        'layouts/<int:pk>/revisions/<int:number>/',
+        layout_revision_detail_view,
+        name='layout-revision-detail',
+    ),
+    path('widgets/rendered/', rendered_widgets_view, name='widgets-rendered'),
+    path('menus/<slug:location>/', menu_by_location_view, name='menu-by-location'),
+    path('public/menus/<slug:location>/', public_menu_view, name='public-menu'),
+]
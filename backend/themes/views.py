@@ -0,0 +1,193 @@
+"""
+Views for theme rendering endpoints.
+"""
+
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+
+from . import revisions
+from .engine import render_layout
+from .jsonpatch import JsonPatchError
+from .menus import aget_menu_for_location, aserialize_menu, get_menu_for_location, serialize_menu
+from .models import LayoutRevision, PageLayout
+from .registry import get_active_theme
+from .serializers import LayoutAutosaveSerializer, LayoutRevisionSerializer, LayoutSnapshotSerializer
+from .widgets import render_areas
+
+
+def can_view_layout(user, layout):
+    """Published content is public; drafts are visible to users who can edit them."""
+    target = layout.page or layout.post
+    if target is None:
+        return user.is_authenticated and user.is_editor
+    if target.is_published:
+        return True
+    return user.is_authenticated and target.can_be_edited_by(user)
+
+
+def can_edit_layout(user, layout):
+    """Layout edits follow the permissions of the page or post they belong to."""
+    target = layout.page or layout.post
+    if target is None:
+        return user.is_editor
+    return target.can_be_edited_by(user)
+
+
+def get_editable_layout(request, pk):
+    """Fetch a layout the requesting user may edit, or raise."""
+    layout = get_object_or_404(PageLayout.objects.select_related('page', 'post'), pk=pk)
+    if not can_edit_layout(request.user, layout):
+        raise PermissionDenied()
+    return layout
+
+
+def conflict_response(exc):
+    return Response(
+        {'detail': str(exc), 'revision': exc.head},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def render_layout_view(request, pk):
+    """
+    Render a page layout's blocks to HTML.
+
+    Returns the rendered markup together with the styles and scripts of
+    the blocks that were used.
+    """
+    layout = get_object_or_404(
+        PageLayout.objects.select_related('page', 'post'),
+        pk=pk,
+        is_active=True,
+    )
+    if not can_view_layout(request.user, layout):
+        raise NotFound()
+    return Response(render_layout(layout))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def rendered_widgets_view(request):
+    """
+    Render every widget area of the active theme.
+
+    Returns all areas in a single response so the frontend does not need
+    one request per sidebar or footer.
+    """
+    theme = get_active_theme()
+    return Response({
+        'theme': theme.slug if theme is not None else None,
+        'areas': render_areas(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+def menu_by_location_view(request, location):
+    """
+    Return the menu assigned to a theme location, fully resolved.
+
+    Entries pointing at pages, posts or categories carry current labels
+    and URLs; unpublished or deleted targets are omitted.
+    """
+    menu = get_menu_for_location(location)
+    if menu is None:
+        raise NotFound()
+    return Response(serialize_menu(menu))
+
+
+@require_safe
+async def public_menu_view(request, location):
+    """Async version of :func:`menu_by_location_view` for ASGI deployments."""
+    menu = await aget_menu_for_location(location)
+    if menu is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    return JsonResponse(await aserialize_menu(menu))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def layout_document_view(request, pk):
+    """Return the head revision of a layout document for the editor."""
+    layout = get_editable_layout(request, pk)
+    return Response({
+        'revision': layout.revision,
+        **revisions.head_document(layout),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def layout_autosave_view(request, pk):
+    """
+    Apply a JSON Patch autosave to a layout.
+    
+    Responds with 409 and the current head revision if ``base_revision``
+    is stale, so the editor can refetch and rebase.
+    """
+    layout = get_editable_layout(request, pk)
+    serializer = LayoutAutosaveSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        number = revisions.autosave(
+            layout,
+            serializer.validated_data['base_revision'],
+            serializer.validated_data['patch'],
+            author=request.user,
+        )
+    except revisions.RevisionConflict as exc:
+        return conflict_response(exc)
+    except JsonPatchError as exc:
+        raise ValidationError({'patch': str(exc)})
+    return Response({'revision': number})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def layout_snapshot_view(request, pk):
+    """Save a full layout document as a new snapshot revision."""
+    layout = get_editable_layout(request, pk)
+    serializer = LayoutSnapshotSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    try:
+        number = revisions.save_snapshot(
+            layout,
+            data['base_revision'],
+            {'layout': data['layout'], 'blocks_data': data['blocks_data']},
+            author=request.user,
+        )
+    except revisions.RevisionConflict as exc:
+        return conflict_response(exc)
+    except JsonPatchError as exc:
+        raise ValidationError(str(exc))
+    return Response({'revision': number}, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def layout_revision_list_view(request, pk):
+    """List a layout's revisions without loading their contents."""
+    layout = get_editable_layout(request, pk)
+    serializer = LayoutRevisionSerializer(revisions.list_revisions(layout), many=True)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def layout_revision_detail_view(request, pk, number):
+    """Reconstruct a layout document as of a given revision."""
+    layout = get_editable_layout(request, pk)
+    try:
+        document = revisions.reconstruct(layout, number)
+    except LayoutRevision.DoesNotExist:
+        raise NotFound()
+    return Response({'revision': number, **document})
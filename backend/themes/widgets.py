@@ -0,0 +1,220 @@
+"""
+Widget rendering service.
+
+Loads every active widget for the active theme's widget areas in one
+query, renders each through a registry of per-type renderers and caches
+the rendered fragments keyed by widget area, id and ``updated_at``.
+"""
+
+import logging
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils.html import format_html, format_html_join, linebreaks
+
+from .models import Widget
+from .registry import get_active_theme
+
+logger = logging.getLogger('securepress.themes')
+
+FRAGMENT_CACHE_PREFIX = 'themes:widget-html'
+DEFAULT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# type -> (render callable, cache timeout in seconds)
+_renderers = {}
+
+
+def register_widget(widget_type, cache_timeout=DEFAULT_CACHE_TIMEOUT):
+    """
+    Register a renderer for a widget type.
+
+    The decorated callable receives the Widget instance and returns HTML.
+    Renderers whose output depends on other content should pass a short
+    ``cache_timeout``; ``0`` disables fragment caching for the type.
+    """
+    def decorator(func):
+        _renderers[widget_type] = (func, cache_timeout)
+        return func
+    return decorator
+
+
+def get_renderer(widget_type):
+    """Return the ``(renderer, cache_timeout)`` pair for a widget type, or ``None``."""
+    return _renderers.get(widget_type)
+
+
+def _int_setting(widget, name, default, maximum):
+    try:
+        value = int(widget.settings.get(name, default))
+    except (TypeError, ValueError, AttributeError):
+        value = default
+    return max(1, min(value, maximum))
+
+
+@register_widget('text')
+def render_text(widget):
+    """Plain text widget; content is escaped and line breaks preserved."""
+    return linebreaks(str(widget.settings.get('text', '')), autoescape=True)
+
+
+@register_widget('search')
+def render_search(widget):
+    """Search form posting to the public search page."""
+    placeholder = widget.settings.get('placeholder', 'Search…')
+    return format_html(
+        '<form role="search" method="get" action="/search/">'
+        '<input type="search" name="q" placeholder="{}"></form>',
+        placeholder,
+    )
+
+
+@register_widget('recent-posts', cache_timeout=300)
+def render_recent_posts(widget):
+    """List of the most recently published posts."""
+    from core.models import Post
+
+    count = _int_setting(widget, 'count', 5, 20)
+    posts = (
+        Post.objects.filter(status='published')
+        .order_by('-published_at')
+        .only('slug', 'title')[:count]
+    )
+    return format_html(
+        '<ul>{}</ul>',
+        format_html_join(
+            '', '<li><a href="{}">{}</a></li>',
+            ((post.get_absolute_url(), post.title) for post in posts),
+        ),
+    )
+
+
+@register_widget('categories', cache_timeout=900)
+def render_categories(widget):
+    """List of all categories."""
+    from core.models import Category
+
+    categories = Category.objects.only('slug', 'name')
+    return format_html(
+        '<ul>{}</ul>',
+        format_html_join(
+            '', '<li><a href="{}">{}</a></li>',
+            ((category.get_absolute_url(), category.name) for category in categories),
+        ),
+    )
+
+
+@register_widget('tags', cache_timeout=900)
+def render_tags(widget):
+    """List of tags."""
+    from core.models import Tag
+
+    limit = _int_setting(widget, 'count', 45, 200)
+    tags = Tag.objects.only('slug', 'name')[:limit]
+    return format_html(
+        '<ul class="tag-cloud">{}</ul>',
+        format_html_join(
+            '', '<li><a href="{}">{}</a></li>',
+            ((tag.get_absolute_url(), tag.name) for tag in tags),
+        ),
+    )
+
+
+@register_widget('archives', cache_timeout=3600)
+def render_archives(widget):
+    """Monthly archive links with post counts."""
+    from core.models import Post
+
+    months = (
+        Post.objects.filter(status='published', published_at__isnull=False)
+        .annotate(month=TruncMonth('published_at'))
+        .values('month')
+        .annotate(total=Count('id'))
+        .order_by('-month')
+    )
+    return format_html(
+        '<ul>{}</ul>',
+        format_html_join(
+            '',
+            '<li><a href="/archive/{}/">{}</a> ({})</li>',
+            (
+                (row['month'].strftime('%Y/%m'), row['month'].strftime('%B %Y'), row['total'])
+                for row in months
+            ),
+        ),
+    )
+
+
+def fragment_key(widget):
+    """Cache key of a rendered widget fragment."""
+    return f'{FRAGMENT_CACHE_PREFIX}:{widget.widget_area}:{widget.pk}:{widget.updated_at.timestamp()}'
+
+
+def load_widgets(areas):
+    """Load all active widgets for the given areas in one query, grouped by area."""
+    grouped = OrderedDict((area, []) for area in areas)
+    if not areas:
+        return grouped
+    for widget in Widget.objects.filter(is_active=True, widget_area__in=areas):
+        grouped[widget.widget_area].append(widget)
+    return grouped
+
+
+def render_widget(widget):
+    """
+    Render a single widget, bypassing the fragment cache.
+
+    Returns ``None`` if the renderer raises, so the failure is not cached.
+    """
+    entry = get_renderer(widget.type)
+    if entry is None:
+        return ''
+    renderer, _timeout = entry
+    try:
+        return str(renderer(widget))
+    except Exception:
+        logger.exception('Failed to render widget %s (%s)', widget.pk, widget.type)
+        return None
+
+
+def render_areas(areas=None):
+    """
+    Render widget areas.
+
+    Defaults to every widget area declared by the active theme. Returns an
+    ordered mapping of area id to a list of rendered widget dicts.
+    """
+    if areas is None:
+        theme = get_active_theme()
+        areas = theme.widget_area_ids if theme is not None and theme.supports_widgets else []
+
+    grouped = load_widgets(areas)
+    widgets = [widget for area_widgets in grouped.values() for widget in area_widgets]
+    cached = cache.get_many([fragment_key(widget) for widget in widgets])
+
+    to_cache = {}
+    rendered = OrderedDict()
+    for area, area_widgets in grouped.items():
+        rendered[area] = []
+        for widget in area_widgets:
+            key = fragment_key(widget)
+            html = cached.get(key)
+            if html is None:
+                html = render_widget(widget)
+                entry = get_renderer(widget.type)
+                if html is None:
+                    # Render failed; show nothing this time and retry on the next request
+                    html = ''
+                elif entry is not None and entry[1]:
+                    to_cache.setdefault(entry[1], {})[key] = html
+            rendered[area].append({
+                'id': widget.pk,
+                'type': widget.type,
+                'title': widget.title,
+                'html': html,
+            })
+
+    for timeout, fragments in to_cache.items():
+        cache.set_many(fragments, timeout)
+    return rendered